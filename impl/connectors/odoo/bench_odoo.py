@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CRM side of the contact import against the fake Odoo server.
+
+Runs the LinkedIn importer's Odoo path (existence check + create) on
+synthetic contacts, once per-contact the way it used to work and then with
+prefetch + batched creates across chunk sizes and concurrency levels. Each
+case gets a fresh server seeded with the same existing partners. No real Odoo
+or database is needed; pgvector writes are not part of the measurement.
+
+Usage:
+    python bench_odoo.py
+    python bench_odoo.py --contacts 2000 --latency 0.02 --workers 8
+    python bench_odoo.py --chunk-sizes 10,100 --concurrency 1,4,8 --skip-serial
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+from connector import OdooConnector
+from fake_server import FakeOdoo
+from contact_csv import ContactRecord
+from import_linkedin import CATCODE_CONTACTS, PartnerIndex, contact_vals
+
+FIRST = ["Ana", "Ben", "Chloe", "Dev", "Eli", "Fatima", "Golda", "Hiro", "Ines", "Jon"]
+LAST = ["Ussher", "Garcia", "Okafor", "Nguyen", "Smith", "Haddad", "Kim", "Rossi"]
+COMPANIES = ["LinkedTrust", "Acme Health", "Pima County", "Open Collective", "Tucson Coop"]
+
+
+def make_contacts(n, rng):
+    """Synthetic contacts shaped like contact_csv output."""
+    contacts = []
+    for i in range(n):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        contacts.append(ContactRecord(
+            first=first, last=last, name=f"{first} {last} {i}",
+            pet_name=f"{first}-{last}-{i}".lower(),
+            email=f"{first}.{last}.{i}@example.com".lower(),
+            company=rng.choice(COMPANIES), title="Engineer", source="bench",
+        ))
+    return contacts
+
+
+def run_serial(crm, contacts):
+    """The old path: one search and one create per contact."""
+    for c in contacts:
+        if crm.find_contact(email=c.email):
+            continue
+        crm.create_contact(c.name, catcode=CATCODE_CONTACTS, email=c.email,
+                           phone=c.phone, company=c.company, title=c.title)
+
+
+def run_batched(crm, contacts, chunk_size):
+    """do_import's CRM path: prefetch partners, then parallel chunked creates."""
+    index = PartnerIndex.load(crm)
+    round_size = chunk_size * crm.concurrency
+    for start in range(0, len(contacts), round_size):
+        to_create = [c for c in contacts[start:start + round_size] if not index.find(c)]
+        ids = crm.create_contacts([contact_vals(crm, c) for c in to_create], chunk_size=chunk_size)
+        for c, odoo_id in zip(to_create, ids):
+            if odoo_id is not None:
+                index.add(c, odoo_id)
+
+
+def bench_case(label, args, contacts, existing, fn, concurrency=1):
+    with FakeOdoo(latency=args.latency, jitter=args.jitter, workers=args.workers,
+                  fail_rate=args.fail_rate, seed=args.seed) as odoo:
+        odoo.add_partners(existing)
+        crm = OdooConnector(odoo.crm_config(), concurrency=concurrency)
+        start = time.perf_counter()
+        fn(crm)
+        elapsed = time.perf_counter() - start
+        crm.close()
+        created = len(odoo.partners) - len(existing)
+        calls = sum(n for name, n in odoo.calls.items() if not name.startswith("common."))
+    print(f"  {label:34s} {elapsed:7.2f} s  {len(contacts) / elapsed:8.1f} contacts/s"
+          f"  {calls:6d} calls  {created:6d} created")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Odoo import path against a fake server")
+    parser.add_argument("--contacts", type=int, default=500, help="Contacts to import (default 500)")
+    parser.add_argument("--existing", type=float, default=0.2, help="Share already in Odoo (default 0.2)")
+    parser.add_argument("--latency", type=float, default=0.01, help="Server seconds per call (default 0.01)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per call")
+    parser.add_argument("--workers", type=int, default=4, help="Server concurrent requests (default 4)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Probability a call faults")
+    parser.add_argument("--chunk-sizes", default="10,100", help="Comma-separated (default 10,100)")
+    parser.add_argument("--concurrency", default="1,4", help="Comma-separated (default 1,4)")
+    parser.add_argument("--skip-serial", action="store_true", help="Skip the per-contact baseline")
+    parser.add_argument("--seed", type=int, default=34)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    contacts = make_contacts(args.contacts, rng)
+    existing = [{"name": c.name, "email": c.email}
+                for c in rng.sample(contacts, int(len(contacts) * args.existing))]
+
+    print(f"{len(contacts)} contacts, {len(existing)} already in Odoo; server latency "
+          f"{args.latency * 1000:.0f} ms, {args.workers} workers\n")
+    baseline = None
+    if not args.skip_serial:
+        baseline = bench_case("per-contact search + create", args, contacts, existing,
+                              lambda crm: run_serial(crm, contacts))
+    for chunk_size in [int(x) for x in args.chunk_sizes.split(",")]:
+        for concurrency in [int(x) for x in args.concurrency.split(",")]:
+            elapsed = bench_case(f"prefetch + chunk {chunk_size}, concurrency {concurrency}",
+                                 args, contacts, existing,
+                                 lambda crm: run_batched(crm, contacts, chunk_size), concurrency)
+            if baseline:
+                print(f"  {'':34s} {baseline / elapsed:7.1f}x vs per-contact")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,9 +10,28 @@ Usage:
     crm = OdooConnector()  # reads config from sources.yaml
     if crm.is_ready():
         contact_id = crm.create_contact(name="Leanne Ussher", email="...", catcode="usv0gvcob1lu")
+
+        # Bulk: one XML-RPC call per chunk, IDs come back in input order
+        ids = crm.create_contacts([crm.contact_vals("A B"), crm.contact_vals("C D")], chunk_size=100)
+
+        # Stream existing partners without one call per lookup
+        for partner in crm.iter_partners(fields=["email", "name"], page_size=1000):
+            ...
+
+        # Independent calls in parallel (sinks.crm concurrency / rate_limit)
+        futures = [crm.submit("res.partner", "read", [pid], fields=["name"]) for pid in ids]
+        names = [f.result() for f in futures]
+        print(crm.latency_summary())
+
+Connections are kept alive: each thread holds its own ServerProxy whose
+transport reuses one HTTP connection across calls.
 """
 import os
+import time
+import threading
 import xmlrpc.client
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import yaml
 from dotenv import load_dotenv
 
@@ -29,11 +48,65 @@ def load_crm_config():
     return config.get("sinks", {}).get("crm")
 
 
+DEFAULT_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 60
+
+
+class KeepAliveTransport(xmlrpc.client.Transport):
+    """HTTP/1.1 transport that keeps its connection open between calls.
+
+    The stock transport already reuses its connection and retries once when
+    an idle one was closed by the server; this adds a socket timeout so a
+    stalled Odoo worker cannot hang an import.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, **kwargs):
+        super().__init__(**kwargs)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        reused = self._connection[1] is not None and self._connection[0] == host
+        conn = super().make_connection(host)
+        if not reused:
+            conn.timeout = self.timeout
+        return conn
+
+
+class SafeKeepAliveTransport(KeepAliveTransport, xmlrpc.client.SafeTransport):
+    """KeepAliveTransport over HTTPS."""
+
+
+class RateLimiter:
+    """Token bucket shared by all threads: at most `rate` calls per second."""
+
+    def __init__(self, rate):
+        self.rate = float(rate)
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + 1.0 / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
 class OdooConnector:
-    def __init__(self, config=None):
+    def __init__(self, config=None, concurrency=None, rate_limit=None):
         self.config = config or load_crm_config()
+        cfg = self.config or {}
+        self.concurrency = int(concurrency or cfg.get("concurrency") or DEFAULT_CONCURRENCY)
+        rate = rate_limit or cfg.get("rate_limit")
+        self._limiter = RateLimiter(rate) if rate else None
+        self._timeout = cfg.get("timeout", DEFAULT_TIMEOUT)
         self._uid = None
-        self._models = None
+        self._api_key = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pool = None
+        self.latencies = defaultdict(list)
 
     def is_ready(self):
         """Check if CRM config is present and marked ready."""
@@ -43,33 +116,96 @@ class OdooConnector:
             return False
         return all(self.config.get(k) for k in ("url", "db", "user"))
 
+    def _proxy(self, endpoint):
+        """ServerProxy for this thread. ServerProxy is not thread-safe, so
+        each thread gets its own, with its own keep-alive connection."""
+        proxies = getattr(self._local, "proxies", None)
+        if proxies is None:
+            proxies = self._local.proxies = {}
+        if endpoint not in proxies:
+            url = f"{self.config['url']}/xmlrpc/2/{endpoint}"
+            transport_cls = SafeKeepAliveTransport if url.startswith("https") else KeepAliveTransport
+            proxies[endpoint] = xmlrpc.client.ServerProxy(
+                url, transport=transport_cls(timeout=self._timeout))
+        return proxies[endpoint]
+
     def _connect(self):
-        """Establish connection to Odoo XML-RPC API."""
-        if self._models:
+        """Authenticate once; the uid and API key are reused by every call."""
+        if self._uid:
             return
-        url = self.config["url"]
-        db = self.config["db"]
-        user = self.config["user"]
-        api_key = self.config.get("api_key") or os.getenv("ODOO_API_KEY", "")
-
-        common = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/common")
-        self._uid = common.authenticate(db, user, api_key, {})
-        if not self._uid:
-            raise ConnectionError("Failed to authenticate with Odoo")
-        self._models = xmlrpc.client.ServerProxy(f"{url}/xmlrpc/2/object")
+        with self._lock:
+            if self._uid:
+                return
+            api_key = self.config.get("api_key") or os.getenv("ODOO_API_KEY", "")
+            uid = self._proxy("common").authenticate(
+                self.config["db"], self.config["user"], api_key, {})
+            if not uid:
+                raise ConnectionError("Failed to authenticate with Odoo")
+            self._api_key = api_key
+            self._uid = uid
 
     def _execute(self, model, method, *args, **kwargs):
         """Execute an Odoo model method."""
         self._connect()
-        return self._models.execute_kw(
-            self.config["db"], self._uid,
-            self.config.get("api_key") or os.getenv("ODOO_API_KEY", ""),
-            model, method, args, kwargs
-        )
+        if self._limiter:
+            self._limiter.acquire()
+        start = time.perf_counter()
+        try:
+            return self._proxy("object").execute_kw(
+                self.config["db"], self._uid, self._api_key,
+                model, method, list(args), kwargs
+            )
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies[f"{model}.{method}"].append(elapsed)
 
-    def create_contact(self, name, catcode=None, email=None, phone=None,
-                       company=None, notes=None):
-        """Create a contact in Odoo. Returns the Odoo record ID."""
+    def submit(self, model, method, *args, **kwargs):
+        """Run _execute on the connector's thread pool. Returns a Future.
+
+        Only for calls that do not depend on each other; the pool runs up to
+        `concurrency` of them at once, still subject to rate_limit.
+        """
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                    thread_name_prefix="odoo-rpc")
+        return self._pool.submit(self._execute, model, method, *args, **kwargs)
+
+    def close(self):
+        """Shut down the thread pool. Per-thread connections close with their threads."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def latency_stats(self):
+        """Per model.method call count, mean, p50, p95 and max latency in seconds."""
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self.latencies.items() if v}
+        stats = {}
+        for name, values in samples.items():
+            n = len(values)
+            stats[name] = {
+                "calls": n,
+                "mean": sum(values) / n,
+                "p50": values[n // 2],
+                "p95": values[min(n - 1, int(n * 0.95))],
+                "max": values[-1],
+            }
+        return stats
+
+    def latency_summary(self):
+        """One line per model.method, for printing at the end of an import."""
+        lines = []
+        for name, st in sorted(self.latency_stats().items()):
+            lines.append(f"  {name:28s} {st['calls']:6d} calls  mean {st['mean'] * 1000:7.1f} ms"
+                         f"  p50 {st['p50'] * 1000:7.1f} ms  p95 {st['p95'] * 1000:7.1f} ms")
+        return "\n".join(lines)
+
+    def contact_vals(self, name, catcode=None, email=None, phone=None,
+                     company=None, title=None, notes=None):
+        """Build res.partner field values for a contact (title is the job position)."""
         vals = {"name": name}
         if email:
             vals["email"] = email
@@ -77,17 +213,61 @@ class OdooConnector:
             vals["phone"] = phone
         if company:
             vals["company_name"] = company
+        if title:
+            vals["function"] = title
         if notes:
             vals["comment"] = notes
         catcode_field = self.config.get("catcode_field", "abra_catcode")
         if catcode:
             vals[catcode_field] = catcode
+        return vals
+
+    def create_contact(self, name, catcode=None, email=None, phone=None,
+                       company=None, title=None, notes=None):
+        """Create a contact in Odoo. Returns the Odoo record ID."""
+        vals = self.contact_vals(name, catcode=catcode, email=email, phone=phone,
+                                 company=company, title=title, notes=notes)
         result = self._execute("res.partner", "create", [vals])
         # Odoo returns a list when passed a list of vals; unwrap to single ID
         if isinstance(result, list):
             return result[0]
         return result
 
+    def create_contacts(self, vals_list, chunk_size=100, errors=None):
+        """Create many contacts, one multi-record create per chunk.
+
+        vals_list holds res.partner values (see contact_vals). Returns the new
+        IDs in input order. If a chunk is rejected, its records are retried one
+        by one; records that still fail get None, and their fault message is
+        stored in errors[index] when an errors dict is passed.
+
+        Chunks are independent, so they are sent through the thread pool and
+        up to `concurrency` creates are in flight at once.
+        """
+        starts = range(0, len(vals_list), chunk_size)
+        futures = [self.submit("res.partner", "create", vals_list[start:start + chunk_size])
+                   for start in starts]
+        ids = []
+        for start, future in zip(starts, futures):
+            chunk = vals_list[start:start + chunk_size]
+            try:
+                ids.extend(future.result())
+                continue
+            except xmlrpc.client.Fault:
+                # Odoo rolls back the whole create on a fault, so nothing in
+                # this chunk exists yet. Transport errors are not retried here:
+                # the chunk may have been created before the connection dropped.
+                pass
+            for offset, vals in enumerate(chunk):
+                try:
+                    result = self._execute("res.partner", "create", [vals])
+                    ids.append(result[0] if isinstance(result, list) else result)
+                except xmlrpc.client.Fault as e:
+                    ids.append(None)
+                    if errors is not None:
+                        errors[start + offset] = e.faultString
+        return ids
+
     def find_contact(self, name=None, email=None, catcode=None):
         """Search for existing contact. Returns list of IDs."""
         domain = []
@@ -100,6 +280,33 @@ class OdooConnector:
             domain.append((catcode_field, "=", catcode))
         return self._execute("res.partner", "search", domain)
 
+    def read_partners(self, ids, fields):
+        """Read the given fields for many partners in one call.
+
+        Uses search_read on the ids rather than read, so partners deleted in
+        Odoo are simply omitted instead of failing the whole call.
+        """
+        if not ids:
+            return []
+        return self._execute("res.partner", "search_read", [("id", "in", list(ids))],
+                             fields=list(fields))
+
+    def iter_partners(self, fields=("email",), page_size=1000, domain=None):
+        """Yield res.partner records as dicts, fetched with paged search_read.
+
+        Pages are keyed on id rather than offset, so late pages cost the same
+        as early ones. "id" is always included in each record.
+        """
+        last_id = 0
+        while True:
+            page = self._execute("res.partner", "search_read",
+                                 list(domain or []) + [("id", ">", last_id)],
+                                 fields=list(fields), order="id", limit=page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            last_id = page[-1]["id"]
+
     def update_contact(self, record_id, **fields):
         """Update an existing contact."""
         catcode_field = self.config.get("catcode_field", "abra_catcode")
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+In-process stand-in for Odoo's XML-RPC API, for testing and benchmarking the CRM path.
+
+Implements just what abra uses:
+    /xmlrpc/2/common  authenticate
+    /xmlrpc/2/object  execute_kw on res.partner: create, search, search_read,
+                      read, write, search_count, unlink
+
+Records live in memory. Any field is accepted, so the custom catcode field
+(abra_catcode by default) works like any other. Domains support the usual
+(field, op, value) leaves and the '&', '|', '!' prefix operators.
+
+Latency and failures are injectable, and `workers` caps how many requests are
+served at once, like Odoo's worker count:
+
+    from fake_server import FakeOdoo
+    with FakeOdoo(latency=0.02, workers=4, fail_rate=0.01) as odoo:
+        crm = OdooConnector(odoo.crm_config(concurrency=4))
+        crm.create_contacts([...])
+        odoo.partners            # {id: record}
+        odoo.calls               # Counter of model.method
+
+Also usable as CLI, as a local sinks.crm target:
+    python fake_server.py --port 8069 --latency 0.02
+"""
+import sys
+import time
+import random
+import argparse
+import threading
+import xmlrpc.client
+from collections import Counter
+from datetime import datetime
+from socketserver import ThreadingMixIn
+from xmlrpc.server import MultiPathXMLRPCServer, SimpleXMLRPCDispatcher, SimpleXMLRPCRequestHandler
+
+UID = 2
+MODEL = "res.partner"
+REQUIRED = ("name",)
+
+
+class _Handler(SimpleXMLRPCRequestHandler):
+    # HTTP/1.1 so clients can keep the connection open between calls
+    protocol_version = "HTTP/1.1"
+    rpc_paths = ("/xmlrpc/2/common", "/xmlrpc/2/object")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(ThreadingMixIn, MultiPathXMLRPCServer):
+    daemon_threads = True
+
+
+def _now():
+    return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _compare(value, op, arg):
+    if op == "=":
+        return value == arg or (arg is False and value in (None, False, ""))
+    if op == "!=":
+        return not _compare(value, "=", arg)
+    if op in ("like", "ilike", "not like", "not ilike", "=like", "=ilike"):
+        text, pattern = str(value or ""), str(arg)
+        if "ilike" in op:
+            text, pattern = text.lower(), pattern.lower()
+        if op.startswith("="):
+            found = text == pattern.replace("%", "")
+        else:
+            found = pattern in text
+        return not found if op.startswith("not") else found
+    if op == "in":
+        return value in arg
+    if op == "not in":
+        return value not in arg
+    if value in (None, False):
+        return False
+    if op == ">":
+        return value > arg
+    if op == ">=":
+        return value >= arg
+    if op == "<":
+        return value < arg
+    if op == "<=":
+        return value <= arg
+    raise xmlrpc.client.Fault(1, f"Invalid operator {op!r}")
+
+
+def _sort_key(value):
+    # Unset values (None/False) sort last, like NULLs in Postgres
+    unset = value is None or value is False
+    return unset, "" if unset else value
+
+
+def _match(record, domain):
+    """Evaluate an Odoo domain (prefix notation, implicit '&') against a record."""
+    stack = []
+    for term in reversed(domain):
+        if term == "!":
+            stack.append(not stack.pop())
+        elif term in ("&", "|"):
+            a, b = stack.pop(), stack.pop()
+            stack.append(a and b if term == "&" else a or b)
+        else:
+            field, op, arg = term
+            stack.append(_compare(record.get(field), op, arg))
+    return all(stack)
+
+
+class FakeOdoo:
+    """A threaded XML-RPC server on localhost holding res.partner in memory.
+
+    latency    seconds added to every execute_kw call (plus up to `jitter`)
+    workers    max requests served concurrently (None = unlimited)
+    fail_rate  probability that an execute_kw call raises a Fault
+    fail_if    callable(method, args) -> bool; True raises a Fault, e.g. to
+               reject a create containing one bad record
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, db="fake", user="admin", api_key="fake-key",
+                 latency=0.0, jitter=0.0, workers=None, fail_rate=0.0, fail_if=None, seed=None):
+        self.db = db
+        self.user = user
+        self.api_key = api_key
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self.fail_if = fail_if
+        self.partners = {}
+        self.calls = Counter()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._workers = threading.BoundedSemaphore(workers) if workers else None
+
+        self._server = _Server((host, port), requestHandler=_Handler, allow_none=True)
+        common = SimpleXMLRPCDispatcher(allow_none=True)
+        common.register_function(self.authenticate, "authenticate")
+        common.register_function(lambda: {"server_version": "fake"}, "version")
+        obj = SimpleXMLRPCDispatcher(allow_none=True)
+        obj.register_function(self.execute_kw, "execute_kw")
+        self._server.add_dispatcher("/xmlrpc/2/common", common)
+        self._server.add_dispatcher("/xmlrpc/2/object", obj)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def crm_config(self, **extra):
+        """A sinks.crm config dict pointing at this server."""
+        config = {"type": "odoo", "url": self.url, "db": self.db, "user": self.user,
+                  "api_key": self.api_key, "catcode_field": "abra_catcode", "status": "ready"}
+        config.update(extra)
+        return config
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_partners(self, vals_list):
+        """Seed records directly, without going through XML-RPC. Returns IDs."""
+        with self._lock:
+            return [self._create(vals) for vals in vals_list]
+
+    # --- XML-RPC endpoints ---
+
+    def authenticate(self, db, login, password, user_agent_env):
+        with self._lock:
+            self.calls["common.authenticate"] += 1
+        if (db, login, password) != (self.db, self.user, self.api_key):
+            return False
+        return UID
+
+    def execute_kw(self, db, uid, password, model, method, args, kwargs=None):
+        with self._lock:
+            self.calls[f"{model}.{method}"] += 1
+        if self._workers:
+            self._workers.acquire()
+        try:
+            self._delay()
+            if (db, uid, password) != (self.db, UID, self.api_key):
+                raise xmlrpc.client.Fault(3, "Access Denied")
+            if model != MODEL:
+                raise xmlrpc.client.Fault(2, f"Object {model} doesn't exist")
+            handler = getattr(self, f"_rpc_{method}", None)
+            if handler is None:
+                raise xmlrpc.client.Fault(2, f"Method {method} not supported on {model}")
+            if self.fail_if and self.fail_if(method, args):
+                raise xmlrpc.client.Fault(1, f"Injected failure in {method}")
+            with self._lock:
+                if self.fail_rate and self._random.random() < self.fail_rate:
+                    raise xmlrpc.client.Fault(1, f"Injected random failure in {method}")
+                return handler(*args, **(kwargs or {}))
+        finally:
+            if self._workers:
+                self._workers.release()
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    # --- res.partner methods (called with the lock held) ---
+
+    def _create(self, vals):
+        missing = [f for f in REQUIRED if not vals.get(f)]
+        if missing:
+            raise xmlrpc.client.Fault(1, f"Missing required fields: {', '.join(missing)}")
+        now = _now()
+        record = dict(vals, id=self._next_id, create_date=now, write_date=now)
+        self.partners[record["id"]] = record
+        self._next_id += 1
+        return record["id"]
+
+    def _rpc_create(self, vals_list):
+        if isinstance(vals_list, dict):
+            return self._create(vals_list)
+        # Validate first: like Odoo, a failing record rolls back the whole call
+        for vals in vals_list:
+            missing = [f for f in REQUIRED if not vals.get(f)]
+            if missing:
+                raise xmlrpc.client.Fault(1, f"Missing required fields: {', '.join(missing)}")
+        return [self._create(vals) for vals in vals_list]
+
+    def _search_records(self, domain, offset=0, limit=None, order=None):
+        records = [r for r in self.partners.values() if _match(r, domain)]
+        for part in reversed((order or "id").split(",")):
+            field, _, direction = part.strip().partition(" ")
+            records.sort(key=lambda r: _sort_key(r.get(field)), reverse=direction.lower() == "desc")
+        end = offset + limit if limit else None
+        return records[offset:end]
+
+    def _fields(self, record, fields):
+        if not fields:
+            return dict(record)
+        return {"id": record["id"], **{f: record.get(f, False) for f in fields}}
+
+    def _rpc_search(self, domain, offset=0, limit=None, order=None, count=False):
+        records = self._search_records(domain, offset, limit, order)
+        return len(records) if count else [r["id"] for r in records]
+
+    def _rpc_search_count(self, domain, limit=None):
+        return len(self._search_records(domain, limit=limit))
+
+    def _rpc_search_read(self, domain=(), fields=None, offset=0, limit=None, order=None):
+        return [self._fields(r, fields) for r in self._search_records(domain, offset, limit, order)]
+
+    def _rpc_read(self, ids, fields=None):
+        if isinstance(ids, int):
+            ids = [ids]
+        return [self._fields(self.partners[i], fields) for i in ids if i in self.partners]
+
+    def _rpc_write(self, ids, vals):
+        if isinstance(ids, int):
+            ids = [ids]
+        missing = [i for i in ids if i not in self.partners]
+        if missing:
+            raise xmlrpc.client.Fault(1, f"Records do not exist: {missing}")
+        now = _now()
+        for i in ids:
+            self.partners[i].update(vals, write_date=now)
+        return True
+
+    def _rpc_unlink(self, ids):
+        if isinstance(ids, int):
+            ids = [ids]
+        for i in ids:
+            self.partners.pop(i, None)
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Odoo XML-RPC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8069)
+    parser.add_argument("--db", default="fake")
+    parser.add_argument("--user", default="admin")
+    parser.add_argument("--api-key", default="fake-key")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added per call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds per call, up to this")
+    parser.add_argument("--workers", type=int, default=None, help="Max concurrent requests")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="Probability a call faults")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    odoo = FakeOdoo(host=args.host, port=args.port, db=args.db, user=args.user,
+                    api_key=args.api_key, latency=args.latency, jitter=args.jitter,
+                    workers=args.workers, fail_rate=args.fail_rate, seed=args.seed)
+    print(f"Fake Odoo on {odoo.url} (db {args.db}, user {args.user}, api_key {args.api_key})")
+    print("Point sinks.crm in ~/.abra/sources.yaml at it. Ctrl-C to stop.")
+    try:
+        odoo._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        odoo._server.server_close()
+        print(f"\n{len(odoo.partners)} partners, calls: {dict(odoo.calls)}")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Local cache of non-sensitive Odoo partner fields, for `abra about --crm`.
+
+Only company and job title are kept (plus write_date) — never email, phone
+or notes, so the cache holds nothing that is not already safe to print.
+Entries are keyed on the Odoo partner id and expire by how recently the
+partner changed: a record edited an hour ago is re-read within minutes, one
+untouched for months is trusted for a day.
+
+    from partner_cache import PartnerCache
+    cache = PartnerCache()
+    details = cache.resolve(crm, [12345, 12346])   # at most one read call
+    details[12345]                                 # {"company_name": ..., "function": ..., ...}
+    cache.save()
+"""
+import os
+import json
+import time
+import calendar
+
+CACHE_PATH = os.path.expanduser("~/.abra/cache/odoo_partners.json")
+FIELDS = ("company_name", "function", "write_date")
+
+# TTL = (time since write_date) * TTL_FACTOR, clamped to [MIN_TTL, MAX_TTL]
+TTL_FACTOR = 0.1
+MIN_TTL = 5 * 60
+MAX_TTL = 24 * 60 * 60
+
+
+def parse_write_date(value):
+    """Odoo write_date ('YYYY-MM-DD HH:MM:SS', UTC) to epoch seconds, or None."""
+    if not value:
+        return None
+    try:
+        return calendar.timegm(time.strptime(value[:19], "%Y-%m-%d %H:%M:%S"))
+    except ValueError:
+        return None
+
+
+def entry_ttl(entry):
+    changed = parse_write_date(entry.get("write_date"))
+    if changed is None:
+        return MIN_TTL
+    age = max(0, entry["fetched_at"] - changed)
+    return min(MAX_TTL, max(MIN_TTL, age * TTL_FACTOR))
+
+
+class PartnerCache:
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = {int(k): v for k, v in json.load(f).items()}
+            except (OSError, ValueError):
+                # A corrupt cache is only a cold cache
+                self.entries = {}
+
+    def fresh(self, partner_id, now=None):
+        entry = self.entries.get(partner_id)
+        if entry is None:
+            return None
+        now = now or time.time()
+        if now - entry["fetched_at"] > entry_ttl(entry):
+            return None
+        return entry
+
+    def resolve(self, crm, partner_ids):
+        """Return {id: entry} for the ids, reading missing or expired ones in one call.
+
+        Ids that no longer exist in Odoo map to None.
+        """
+        now = time.time()
+        result = {}
+        stale = []
+        for pid in dict.fromkeys(partner_ids):
+            entry = self.fresh(pid, now)
+            if entry is None:
+                stale.append(pid)
+            else:
+                result[pid] = entry
+        if stale:
+            found = {r["id"]: r for r in crm.read_partners(stale, FIELDS)}
+            for pid in stale:
+                record = found.get(pid)
+                if record is None:
+                    self.entries.pop(pid, None)
+                    result[pid] = None
+                    continue
+                entry = {f: record.get(f) or None for f in FIELDS}
+                entry["fetched_at"] = now
+                self.entries[pid] = entry
+                result[pid] = entry
+            self.dirty = True
+        return result
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({str(k): v for k, v in self.entries.items()}, f)
+        os.replace(tmp, self.path)
+        self.dirty = False
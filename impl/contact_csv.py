@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for contact exports, shared by the contact importers.
+
+Formats, detected from the header line:
+    linkedin-connections   LinkedIn Connections.csv (notes preamble, then
+                           "First Name,Last Name,URL,Email Address,...")
+    contacts               Google/LinkedIn Contacts.csv ("Source,FirstName,LastName,...")
+
+The file is opened once and read line by line: the preamble is skipped as it
+streams past, the header picks the format, and rows are yielded as compact
+ContactRecord objects, so memory stays flat however large the export.
+
+    from contact_csv import ContactCSV
+    with ContactCSV(path) as src:
+        print(src.label)                  # "LinkedIn Connections format"
+        for c in src:
+            c.name, c.email, c.company
+"""
+import csv
+import re
+import unicodedata
+
+# A header must show up within this many lines (LinkedIn's notes are ~3)
+MAX_PREAMBLE_LINES = 50
+
+FORMATS = {
+    "linkedin-connections": ("First Name,Last Name,URL", "LinkedIn Connections format"),
+    "contacts": ("Source,FirstName,LastName", "Google/LinkedIn Contacts format"),
+}
+
+
+def fold(text):
+    """Lowercase ASCII form of text: 'José Núñez' -> 'jose nunez'."""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+
+
+def normalize_name(first, last):
+    """Lowercase pet name: first-last, ascii-folded, stripped of non-alpha."""
+    first = fold(first).strip()
+    last = fold(last).strip()
+    # Remove non-alpha except hyphens
+    first = re.sub(r'[^a-z-]', '', first)
+    last = re.sub(r'[^a-z-]', '', last)
+    if first and last:
+        return f"{first}-{last}"
+    return first or last or None
+
+
+def full_name(first, last):
+    first = (first or "").strip()
+    last = (last or "").strip()
+    if first and last:
+        return f"{first} {last}"
+    return first or last or None
+
+
+class ContactRecord:
+    """One contact from an export. __slots__ keeps 100k of them small."""
+    __slots__ = ("first", "last", "name", "pet_name", "email", "company", "title",
+                 "phone", "linkedin_url", "connected", "source")
+
+    def __init__(self, first=None, last=None, name=None, pet_name=None, email=None,
+                 company=None, title=None, phone=None, linkedin_url=None,
+                 connected=None, source=None):
+        self.first = first
+        self.last = last
+        self.name = name
+        self.pet_name = pet_name
+        self.email = email
+        self.company = company
+        self.title = title
+        self.phone = phone
+        self.linkedin_url = linkedin_url
+        self.connected = connected
+        self.source = source
+
+    def __repr__(self):
+        return f"ContactRecord({self.name!r}, {self.email!r}, {self.source!r})"
+
+
+def _field(row, key):
+    return (row.get(key) or "").strip()
+
+
+def _first_of(value):
+    """First item of a comma-separated cell, or None."""
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    return items[0] if items else None
+
+
+def parse_connection(row):
+    first = _field(row, "First Name")
+    last = _field(row, "Last Name")
+    name = full_name(first, last)
+    if not name:
+        return None
+    return ContactRecord(
+        first=first, last=last, name=name,
+        pet_name=normalize_name(first, last),
+        email=_field(row, "Email Address") or None,
+        company=_field(row, "Company") or None,
+        title=_field(row, "Position") or None,
+        linkedin_url=_field(row, "URL") or None,
+        connected=_field(row, "Connected On") or None,
+        source="linkedin",
+    )
+
+
+def parse_contact(row):
+    first = _field(row, "FirstName")
+    last = _field(row, "LastName")
+    name = full_name(first, last)
+    email = _first_of(_field(row, "Emails"))
+    # Skip entries with no name and no email
+    if not name and not email:
+        return None
+    company = _field(row, "Companies")
+    if company == "null":
+        company = None
+    linkedin_url = None
+    for part in _field(row, "Profiles").split(","):
+        if "linkedin.com" in part:
+            linkedin_url = part.strip()
+            break
+    pet = normalize_name(first, last)
+    if not pet and email:
+        pet = re.sub(r'[^a-z0-9-]', '', email.split("@")[0].lower()) or None
+    return ContactRecord(
+        first=first, last=last,
+        # Use email-derived name as fallback
+        name=name or email.split("@")[0],
+        pet_name=pet,
+        email=email,
+        company=company or None,
+        title=_field(row, "Title") or None,
+        phone=_first_of(_field(row, "PhoneNumbers")),
+        linkedin_url=linkedin_url,
+        source=(row.get("Source") or "unknown").strip().lower(),
+    )
+
+
+PARSERS = {
+    "linkedin-connections": parse_connection,
+    "contacts": parse_contact,
+}
+
+
+def detect_format(line):
+    """Format name for a header line, or None."""
+    for fmt, (prefix, _) in FORMATS.items():
+        if line.lstrip("\ufeff").startswith(prefix):
+            return fmt
+    return None
+
+
+class ContactCSV:
+    """An open contact export. Raises ValueError if no known header is found."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, encoding="utf-8", newline="")
+        self.format = None
+        self.skipped = 0
+        try:
+            for i, line in enumerate(self._file):
+                if i >= MAX_PREAMBLE_LINES:
+                    break
+                self.format = detect_format(line)
+                if self.format:
+                    self._header = next(csv.reader([line.lstrip("\ufeff")]))
+                    break
+        except UnicodeDecodeError:
+            pass
+        if not self.format:
+            self._file.close()
+            raise ValueError(f"Unknown CSV format in {path}")
+        self.label = FORMATS[self.format][1]
+
+    def __iter__(self):
+        parse = PARSERS[self.format]
+        for row in csv.DictReader(self._file, fieldnames=self._header):
+            record = parse(row)
+            if record is None:
+                self.skipped += 1
+                continue
+            yield record
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
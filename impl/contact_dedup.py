@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Fuzzy deduplication for contact imports.
+
+Exact email / pet-name matching misses "Bob Smith" vs "Robert Smith" and
+"José Núñez" vs "Jose Nunez". This engine indexes every contact under a few
+blocking keys and only scores pairs that share a block, so the work grows
+with block sizes, not with the square of the export:
+
+    em   exact email
+    url  exact LinkedIn URL
+    sx   soundex of the canonical first name + soundex of the last name
+    tri  first initial + each trigram of the last name (catches typos)
+    co   company token + soundex of the last name
+
+Names are ascii-folded and common nicknames mapped to one form first.
+Matches are joined with union-find; a cluster never holds two different
+emails or two different LinkedIn URLs, so distinct addresses stay distinct
+people.
+
+    from contact_dedup import dedup, match_existing, load_existing_names
+    contacts = dedup(contacts)
+    match_existing(contacts, load_existing_names("golda"))
+"""
+import os
+import re
+import sys
+from collections import defaultdict
+
+from contact_csv import ContactRecord, fold
+
+THRESHOLD = 0.8      # trigram Dice similarity of canonical full names
+MAX_BLOCK = 200      # blocks bigger than this are too common to be useful
+
+NICKNAMES = {
+    "abby": "abigail", "al": "albert", "alex": "alexander", "andy": "andrew",
+    "ben": "benjamin", "beth": "elizabeth", "betty": "elizabeth", "bill": "william",
+    "billy": "william", "bob": "robert", "bobby": "robert", "cathy": "catherine",
+    "chris": "christopher", "chuck": "charles", "dan": "daniel", "danny": "daniel",
+    "dave": "david", "deb": "deborah", "debbie": "deborah", "dick": "richard",
+    "ed": "edward", "eddie": "edward", "fred": "frederick", "greg": "gregory",
+    "jack": "john", "jim": "james", "jimmy": "james", "joe": "joseph",
+    "jon": "jonathan", "kate": "katherine", "kathy": "katherine", "katie": "katherine",
+    "ken": "kenneth", "larry": "lawrence", "liz": "elizabeth", "matt": "matthew",
+    "mike": "michael", "nick": "nicholas", "pat": "patricia", "pete": "peter",
+    "rich": "richard", "rick": "richard", "rob": "robert", "ron": "ronald",
+    "sam": "samuel", "steve": "steven", "stephen": "steven", "sue": "susan",
+    "ted": "edward", "tom": "thomas", "tony": "anthony", "will": "william",
+}
+
+COMPANY_STOPWORDS = {
+    "inc", "llc", "ltd", "co", "corp", "corporation", "company", "the", "of",
+    "and", "group", "gmbh", "sa", "plc", "foundation", "university", "at",
+}
+
+SOUNDEX_CODES = {c: d for d, letters in
+                 {"1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r"}.items()
+                 for c in letters}
+
+
+def name_tokens(name):
+    """Folded name tokens with the first name mapped through NICKNAMES."""
+    tokens = re.findall(r"[a-z]+", fold(name))
+    if tokens:
+        tokens[0] = NICKNAMES.get(tokens[0], tokens[0])
+    return tokens
+
+
+def soundex(word):
+    if not word:
+        return ""
+    out = word[0].upper()
+    last = SOUNDEX_CODES.get(word[0], "")
+    for ch in word[1:]:
+        code = SOUNDEX_CODES.get(ch, "")
+        if code and code != last:
+            out += code
+            if len(out) == 4:
+                break
+        if ch not in "hw":
+            last = code
+    return out.ljust(4, "0")
+
+
+def trigrams(text, pad=True):
+    if pad:
+        text = f"  {text} "
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(a, b):
+    """Dice similarity of two trigram sets."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def company_tokens(company):
+    return {t for t in re.findall(r"[a-z0-9]+", fold(company))
+            if len(t) > 1 and t not in COMPANY_STOPWORDS}
+
+
+class Features:
+    """What the engine compares for one contact (computed once per record)."""
+    __slots__ = ("canon", "first", "last", "last_sx", "grams", "email", "url", "companies")
+
+    def __init__(self, c):
+        tokens = name_tokens(c.name)
+        self.canon = " ".join(tokens)
+        self.first = tokens[0] if tokens else ""
+        self.last = tokens[-1] if len(tokens) > 1 else ""
+        self.last_sx = soundex(self.last)
+        self.grams = trigrams(self.canon)
+        self.email = (c.email or "").strip().lower() or None
+        self.url = (c.linkedin_url or "").strip().lower().rstrip("/") or None
+        self.companies = company_tokens(c.company)
+
+    def block_keys(self):
+        keys = []
+        if self.email:
+            keys.append(("em", self.email))
+        if self.url:
+            keys.append(("url", self.url))
+        if self.first and self.last:
+            keys.append(("sx", soundex(self.first), self.last_sx))
+            # Unpadded: padded edge trigrams ("  s") would make huge blocks
+            keys.extend(("tri", self.first[0], g) for g in trigrams(self.last, pad=False))
+            keys.extend(("co", t, self.last_sx) for t in self.companies)
+        elif self.first:
+            keys.append(("sx", soundex(self.first), ""))
+        return keys
+
+
+def is_match(a, b, threshold=THRESHOLD):
+    """Decide whether two contacts are the same person."""
+    if a.email and b.email:
+        return a.email == b.email
+    if a.url and b.url:
+        return a.url == b.url
+    if not a.canon or not b.canon:
+        return False
+    if a.canon == b.canon:
+        return True
+    if a.last and b.last and a.last_sx != b.last_sx:
+        return False
+    if a.companies and b.companies and not a.companies & b.companies:
+        return False
+    return similarity(a.grams, b.grams) >= threshold
+
+
+class UnionFind:
+    """Disjoint sets over record indexes that refuse to join conflicting identities."""
+
+    def __init__(self, features):
+        self.parent = list(range(len(features)))
+        self.email = [f.email for f in features]
+        self.url = [f.url for f in features]
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i, j):
+        a, b = self.find(i), self.find(j)
+        if a == b:
+            return False
+        for attr in (self.email, self.url):
+            if attr[a] and attr[b] and attr[a] != attr[b]:
+                return False
+        self.parent[b] = a
+        self.email[a] = self.email[a] or self.email[b]
+        self.url[a] = self.url[a] or self.url[b]
+        return True
+
+
+def find_clusters(records, threshold=THRESHOLD, max_block=MAX_BLOCK):
+    """Group records (ContactRecords) into clusters of the same person.
+
+    Returns a list of index lists, in first-seen order, singletons included.
+    """
+    features = [Features(r) for r in records]
+    blocks = defaultdict(list)
+    for i, f in enumerate(features):
+        for key in f.block_keys():
+            blocks[key].append(i)
+
+    uf = UnionFind(features)
+    seen = set()
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > max_block:
+            continue
+        for x in range(len(members)):
+            i = members[x]
+            for j in members[x + 1:]:
+                if (i, j) in seen:
+                    continue
+                seen.add((i, j))
+                if uf.find(i) != uf.find(j) and is_match(features[i], features[j], threshold):
+                    uf.union(i, j)
+
+    clusters = {}
+    for i in range(len(records)):
+        clusters.setdefault(uf.find(i), []).append(i)
+    return list(clusters.values())
+
+
+def merge_contact(existing, c):
+    """Fill fields missing on existing from c. LinkedIn source wins."""
+    for field in ("email", "linkedin_url", "company", "title", "phone", "connected", "pet_name"):
+        if not getattr(existing, field) and getattr(c, field):
+            setattr(existing, field, getattr(c, field))
+    if c.source == "linkedin" and existing.source != "linkedin":
+        existing.source = "linkedin"
+
+
+def dedup(contacts, threshold=THRESHOLD):
+    """Merge contacts that are the same person. Returns the merged list.
+
+    The first LinkedIn record of a cluster (else its first record) is kept
+    and the rest are merged into it.
+    """
+    merged = []
+    for cluster in find_clusters(contacts, threshold):
+        members = [contacts[i] for i in cluster]
+        primary = next((c for c in members if c.source == "linkedin"), members[0])
+        for c in members:
+            if c is not primary:
+                merge_contact(primary, c)
+        merged.append(primary)
+    return merged
+
+
+def load_existing_names(scope="golda", conn=None):
+    """{pet name: full name} for every name in scope, in one query.
+
+    The full name comes from the name's IS text binding when it has one.
+    """
+    close = conn is None
+    if conn is None:
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pgvector'))
+        from query import get_conn
+        conn = get_conn()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT n.name, f.full_name FROM (
+            SELECT b.name_id, MAX(b.target_ref) FILTER (
+                       WHERE b.relationship_id = (SELECT id FROM relationship_types WHERE relationship = 'IS')
+                       AND b.target_type = 'text') AS full_name
+            FROM bindings b WHERE b.scope = %s
+            GROUP BY b.name_id
+        ) f
+        JOIN names n ON n.id = f.name_id
+    """, (scope,))
+    names = {name: full or name.replace("-", " ") for name, full in cur.fetchall()}
+    cur.close()
+    if close:
+        conn.close()
+    return names
+
+
+def match_existing(contacts, existing_names, threshold=THRESHOLD):
+    """Point contacts at names that already exist in the store.
+
+    A contact that matches an existing person takes that pet name, so its
+    bindings join the existing ones. A contact whose pet name is taken by a
+    different person gets a numbered pet name instead. Returns
+    (matched, renamed) counts.
+    """
+    existing = [ContactRecord(name=full, pet_name=pet) for pet, full in existing_names.items()]
+    records = contacts + existing
+    n = len(contacts)
+    owner = {}
+    for cluster in find_clusters(records, threshold):
+        known = [i for i in cluster if i >= n]
+        if known:
+            for i in cluster:
+                if i < n:
+                    owner[i] = records[known[0]].pet_name
+
+    matched = renamed = 0
+    taken = set(existing_names)
+    for i, c in enumerate(contacts):
+        if i in owner:
+            c.pet_name = owner[i]
+            matched += 1
+            continue
+        pet = c.pet_name
+        if pet and pet in taken:
+            k = 2
+            while f"{pet}-{k}" in taken:
+                k += 1
+            c.pet_name = f"{pet}-{k}"
+            renamed += 1
+        if c.pet_name:
+            taken.add(c.pet_name)
+    return matched, renamed
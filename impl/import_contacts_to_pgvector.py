@@ -5,6 +5,8 @@ as searchable content blobs (scrubbed of PII).
 
 Strips emails, phone numbers, addresses. Keeps: name, company, position, date.
 Stores as chunked content blobs under golda/contacts/linkedin-full (a0010103).
+Each blob is further split into record-aware content_chunks, so search/read
+return the few matching contacts rather than the whole 200-contact blob.
 
 Usage:
     cd /opt/shared/repos/abra/impl
@@ -21,13 +23,15 @@ Usage:
     # Replace existing (deletes old chunks first)
     .venv/bin/python import_contacts_to_pgvector.py ~/Connections.csv ~/Contacts.csv --confirm --replace
 """
-import csv
 import os
 import sys
 import argparse
 
+from contact_csv import ContactCSV
+
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pgvector'))
 from write_binding import AbraWriter
+from aliases import refresh_aliases
 
 CATCODE = "a0010103"
 CATCODE_PARENT = "a00101"
@@ -36,66 +40,49 @@ BINDING_NAME = "linkedin-contacts-full"
 CHUNK_SIZE = 200
 
 
-def load_linkedin(path):
-    """Load LinkedIn Connections.csv, return list of scrubbed strings."""
-    rows = []
-    with open(path, "r") as f:
-        lines = f.readlines()
-        header_idx = None
-        for i, line in enumerate(lines):
-            if line.startswith("First Name,"):
-                header_idx = i
-                break
-        if header_idx is None:
-            print(f"  WARNING: no header found in {path}")
-            return rows
-        reader = csv.DictReader(lines[header_idx:])
-        for row in reader:
-            first = row.get("First Name", "").strip()
-            last = row.get("Last Name", "").strip()
-            company = row.get("Company", "").strip()
-            position = row.get("Position", "").strip()
-            connected = row.get("Connected On", "").strip()
-            if not first and not last:
-                continue
-            name = f"{first} {last}".strip()
-            parts = [name]
-            if position:
-                parts.append(position)
-            if company:
-                parts.append(f"at {company}")
-            if connected:
-                parts.append(f"(connected {connected})")
-            rows.append(" — ".join(parts))
-    return rows
-
-
-def load_google(path):
-    """Load Google Contacts.csv, return list of scrubbed strings (only those with company/title)."""
-    rows = []
-    with open(path, "r") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            first = row.get("FirstName", "").strip()
-            last = row.get("LastName", "").strip()
-            company = row.get("Companies", "").strip()
-            title = row.get("Title", "").strip()
-            if not first and not last:
-                continue
-            if company == "null":
-                company = ""
-            name = f"{first} {last}".strip()
-            if not name:
-                continue
-            if not company and not title:
-                continue
-            parts = [name]
-            if title:
-                parts.append(title)
-            if company:
-                parts.append(f"at {company}")
-            rows.append(" — ".join(parts))
-    return rows
+def scrubbed_line(c, fmt):
+    """One searchable line per contact: name — title — at company (connected date).
+
+    No emails or phone numbers. Google/Contacts.csv entries are only kept when
+    they have a real name and a company or title.
+    """
+    if not c.first and not c.last:
+        return None
+    if fmt == "contacts" and not c.company and not c.title:
+        return None
+    parts = [c.name]
+    if c.title:
+        parts.append(c.title)
+    if c.company:
+        parts.append(f"at {c.company}")
+    if c.connected:
+        parts.append(f"(connected {c.connected})")
+    return " — ".join(parts)
+
+
+def iter_rows(paths, counts=None):
+    """Stream scrubbed lines from every file. counts[path] gets the per-file total."""
+    for path in paths:
+        with ContactCSV(path) as src:
+            n = 0
+            for c in src:
+                line = scrubbed_line(c, src.format)
+                if line:
+                    n += 1
+                    yield line
+        if counts is not None:
+            counts[path] = (src.label, n)
+
+
+def iter_chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 
 def main():
@@ -106,35 +93,39 @@ def main():
     parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help=f"Contacts per chunk (default {CHUNK_SIZE})")
     args = parser.parse_args()
 
-    all_rows = []
+    paths = []
     for path in args.files:
         if not os.path.exists(path):
             print(f"File not found: {path}")
             sys.exit(1)
-        # Detect type by header
-        with open(path) as f:
-            sample = f.read(500)
-        if "First Name,Last Name,URL" in sample:
-            rows = load_linkedin(path)
-            print(f"LinkedIn: {len(rows)} connections from {path}")
-        elif "Source,FirstName,LastName" in sample:
-            rows = load_google(path)
-            print(f"Google: {len(rows)} contacts with company/title from {path}")
-        else:
-            print(f"Unknown CSV format: {path}")
+        try:
+            ContactCSV(path).close()
+        except ValueError as e:
+            print(e)
             continue
-        all_rows.extend(rows)
-
-    print(f"Total: {len(all_rows)} entries (scrubbed, no emails/phones)")
-
-    chunks = [all_rows[i:i + args.chunk_size] for i in range(0, len(all_rows), args.chunk_size)]
-    print(f"Will store as {len(chunks)} chunks of ~{args.chunk_size}")
+        paths.append(path)
+
+    # First pass only counts (the chunk headers carry the total); the write
+    # pass streams again, so at most one chunk is held in memory
+    counts = {}
+    sample = []
+    total = 0
+    for row in iter_rows(paths, counts):
+        if len(sample) < 10:
+            sample.append(row)
+        total += 1
+    for path, (label, n) in counts.items():
+        print(f"{label}: {n} contacts from {path}")
+    print(f"Total: {total} entries (scrubbed, no emails/phones)")
+
+    n_chunks = (total + args.chunk_size - 1) // args.chunk_size
+    print(f"Will store as {n_chunks} chunks of ~{args.chunk_size}")
 
     if not args.confirm:
         print("\nDry run. Sample entries:")
-        for row in all_rows[:10]:
+        for row in sample:
             print(f"  {row}")
-        print(f"  ... and {len(all_rows) - 10} more")
+        print(f"  ... and {max(total - 10, 0)} more")
         print("\nRun with --confirm to write.")
         return
 
@@ -143,44 +134,50 @@ def main():
     # Ensure catcode exists
     writer.register_catcode(CATCODE, CATCODE_PARENT, CATCODE_LABEL)
 
-    # Delete old chunks if replacing
+    # Drop old bindings if replacing. Chunks are content-addressed, so unchanged
+    # ones are reused below; the rest are garbage collected at the end.
     if args.replace:
         cur = writer.conn.cursor()
-        cur.execute("DELETE FROM content WHERE catcode = %s AND source_file LIKE 'contacts-full-list-chunk-%'", (CATCODE,))
-        old_content = cur.rowcount
-        cur.execute("DELETE FROM bindings WHERE scope = 'golda' AND name = %s", (BINDING_NAME,))
+        cur.execute("""DELETE FROM bindings WHERE scope = 'golda' AND name_id =
+                       (SELECT id FROM names WHERE scope = 'golda' AND name = %s)
+                       RETURNING name_id""", (BINDING_NAME,))
         old_bindings = cur.rowcount
+        refresh_aliases(cur, [r[0] for r in cur.fetchall()])
         writer.conn.commit()
         cur.close()
-        print(f"Replaced: deleted {old_content} old chunks, {old_bindings} old bindings")
+        print(f"Replaced: deleted {old_bindings} old bindings")
+
+    writer.write_binding("golda", BINDING_NAME, "IS", "text",
+        "Full LinkedIn + Google contacts list (scrubbed, no PII)",
+        permanence="INTRINSIC", source_date="2025-02-15", catcode=CATCODE)
 
-    # Store chunks
-    content_ids = []
-    for i, chunk in enumerate(chunks):
-        content = f"LinkedIn and Google contacts (chunk {i + 1}/{len(chunks)})\n"
+    # Store chunks, each bound in the transaction that stores it so gc_content
+    # cannot collect it first
+    for i, chunk in enumerate(iter_chunks(iter_rows(paths), args.chunk_size)):
+        content = f"LinkedIn and Google contacts (chunk {i + 1}/{n_chunks})\n"
         content += "Scrubbed: no emails or phone numbers. For PII see CRM.\n\n"
         content += "\n".join(chunk)
-        cid = writer.store_content(
-            f"contacts-full-list-chunk-{i + 1}.csv",
-            content,
-            note_date="2025-02-15",
-            catcode=CATCODE,
-        )
-        content_ids.append(cid)
+        with writer.batch():
+            cid = writer.store_content(
+                f"contacts-full-list-chunk-{i + 1}.csv",
+                content,
+                note_date="2025-02-15",
+                catcode=CATCODE,
+                chunking="records",
+            )
+            if cid is None:
+                continue
+            writer.write_binding("golda", BINDING_NAME, "ABOUT", "content",
+                str(cid),
+                qualifier=f"contacts list chunk {i + 1}/{n_chunks}",
+                source_date="2025-02-15", catcode=CATCODE)
         print(f"  Chunk {i + 1}: {len(chunk)} entries -> content {cid}")
 
-    # Create bindings
-    writer.write_binding("golda", BINDING_NAME, "IS", "text",
-        "Full LinkedIn + Google contacts list (scrubbed, no PII)",
-        permanence="INTRINSIC", source_date="2025-02-15", catcode=CATCODE)
-    for i, cid in enumerate(content_ids):
-        writer.write_binding("golda", BINDING_NAME, "ABOUT", "content",
-            str(cid),
-            qualifier=f"contacts list chunk {i + 1}/{len(chunks)}",
-            source_date="2025-02-15", catcode=CATCODE)
+    if args.replace:
+        print(f"Garbage collected {writer.gc_content(CATCODE)} stale chunks")
 
     writer.close()
-    print(f"\nDone. {len(all_rows)} contacts in {len(chunks)} chunks.")
+    print(f"\nDone. {total} contacts in {n_chunks} chunks.")
     print(f"Search with: abra search \"healthcare\"")
     print(f"Read with:   abra read linkedin-contacts-full")
 
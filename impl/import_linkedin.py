@@ -6,186 +6,398 @@ PII (name, email, phone, company, title) → Odoo CRM
 Bindings (pet name, IS, HAS crm:odoo/contact/ID, HAS uri:linkedin) → pgvector
 All contacts placed at catcode a0010101 (golda/contacts).
 
-Deduplicates by email (primary) then by normalized name.
+Deduplicates with contact_dedup: exact email or LinkedIn URL, else fuzzy name
+match (nicknames, accents, typos) within phonetic/trigram/company blocks.
+Pet names are checked against existing golda names in one query. Existing Odoo partners
+are prefetched once into memory, so skipping known contacts costs no RPC.
 Dry run by default — use --confirm to write.
 
 Usage:
     python import_linkedin.py ~/Connections.csv ~/Contacts.csv
     python import_linkedin.py ~/Connections.csv ~/Contacts.csv --confirm
+    python import_linkedin.py --confirm --resume 20260301-141500-ab12   # after a crash
+
+Confirmed runs journal each contact's progress to ~/.abra/runs/<run id>.jsonl.
 """
-import csv
 import os
-import re
 import sys
+import time
+import queue
 import argparse
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
+from contact_csv import ContactCSV
+from contact_dedup import dedup, load_existing_names, match_existing
+from run_journal import RunJournal, contact_key
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
 CATCODE_CONTACTS = "a0010101"  # golda/contacts
-
-
-def normalize_name(first, last):
-    """Lowercase pet name: first-last, stripped of non-alpha."""
-    first = (first or "").strip().lower()
-    last = (last or "").strip().lower()
-    # Remove non-alpha except hyphens
-    first = re.sub(r'[^a-z-]', '', first)
-    last = re.sub(r'[^a-z-]', '', last)
-    if first and last:
-        return f"{first}-{last}"
-    return first or last or None
-
-
-def full_name(first, last):
-    first = (first or "").strip()
-    last = (last or "").strip()
-    if first and last:
-        return f"{first} {last}"
-    return first or last or None
-
-
-def parse_connections(path):
-    """Parse LinkedIn Connections.csv. Returns list of contact dicts."""
-    contacts = []
-    with open(path, encoding='utf-8') as f:
-        # Skip the notes header (lines before the actual CSV header)
-        for line in f:
-            if line.startswith("First Name,"):
-                break
-        reader = csv.DictReader(f, fieldnames=[
-            "First Name", "Last Name", "URL", "Email Address",
-            "Company", "Position", "Connected On"
-        ])
-        for row in reader:
-            first = (row.get("First Name") or "").strip()
-            last = (row.get("Last Name") or "").strip()
-            name = full_name(first, last)
-            if not name:
+CHUNK_SIZE = 100  # contacts per Odoo create call / binding transaction
+POLL_SECONDS = 0.5  # how often a blocked pipeline stage checks for an abort
+
+
+class PartnerIndex:
+    """In-memory index of existing Odoo partners, so existence checks cost no RPC.
+
+    Loaded once per import with paged search_read calls. Emails are always
+    indexed; full names and catcodes optionally.
+    """
+
+    def __init__(self, names=False):
+        self.names = names
+        self.by_email = {}
+        self.by_name = {}
+        self.by_catcode = {}
+
+    @classmethod
+    def load(cls, crm, names=False, catcodes=False, page_size=1000):
+        index = cls(names=names)
+        catcode_field = crm.config.get("catcode_field", "abra_catcode")
+        fields = ["email"] + (["name"] if names else []) + ([catcode_field] if catcodes else [])
+        for p in crm.iter_partners(fields=fields, page_size=page_size):
+            if p.get("email"):
+                index.by_email.setdefault(p["email"].strip().lower(), p["id"])
+            if names and p.get("name"):
+                index.by_name.setdefault(p["name"].strip().lower(), p["id"])
+            if catcodes and p.get(catcode_field):
+                index.by_catcode.setdefault(p[catcode_field], set()).add(p["id"])
+        return index
+
+    def find(self, c):
+        """Return the Odoo id of an existing partner matching contact c, or None.
+
+        Matches on email; contacts without an email fall back to the full name
+        when names were loaded.
+        """
+        if c.email:
+            return self.by_email.get(c.email.lower())
+        if self.names and c.name:
+            return self.by_name.get(c.name.lower())
+        return None
+
+    def add(self, c, odoo_id):
+        """Record a partner created during this run."""
+        if c.email:
+            self.by_email[c.email.lower()] = odoo_id
+        if self.names and c.name:
+            self.by_name.setdefault(c.name.lower(), odoo_id)
+        self.by_catcode.setdefault(CATCODE_CONTACTS, set()).add(odoo_id)
+
+    def __len__(self):
+        return len(self.by_email)
+
+
+def contact_vals(crm, c):
+    """res.partner values for a contact (PII lives here, never in pgvector)."""
+    return crm.contact_vals(
+        name=c.name,
+        email=c.email,
+        phone=c.phone,
+        company=c.company,
+        title=c.title,
+        catcode=CATCODE_CONTACTS,
+        notes=f"Imported from {c.source}.",
+    )
+
+
+def contact_bindings(c, odoo_id):
+    """pgvector bindings for a contact created in Odoo. Returns list of binding dicts."""
+    if not c.pet_name:
+        return []
+    rows = [
+        dict(scope="golda", name=c.pet_name, relationship="IS", target_type="text",
+             target_ref=c.name, permanence="INTRINSIC", catcode=CATCODE_CONTACTS),
+        dict(scope="golda", name=c.pet_name, relationship="HAS", target_type="uri",
+             target_ref=f"crm:odoo/contact/{odoo_id}", permanence="CURRENT", catcode=CATCODE_CONTACTS),
+    ]
+    if c.linkedin_url:
+        rows.append(dict(scope="golda", name=c.pet_name, relationship="HAS", target_type="uri",
+                         target_ref=c.linkedin_url, permanence="CURRENT", catcode=CATCODE_CONTACTS))
+    return rows
+
+
+class StageStats:
+    """Progress and throughput counters for one pipeline stage."""
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def work(self, items):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.busy += time.perf_counter() - start
+                self.items += items
+
+    def rate(self):
+        """Contacts per second of busy time, across all workers."""
+        return self.items * self.workers / self.busy if self.busy else 0.0
+
+    def summary(self, wall):
+        util = 100 * self.busy / (wall * self.workers) if wall else 0
+        return (f"  {self.name:9s} {self.items:7d} contacts  {self.workers} worker(s)  "
+                f"busy {self.busy:7.1f} s ({util:3.0f}%)  {self.rate():8.1f} contacts/s")
+
+
+class PipelineAborted(Exception):
+    """Raised in a pipeline stage once another stage has failed."""
+
+
+class ImportPipeline:
+    """Two stages joined by bounded queues, so Odoo and pgvector work at the same time.
+
+    main thread    classifies contacts (journal, in-memory partner index) and
+                   queues chunks that need creating
+    crm stage      N workers, one create_contacts call per chunk
+    bind stage     one writer; gathers finished chunks into batches of up to
+                   batch_size contacts and writes each batch in one transaction
+
+    Wall time approaches the slower stage instead of the sum of both. If any
+    stage fails, the others stop instead of waiting on a full or empty queue,
+    and run() re-raises the first error.
+    """
+
+    def __init__(self, crm, writer, index, journal, chunk_size=CHUNK_SIZE, workers=None,
+                 batch_size=None):
+        self.crm = crm
+        self.writer = writer
+        self.index = index
+        self.journal = journal
+        self.chunk_size = chunk_size
+        self.workers = workers or crm.concurrency
+        self.batch_size = batch_size or chunk_size * self.workers
+        self.crm_queue = queue.Queue(maxsize=self.workers * 2)
+        self.bind_queue = queue.Queue(maxsize=self.workers * 4)
+        self.crm_stats = StageStats("crm", self.workers)
+        self.bind_stats = StageStats("bindings")
+        self.total = 0
+        self.processed = 0
+        self.created = 0
+        self.skipped = 0
+        self.resumed = 0    # done in an earlier attempt (main thread)
+        self.rebound = 0    # created earlier, bindings written now (bind stage)
+        self.errors = 0
+        self._abort = threading.Event()
+        self._failure = None
+
+    def _put(self, q, item):
+        while True:
+            if self._abort.is_set():
+                raise PipelineAborted()
+            try:
+                return q.put(item, timeout=POLL_SECONDS)
+            except queue.Full:
+                pass
+
+    def _get(self, q, block=True):
+        while True:
+            if self._abort.is_set():
+                raise PipelineAborted()
+            try:
+                return q.get(timeout=POLL_SECONDS) if block else q.get_nowait()
+            except queue.Empty:
+                if not block:
+                    raise
+
+    def _stage(self, target):
+        """Thread body: on an error, remember it and stop the other stages."""
+        def body():
+            try:
+                target()
+            except PipelineAborted:
+                pass
+            except BaseException as e:
+                if self._failure is None:
+                    self._failure = e
+                self._abort.set()
+        return threading.Thread(target=body, daemon=True)
+
+    def run(self, contacts):
+        self.total = len(contacts)
+        start = time.perf_counter()
+        crm_threads = [self._stage(self._crm_worker) for _ in range(self.workers)]
+        bind_thread = self._stage(self._bind_worker)
+        for t in crm_threads + [bind_thread]:
+            t.start()
+        try:
+            self._feed(contacts, crm_threads, bind_thread)
+        except PipelineAborted:
+            # Let the other stages finish what they hold before reporting
+            for t in crm_threads + [bind_thread]:
+                t.join()
+        except BaseException:
+            self._abort.set()
+            raise
+        finally:
+            self.journal.flush()
+        if self._failure is not None:
+            print(f"Import stopped: {self._failure!r}")
+            print(f"Continue with: --confirm --resume {self.journal.run_id}")
+            raise self._failure
+
+        wall = time.perf_counter() - start
+        print(f"\nDone in {wall:.1f} s: {self.created} created, {self.skipped} already existed, "
+              f"{self.resumed} completed earlier, {self.rebound} finished from earlier attempts, "
+              f"{self.errors} errors")
+        print(self.crm_stats.summary(wall))
+        print(self.bind_stats.summary(wall))
+        if self.errors:
+            print(f"Retry the failures with: --confirm --resume {self.journal.run_id}")
+
+    def _feed(self, contacts, crm_threads, bind_thread):
+        to_create = []
+        bind_only = []
+        for c in contacts:
+            key = contact_key(c)
+            if self.journal.done(key):
+                self.resumed += 1
                 continue
-            contacts.append({
-                "name": name,
-                "pet_name": normalize_name(first, last),
-                "email": (row.get("Email Address") or "").strip() or None,
-                "company": (row.get("Company") or "").strip() or None,
-                "title": (row.get("Position") or "").strip() or None,
-                "phone": None,
-                "linkedin_url": (row.get("URL") or "").strip() or None,
-                "source": "linkedin",
-            })
-    return contacts
-
-
-def parse_contacts(path):
-    """Parse Google/LinkedIn Contacts.csv. Returns list of contact dicts."""
-    contacts = []
-    with open(path, encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            first = (row.get("FirstName") or "").strip()
-            last = (row.get("LastName") or "").strip()
-            name = full_name(first, last)
-            emails_raw = (row.get("Emails") or "").strip()
-            # Take first email from comma-separated list
-            emails = [e.strip() for e in emails_raw.split(",") if e.strip()]
-            email = emails[0] if emails else None
-            company = (row.get("Companies") or "").strip()
-            if company == "null":
-                company = None
-            phone_raw = (row.get("PhoneNumbers") or "").strip()
-            phones = [p.strip() for p in phone_raw.split(",") if p.strip()]
-            phone = phones[0] if phones else None
-            linkedin_url = None
-            profiles = (row.get("Profiles") or "").strip()
-            if "linkedin.com" in profiles:
-                for part in profiles.split(","):
-                    part = part.strip()
-                    if "linkedin.com" in part:
-                        linkedin_url = part
-                        break
-            # Skip entries with no name and no email
-            if not name and not email:
+            # Created in the CRM by an earlier attempt: only the bindings are missing
+            odoo_id = self.journal.odoo_id(key)
+            if odoo_id:
+                bind_only.append((c, odoo_id, None, False))
+            else:
+                # Check if contact already exists in Odoo (in memory, no RPC)
+                existing_id = self.index.find(c)
+                if existing_id:
+                    self.journal.record(key, "exists", odoo_id=existing_id)
+                    self.skipped += 1
+                else:
+                    to_create.append(c)
+            if len(to_create) >= self.chunk_size:
+                self._put(self.crm_queue, to_create)
+                to_create = []
+            if len(bind_only) >= self.chunk_size:
+                self._put(self.bind_queue, bind_only)
+                bind_only = []
+        if to_create:
+            self._put(self.crm_queue, to_create)
+        if bind_only:
+            self._put(self.bind_queue, bind_only)
+
+        for _ in crm_threads:
+            self._put(self.crm_queue, None)
+        for t in crm_threads:
+            t.join()
+        if self._abort.is_set():
+            raise PipelineAborted()
+        self._put(self.bind_queue, None)
+        bind_thread.join()
+
+    def _crm_worker(self):
+        while True:
+            chunk = self._get(self.crm_queue)
+            if chunk is None:
+                return
+            failures = {}
+            with self.crm_stats.work(len(chunk)):
+                try:
+                    # Create in Odoo (PII goes here), one call per chunk
+                    ids = self.crm.create_contacts([contact_vals(self.crm, c) for c in chunk],
+                                                   chunk_size=self.chunk_size, errors=failures)
+                except Exception as e:
+                    ids = [None] * len(chunk)
+                    failures = {i: str(e) for i in range(len(chunk))}
+            results = []
+            for i, (c, odoo_id) in enumerate(zip(chunk, ids)):
+                if odoo_id is not None:
+                    self.index.add(c, odoo_id)
+                    self.journal.record(contact_key(c), "crm_created", odoo_id=odoo_id)
+                results.append((c, odoo_id, failures.get(i), True))
+            # CRM ids are durable before the chunk is queued for bindings, so a
+            # crash never creates the same partner twice on resume
+            self.journal.flush()
+            self._put(self.bind_queue, results)
+
+    def _bind_worker(self):
+        finished = False
+        while not finished:
+            batch = []
+            item = self._get(self.bind_queue)
+            while True:
+                if item is None:
+                    finished = True
+                    break
+                batch.extend(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._get(self.bind_queue, block=False)
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        pending = []
+        for c, odoo_id, error, new in batch:
+            key = contact_key(c)
+            if error:
+                print(f"  ERROR on {c.name}: {error}")
+                self.journal.record(key, "failed", error=error)
+                self.errors += 1
                 continue
-            # Use email-derived name as fallback
-            if not name and email:
-                name = email.split("@")[0]
-            pet = normalize_name(first, last)
-            if not pet and email:
-                pet = re.sub(r'[^a-z0-9-]', '', email.split("@")[0].lower()) or None
-            contacts.append({
-                "name": name,
-                "pet_name": pet,
-                "email": email,
-                "company": company,
-                "title": (row.get("Title") or "").strip() or None,
-                "phone": phone,
-                "linkedin_url": linkedin_url,
-                "source": row.get("Source", "unknown").strip().lower(),
-            })
-    return contacts
-
-
-def dedup(all_contacts):
-    """Deduplicate by email (primary) then normalized name. LinkedIn source wins on merge."""
-    by_email = {}
-    by_name = {}
-    deduped = []
-
-    for c in all_contacts:
-        email = (c["email"] or "").lower()
-        pet = c["pet_name"]
-
-        if email and email in by_email:
-            # Merge: prefer linkedin source for URLs, keep richer data
-            existing = by_email[email]
-            if not existing["linkedin_url"] and c["linkedin_url"]:
-                existing["linkedin_url"] = c["linkedin_url"]
-            if not existing["company"] and c["company"]:
-                existing["company"] = c["company"]
-            if not existing["title"] and c["title"]:
-                existing["title"] = c["title"]
-            if not existing["phone"] and c["phone"]:
-                existing["phone"] = c["phone"]
-            if c["source"] == "linkedin" and existing["source"] != "linkedin":
-                existing["source"] = "linkedin"
-            continue
-
-        if not email and pet and pet in by_name:
-            existing = by_name[pet]
-            if not existing["linkedin_url"] and c["linkedin_url"]:
-                existing["linkedin_url"] = c["linkedin_url"]
-            if not existing["company"] and c["company"]:
-                existing["company"] = c["company"]
-            if not existing["title"] and c["title"]:
-                existing["title"] = c["title"]
-            continue
-
-        deduped.append(c)
-        if email:
-            by_email[email] = c
-        if pet:
-            by_name[pet] = c
-
-    return deduped
-
-
-def do_import(contacts, dry_run=True):
-    """Import contacts to Odoo CRM + pgvector bindings."""
+            pending.append((c, odoo_id, new))
+
+        with self.bind_stats.work(len(pending)):
+            try:
+                # Create bindings in pgvector (no PII), one transaction per batch;
+                # batch() rolls a failed one back so the next batch starts clean
+                with self.writer.batch():
+                    self.writer.write_bindings([row for c, odoo_id, _ in pending
+                                                for row in contact_bindings(c, odoo_id)])
+            except Exception as e:
+                print(f"  ERROR writing bindings for {len(pending)} contacts: {e}")
+                for c, odoo_id, _ in pending:
+                    self.journal.record(contact_key(c), "failed", odoo_id=odoo_id, error=str(e))
+                self.errors += len(pending)
+                pending = []
+        for c, odoo_id, new in pending:
+            self.journal.record(contact_key(c), "bindings_written", odoo_id=odoo_id)
+            if new:
+                self.created += 1
+            else:
+                self.rebound += 1
+        self.journal.flush()
+
+        self.processed += len(batch)
+        print(f"  ... {self.processed + self.skipped + self.resumed}/{self.total} processed "
+              f"({self.created} created, {self.skipped} skipped, {self.errors} errors)  "
+              f"crm {self.crm_stats.rate():.0f}/s, bindings {self.bind_stats.rate():.0f}/s")
+
+
+def do_import(contacts, dry_run=True, chunk_size=CHUNK_SIZE, match_names=False, journal=None,
+              workers=None):
+    """Import contacts to Odoo CRM + pgvector bindings through an ImportPipeline.
+
+    Per-contact progress goes to journal (a RunJournal); contacts the journal
+    already has as done are skipped, so passing a reopened journal resumes.
+    """
     if dry_run:
         print(f"\n  DRY RUN — {len(contacts)} contacts to import\n")
-        no_email = sum(1 for c in contacts if not c["email"])
-        no_name = sum(1 for c in contacts if not c["pet_name"])
+        no_email = sum(1 for c in contacts if not c.email)
+        no_name = sum(1 for c in contacts if not c.pet_name)
         sources = {}
         for c in contacts:
-            sources[c["source"]] = sources.get(c["source"], 0) + 1
+            sources[c.source] = sources.get(c.source, 0) + 1
         print(f"  Sources: {sources}")
         print(f"  Missing email: {no_email}")
         print(f"  Missing pet name: {no_name}")
         print(f"\n  First 20:")
         for c in contacts[:20]:
-            email_str = c['email'] or '(no email)'
-            company_str = c['company'] or ''
-            print(f"    {c['pet_name'] or '???':30s} {email_str:40s} {company_str}")
+            email_str = c.email or '(no email)'
+            company_str = c.company or ''
+            print(f"    {c.pet_name or '???':30s} {email_str:40s} {company_str}")
         print(f"\n  Use --confirm to write to Odoo + pgvector.")
         return
 
@@ -195,100 +407,89 @@ def do_import(contacts, dry_run=True):
     from connector import OdooConnector
     from write_binding import AbraWriter
 
-    crm = OdooConnector()
+    crm = OdooConnector(concurrency=workers)
     if not crm.is_ready():
         print("ERROR: CRM not ready. Check ~/.abra/sources.yaml")
         sys.exit(1)
 
-    writer = AbraWriter()
-    created = 0
-    skipped = 0
-    errors = 0
-
-    for i, c in enumerate(contacts):
-        try:
-            # Check if contact already exists in Odoo (by email)
-            existing = None
-            if c["email"]:
-                found = crm.find_contact(email=c["email"])
-                if found:
-                    existing = found[0]
-
-            if existing:
-                skipped += 1
-                continue
+    if journal is None:
+        journal = RunJournal.create({"chunk_size": chunk_size, "match_names": match_names})
+    print(f"  Run ID: {journal.run_id} (journal {journal.path})")
 
-            # Create in Odoo (PII goes here)
-            odoo_id = crm.create_contact(
-                name=c["name"],
-                email=c["email"],
-                phone=c["phone"],
-                company=c["company"],
-                catcode=CATCODE_CONTACTS,
-                notes=f"Imported from {c['source']}. Title: {c.get('title') or 'n/a'}",
-            )
-            if isinstance(odoo_id, list):
-                odoo_id = odoo_id[0]
-
-            # Create bindings in pgvector (no PII)
-            if c["pet_name"]:
-                writer.write_binding("golda", c["pet_name"], "IS", "text",
-                                     c["name"], permanence="INTRINSIC",
-                                     catcode=CATCODE_CONTACTS)
-                writer.write_binding("golda", c["pet_name"], "HAS", "uri",
-                                     f"crm:odoo/contact/{odoo_id}",
-                                     permanence="CURRENT", catcode=CATCODE_CONTACTS)
-                if c["linkedin_url"]:
-                    writer.write_binding("golda", c["pet_name"], "HAS", "uri",
-                                         c["linkedin_url"],
-                                         permanence="CURRENT", catcode=CATCODE_CONTACTS)
-
-            created += 1
-            if (i + 1) % 100 == 0:
-                print(f"  ... {i + 1}/{len(contacts)} processed ({created} created, {skipped} skipped)")
-
-        except Exception as e:
-            print(f"  ERROR on {c['name']}: {e}")
-            errors += 1
+    index = PartnerIndex.load(crm, names=match_names)
+    print(f"  Prefetched {len(index)} partner emails from Odoo")
 
+    writer = AbraWriter()
+    if journal.states:
+        print(f"  Resuming run {journal.run_id}: {journal.counts()}")
+    ImportPipeline(crm, writer, index, journal, chunk_size, workers=crm.concurrency).run(contacts)
     writer.close()
-    print(f"\nDone: {created} created, {skipped} already existed, {errors} errors")
+    crm.close()
+    print("Odoo call latency:")
+    print(crm.latency_summary())
 
 
 def main():
     parser = argparse.ArgumentParser(description="Import LinkedIn + Google contacts into Odoo + abra")
-    parser.add_argument("files", nargs="+", help="CSV files to import (Connections.csv and/or Contacts.csv)")
+    parser.add_argument("files", nargs="*", help="CSV files to import (Connections.csv and/or Contacts.csv)")
     parser.add_argument("--confirm", action="store_true", help="Actually write (default is dry run)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"Contacts per Odoo create call (default {CHUNK_SIZE})")
+    parser.add_argument("--match-names", action="store_true",
+                        help="Treat an existing Odoo partner with the same full name as a match for contacts without email")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent Odoo create calls (default: sinks.crm concurrency, else 4)")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                        help="Continue an interrupted run from ~/.abra/runs, retrying only failures")
     args = parser.parse_args()
 
+    journal = None
+    if args.resume:
+        try:
+            journal = RunJournal.open(args.resume)
+        except FileNotFoundError:
+            print(f"No run journal for {args.resume} in ~/.abra/runs")
+            sys.exit(1)
+        # Same inputs as the original run unless given explicitly
+        args.files = args.files or journal.header.get("files", [])
+        args.chunk_size = journal.header.get("chunk_size", args.chunk_size)
+        args.match_names = args.match_names or journal.header.get("match_names", False)
+    if not args.files:
+        parser.error("no CSV files given")
+    files = [os.path.abspath(os.path.expanduser(p)) for p in args.files]
+
     all_contacts = []
-    for path in args.files:
-        path = os.path.expanduser(path)
+    for path in files:
         if not os.path.exists(path):
             print(f"File not found: {path}")
             sys.exit(1)
-
-        # Detect format by header
-        with open(path, encoding='utf-8') as f:
-            header_area = f.read(500)
-
-        if "First Name,Last Name,URL,Email Address" in header_area:
-            contacts = parse_connections(path)
-            print(f"Parsed {len(contacts)} from {path} (LinkedIn Connections format)")
-        elif "Source,FirstName,LastName" in header_area:
-            contacts = parse_contacts(path)
-            print(f"Parsed {len(contacts)} from {path} (Google/LinkedIn Contacts format)")
-        else:
-            print(f"Unknown CSV format in {path}")
+        try:
+            with ContactCSV(path) as src:
+                contacts = list(src)
+        except ValueError as e:
+            print(e)
             sys.exit(1)
-
+        print(f"Parsed {len(contacts)} from {path} ({src.label})")
         all_contacts.extend(contacts)
 
     print(f"Total before dedup: {len(all_contacts)}")
     all_contacts = dedup(all_contacts)
     print(f"Total after dedup: {len(all_contacts)}")
 
-    do_import(all_contacts, dry_run=not args.confirm)
+    try:
+        existing = load_existing_names("golda")
+    except Exception as e:
+        print(f"Could not load existing golda names ({e}); pet names not checked")
+    else:
+        matched, renamed = match_existing(all_contacts, existing)
+        print(f"Existing golda names: {len(existing)} ({matched} contacts already known, "
+              f"{renamed} pet names numbered to avoid a clash)")
+
+    if args.confirm and journal is None:
+        journal = RunJournal.create({"files": files, "chunk_size": args.chunk_size,
+                                     "match_names": args.match_names})
+    do_import(all_contacts, dry_run=not args.confirm, chunk_size=args.chunk_size,
+              match_names=args.match_names, journal=journal, workers=args.workers)
 
 
 if __name__ == "__main__":
@@ -16,14 +16,21 @@ Usage:
 
     # Also load the LinkedClaims spec
     .venv/bin/python import_projects_to_pgvector.py --confirm --include-spec
+
+    # Only re-import files added, changed or removed since the last run
+    # (needs one --replace run first to seed the source manifest)
+    .venv/bin/python import_projects_to_pgvector.py --incremental
+    .venv/bin/python import_projects_to_pgvector.py --incremental --confirm
 """
 import os
 import sys
+import time
 import argparse
 import glob
+from functools import partial
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'pgvector'))
-from write_binding import AbraWriter
+from write_binding import AbraWriter, content_hash
 
 PROJECTS_DIR = "/opt/shared/projects/Active"
 IDEAS_DIR = "/opt/shared/projects/Ideas"
@@ -36,33 +43,48 @@ CC_PROJECTS = "a001030201"        # linkedtrust/2026/projects
 CC_IDEAS = "a001030202"           # linkedtrust/2026/ideas
 CC_SPECS = "a001030203"           # linkedtrust/2026/specs
 
+# source_manifest sources, one per kind of tracked file
+SRC_PROJECTS = "projects/main"
+SRC_EXTRAS = "projects/extra"
+SRC_IDEAS = "projects/ideas"
+SRC_SPECS = "projects/specs"
 
-def load_project_files(projects_dir):
-    """Load all MAIN.md files from Active projects. Returns list of (name, filepath, content)."""
+
+def read_file(path):
+    with open(path) as f:
+        return f.read()
+
+
+def read_file_stat(path):
+    """(content, stat), statted before reading: if the file is edited in
+    between, the manifest's stat is the older one and the next incremental
+    run re-hashes the file instead of skipping it."""
+    with open(path) as f:
+        st = os.fstat(f.fileno())
+        return f.read(), st
+
+
+def find_project_files(projects_dir):
+    """Find each Active project's MAIN.md (or first .md). Returns list of (name, filepath)."""
     results = []
     for proj_dir in sorted(os.listdir(projects_dir)):
         proj_path = os.path.join(projects_dir, proj_dir)
         if not os.path.isdir(proj_path):
             continue
-        # Load MAIN.md
         main_md = os.path.join(proj_path, "MAIN.md")
         if os.path.exists(main_md):
-            with open(main_md) as f:
-                content = f.read()
-            results.append((proj_dir, main_md, content))
+            results.append((proj_dir, main_md))
         else:
             # Check for any .md files
             md_files = glob.glob(os.path.join(proj_path, "*.md"))
             if md_files:
                 # Use first .md file found
-                with open(md_files[0]) as f:
-                    content = f.read()
-                results.append((proj_dir, md_files[0], content))
+                results.append((proj_dir, md_files[0]))
     return results
 
 
-def load_extra_project_files(projects_dir):
-    """Load additional .md files beyond MAIN.md for projects that have them."""
+def find_extra_project_files(projects_dir):
+    """Find additional .md files beyond MAIN.md. Returns list of (project, basename, filepath)."""
     results = []
     for proj_dir in sorted(os.listdir(projects_dir)):
         proj_path = os.path.join(projects_dir, proj_dir)
@@ -72,40 +94,48 @@ def load_extra_project_files(projects_dir):
             basename = os.path.basename(md_file)
             if basename == "MAIN.md":
                 continue
-            with open(md_file) as f:
-                content = f.read()
-            results.append((proj_dir, basename, md_file, content))
+            results.append((proj_dir, basename, md_file))
     return results
 
 
-def load_idea_files(ideas_dir):
-    """Load idea markdown files. Returns list of (name, filepath, content)."""
+def find_idea_files(ideas_dir):
+    """Find idea markdown files. Returns list of (name, filepath)."""
     results = []
     for item in sorted(os.listdir(ideas_dir)):
         path = os.path.join(ideas_dir, item)
         if item in ("README.md", "index.md"):
             continue
         if item.endswith(".md") and os.path.isfile(path):
-            name = item.replace(".md", "")
-            with open(path) as f:
-                content = f.read()
-            results.append((name, path, content))
+            results.append((item.replace(".md", ""), path))
         elif os.path.isdir(path):
             # Check for MAIN.md or any .md inside
             main_md = os.path.join(path, "MAIN.md")
             if os.path.exists(main_md):
-                with open(main_md) as f:
-                    content = f.read()
-                results.append((item, main_md, content))
+                results.append((item, main_md))
             else:
                 md_files = glob.glob(os.path.join(path, "*.md"))
                 if md_files:
-                    with open(md_files[0]) as f:
-                        content = f.read()
-                    results.append((item, md_files[0], content))
+                    results.append((item, md_files[0]))
     return results
 
 
+def load_project_files(projects_dir):
+    """Load all MAIN.md files from Active projects. Returns list of (name, filepath, content, stat)."""
+    return [(name, path, *read_file_stat(path)) for name, path in find_project_files(projects_dir)]
+
+
+def load_extra_project_files(projects_dir):
+    """Load additional .md files beyond MAIN.md for projects that have them.
+    Returns list of (project, basename, filepath, content, stat)."""
+    return [(proj, basename, path, *read_file_stat(path))
+            for proj, basename, path in find_extra_project_files(projects_dir)]
+
+
+def load_idea_files(ideas_dir):
+    """Load idea markdown files. Returns list of (name, filepath, content, stat)."""
+    return [(name, path, *read_file_stat(path)) for name, path in find_idea_files(ideas_dir)]
+
+
 def extract_summary(content, max_lines=3):
     """Extract a short summary from markdown content (first meaningful paragraph)."""
     lines = content.split('\n')
@@ -129,37 +159,210 @@ def extract_summary(content, max_lines=3):
     return ' '.join(summary_lines)[:250]
 
 
+def store_project(writer, content, name):
+    """Store a project's main file and bind it. Returns (content_id, binding_ids)."""
+    summary = extract_summary(content)
+    source_file = f"projects/Active/{name}/MAIN.md"
+    # One transaction, so gc_content cannot collect the blob before it is bound
+    with writer.batch():
+        cid = writer.store_content(source_file, content, note_date="2026-02-15", catcode=CC_PROJECTS)
+        if cid is None:
+            return None, []
+        bids = [
+            # Binding: project name IS description
+            writer.write_binding("linkedtrust", name, "IS", "text",
+                summary[:250], permanence="CURRENT", source_date="2026-02-15", catcode=CC_PROJECTS),
+            # Binding: project ABOUT content
+            writer.write_binding("linkedtrust", name, "ABOUT", "content",
+                str(cid), qualifier="project description",
+                source_date="2026-02-15", catcode=CC_PROJECTS),
+        ]
+        return cid, [b for b in bids if b]
+
+
+def store_extra(writer, content, proj, basename):
+    """Store an extra project file and bind it to its project."""
+    source_file = f"projects/Active/{proj}/{basename}"
+    label = basename.replace(".md", "").replace("-", " ")
+    with writer.batch():
+        cid = writer.store_content(source_file, content, note_date="2026-02-15", catcode=CC_PROJECTS)
+        if cid is None:
+            return None, []
+        bid = writer.write_binding("linkedtrust", proj, "ABOUT", "content",
+            str(cid), qualifier=label,
+            source_date="2026-02-15", catcode=CC_PROJECTS)
+        return cid, [bid] if bid else []
+
+
+def store_idea(writer, content, name, path):
+    """Store an idea file and bind it."""
+    summary = extract_summary(content)
+    rel_path = os.path.relpath(path, "/opt/shared/projects")
+    with writer.batch():
+        cid = writer.store_content(rel_path, content, note_date="2026-02-15", catcode=CC_IDEAS)
+        if cid is None:
+            return None, []
+        bids = [
+            writer.write_binding("linkedtrust", name, "IS", "text",
+                summary[:250], permanence="CURRENT", source_date="2026-02-15", catcode=CC_IDEAS),
+            writer.write_binding("linkedtrust", name, "ABOUT", "content",
+                str(cid), qualifier="idea description",
+                source_date="2026-02-15", catcode=CC_IDEAS),
+        ]
+        return cid, [b for b in bids if b]
+
+
+def store_spec(writer, content):
+    """Store the LinkedClaims spec."""
+    with writer.batch():
+        cid = writer.store_content("LinkedClaims/spec.md", content,
+            note_date="2026-02-15", catcode=CC_SPECS)
+        if cid is None:
+            return None, []
+        bid = writer.write_binding("linkedtrust", "linkedclaims", "ABOUT", "content",
+            str(cid), qualifier="LinkedClaims specification (draft)",
+            source_date="2026-02-15", catcode=CC_SPECS)
+        return cid, [bid] if bid else []
+
+
+def record_file(writer, source, path, st, content, content_id, binding_ids):
+    """Record an imported file in the source manifest.
+
+    st is the stat taken before content was read, never a fresh one.
+    """
+    writer.record_manifest(source, path, st.st_mtime, st.st_size,
+                           content_hash(content), content_id, binding_ids)
+
+
+def sync_items(include_spec):
+    """Every file the importer tracks, without reading any of them.
+
+    Returns list of (manifest_source, path, store) where store(writer, content)
+    returns (content_id, binding_ids).
+    """
+    items = []
+    for name, path in find_project_files(PROJECTS_DIR):
+        items.append((SRC_PROJECTS, path, partial(store_project, name=name)))
+    for proj, basename, path in find_extra_project_files(PROJECTS_DIR):
+        items.append((SRC_EXTRAS, path, partial(store_extra, proj=proj, basename=basename)))
+    for name, path in find_idea_files(IDEAS_DIR):
+        items.append((SRC_IDEAS, path, partial(store_idea, name=name, path=path)))
+    if include_spec and os.path.exists(LINKEDCLAIMS_SPEC):
+        items.append((SRC_SPECS, LINKEDCLAIMS_SPEC, store_spec))
+    return items
+
+
+def plan_sync(items, manifests):
+    """Diff tracked files against the manifest.
+
+    Files whose mtime and size match are skipped without being read. The rest
+    are hashed: an unchanged hash only refreshes the stat, anything else is
+    re-stored. Returns (changed, touched, removed):
+      changed: list of (source, path, st, content, store, old_entry or None)
+      touched: list of (source, path, st, content, entry)
+      removed: list of (source, path, entry)
+    """
+    changed, touched = [], []
+    seen = set()
+    for source, path, store in items:
+        seen.add((source, path))
+        entry = manifests[source].get(path)
+        st = os.stat(path)
+        if entry and entry.mtime == st.st_mtime and entry.size == st.st_size:
+            continue
+        content = read_file(path)
+        if entry and entry.content_hash == content_hash(content):
+            touched.append((source, path, st, content, entry))
+        else:
+            changed.append((source, path, st, content, store, entry))
+    removed = [(source, path, entry)
+               for source, entries in manifests.items()
+               for path, entry in entries.items()
+               if (source, path) not in seen]
+    return changed, touched, removed
+
+
+def sync_incremental(args):
+    """Re-store and rebind only the files added, changed or removed since the last sync."""
+    started = time.monotonic()
+    writer = AbraWriter()
+    sources = [SRC_PROJECTS, SRC_EXTRAS, SRC_IDEAS] + ([SRC_SPECS] if args.include_spec else [])
+    manifests = {source: writer.load_manifest(source) for source in sources}
+    if not any(manifests.values()):
+        print("No manifest yet. Seed it once with --confirm --replace, then use --incremental.")
+        writer.close()
+        sys.exit(1)
+
+    changed, touched, removed = plan_sync(sync_items(args.include_spec), manifests)
+    print(f"Incremental sync: {len(changed)} added/changed, {len(removed)} removed, "
+          f"{len(touched)} touched (content unchanged)")
+    for source, path, st, content, store, entry in changed:
+        print(f"  {'changed' if entry else 'added'}: {path}")
+    for source, path, entry in removed:
+        print(f"  removed: {path}")
+
+    if not args.confirm:
+        writer.close()
+        print("\nDry run. Run with --confirm to write.")
+        return
+
+    for source, path, st, content, store, entry in changed:
+        if entry:
+            writer.delete_bindings(entry.binding_ids)
+        cid, bids = store(writer, content)
+        record_file(writer, source, path, st, content, cid, bids)
+    for source, path, st, content, entry in touched:
+        record_file(writer, source, path, st, content, entry.content_id, entry.binding_ids)
+    for source, path, entry in removed:
+        writer.delete_bindings(entry.binding_ids)
+        writer.forget_manifest(source, path)
+
+    if changed or removed:
+        collected = sum(writer.gc_content(cc) for cc in (CC_PROJECTS, CC_IDEAS, CC_SPECS))
+        if collected:
+            print(f"Garbage collected {collected} stale content blobs")
+    writer.close()
+    print(f"\nSynced in {time.monotonic() - started:.2f}s")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Import projects and ideas to pgvector")
     parser.add_argument("--confirm", action="store_true", help="Actually write (default is dry run)")
     parser.add_argument("--replace", action="store_true", help="Delete existing project/idea content first")
     parser.add_argument("--include-spec", action="store_true", help="Also load LinkedClaims spec.md")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only sync files added, changed or removed since the last run")
     args = parser.parse_args()
 
+    if args.incremental:
+        if args.replace:
+            parser.error("--incremental and --replace are mutually exclusive")
+        sync_incremental(args)
+        return
+
     # Load data
     projects = load_project_files(PROJECTS_DIR)
     extras = load_extra_project_files(PROJECTS_DIR)
     ideas = load_idea_files(IDEAS_DIR)
 
     print(f"Active projects: {len(projects)}")
-    for name, path, content in projects:
+    for name, path, content, _ in projects:
         summary = extract_summary(content)
         print(f"  {name}: {summary[:80]}...")
 
     if extras:
         print(f"\nExtra project files: {len(extras)}")
-        for proj, basename, path, content in extras:
+        for proj, basename, path, content, _ in extras:
             print(f"  {proj}/{basename} ({len(content)} chars)")
 
     print(f"\nIdeas: {len(ideas)}")
-    for name, path, content in ideas:
+    for name, path, content, _ in ideas:
         summary = extract_summary(content)
         print(f"  {name}: {summary[:80]}...")
 
     if args.include_spec:
         if os.path.exists(LINKEDCLAIMS_SPEC):
-            with open(LINKEDCLAIMS_SPEC) as f:
-                spec_content = f.read()
+            spec_content, spec_stat = read_file_stat(LINKEDCLAIMS_SPEC)
             print(f"\nLinkedClaims spec: {len(spec_content)} chars")
         else:
             print(f"\nWARNING: spec not found at {LINKEDCLAIMS_SPEC}")
@@ -174,87 +377,62 @@ def main():
     writer = AbraWriter()
 
     # Register catcodes
-    writer.register_catcode(CC_2026, CC_LT, "linkedtrust/2026")
-    writer.register_catcode(CC_PROJECTS, CC_2026, "linkedtrust/2026/projects")
-    writer.register_catcode(CC_IDEAS, CC_2026, "linkedtrust/2026/ideas")
+    catcodes = [
+        (CC_2026, CC_LT, "linkedtrust/2026"),
+        (CC_PROJECTS, CC_2026, "linkedtrust/2026/projects"),
+        (CC_IDEAS, CC_2026, "linkedtrust/2026/ideas"),
+    ]
     if spec_content:
-        writer.register_catcode(CC_SPECS, CC_2026, "linkedtrust/2026/specs")
+        catcodes.append((CC_SPECS, CC_2026, "linkedtrust/2026/specs"))
+    writer.register_catcodes(catcodes)
     print("Catcodes registered.")
 
-    # Delete old if replacing
+    # Drop old bindings if replacing. Content is content-addressed, so unchanged
+    # files reuse their existing rows; orphaned blobs are collected at the end.
     if args.replace:
-        cur = writer.conn.cursor()
-        cur.execute("DELETE FROM content WHERE catcode LIKE %s", (f"{CC_PROJECTS}%",))
-        p_content = cur.rowcount
-        cur.execute("DELETE FROM bindings WHERE catcode LIKE %s", (f"{CC_PROJECTS}%",))
-        p_bindings = cur.rowcount
-        cur.execute("DELETE FROM content WHERE catcode LIKE %s", (f"{CC_IDEAS}%",))
-        i_content = cur.rowcount
-        cur.execute("DELETE FROM bindings WHERE catcode LIKE %s", (f"{CC_IDEAS}%",))
-        i_bindings = cur.rowcount
-        if spec_content:
-            cur.execute("DELETE FROM content WHERE catcode LIKE %s", (f"{CC_SPECS}%",))
-            s_content = cur.rowcount
-            cur.execute("DELETE FROM bindings WHERE catcode LIKE %s", (f"{CC_SPECS}%",))
-            s_bindings = cur.rowcount
-        else:
-            s_content = s_bindings = 0
-        writer.conn.commit()
-        cur.close()
-        print(f"Replaced: deleted {p_content + i_content + s_content} content, {p_bindings + i_bindings + s_bindings} bindings")
+        # Batched, one short transaction per batch, so concurrent queries and
+        # writers are not stuck behind the delete
+        prefixes = (CC_PROJECTS, CC_IDEAS) + ((CC_SPECS,) if spec_content else ())
+        deleted = sum(writer.delete_bindings_under(cc, collect=False)[0] for cc in prefixes)
+        for source in (SRC_PROJECTS, SRC_EXTRAS, SRC_IDEAS) + ((SRC_SPECS,) if spec_content else ()):
+            writer.forget_manifest(source)
+        print(f"Replaced: deleted {deleted} bindings")
 
     # Store projects
     print("\nLoading projects...")
-    for name, path, content in projects:
-        summary = extract_summary(content)
-        source_file = f"projects/Active/{name}/MAIN.md"
-        cid = writer.store_content(source_file, content, note_date="2026-02-15", catcode=CC_PROJECTS)
-
-        # Binding: project name IS description
-        writer.write_binding("linkedtrust", name, "IS", "text",
-            summary[:250], permanence="CURRENT", source_date="2026-02-15", catcode=CC_PROJECTS)
-        # Binding: project ABOUT content
-        writer.write_binding("linkedtrust", name, "ABOUT", "content",
-            str(cid), qualifier="project description",
-            source_date="2026-02-15", catcode=CC_PROJECTS)
+    for name, path, content, st in projects:
+        cid, bids = store_project(writer, content, name)
+        record_file(writer, SRC_PROJECTS, path, st, content, cid, bids)
         print(f"  {name} -> content {cid}")
 
     # Store extra project files
     if extras:
         print("\nLoading extra project files...")
-        for proj, basename, path, content in extras:
-            source_file = f"projects/Active/{proj}/{basename}"
-            label = basename.replace(".md", "").replace("-", " ")
-            cid = writer.store_content(source_file, content, note_date="2026-02-15", catcode=CC_PROJECTS)
-            writer.write_binding("linkedtrust", proj, "ABOUT", "content",
-                str(cid), qualifier=label,
-                source_date="2026-02-15", catcode=CC_PROJECTS)
+        for proj, basename, path, content, st in extras:
+            cid, bids = store_extra(writer, content, proj, basename)
+            record_file(writer, SRC_EXTRAS, path, st, content, cid, bids)
             print(f"  {proj}/{basename} -> content {cid}")
 
     # Store ideas
     print("\nLoading ideas...")
-    for name, path, content in ideas:
-        summary = extract_summary(content)
-        rel_path = os.path.relpath(path, "/opt/shared/projects")
-        cid = writer.store_content(rel_path, content, note_date="2026-02-15", catcode=CC_IDEAS)
-
-        writer.write_binding("linkedtrust", name, "IS", "text",
-            summary[:250], permanence="CURRENT", source_date="2026-02-15", catcode=CC_IDEAS)
-        writer.write_binding("linkedtrust", name, "ABOUT", "content",
-            str(cid), qualifier="idea description",
-            source_date="2026-02-15", catcode=CC_IDEAS)
+    for name, path, content, st in ideas:
+        cid, bids = store_idea(writer, content, name, path)
+        record_file(writer, SRC_IDEAS, path, st, content, cid, bids)
         print(f"  {name} -> content {cid}")
 
     # Store LinkedClaims spec
     if spec_content:
         print("\nLoading LinkedClaims spec...")
-        cid = writer.store_content("LinkedClaims/spec.md", spec_content,
-            note_date="2026-02-15", catcode=CC_SPECS)
-        writer.write_binding("linkedtrust", "linkedclaims", "ABOUT", "content",
-            str(cid), qualifier="LinkedClaims specification (draft)",
-            source_date="2026-02-15", catcode=CC_SPECS)
+        cid, bids = store_spec(writer, spec_content)
+        record_file(writer, SRC_SPECS, LINKEDCLAIMS_SPEC, spec_stat, spec_content, cid, bids)
         print(f"  linkedclaims spec -> content {cid}")
 
+    if args.replace:
+        collected = writer.gc_content(CC_PROJECTS) + writer.gc_content(CC_IDEAS)
+        if spec_content:
+            collected += writer.gc_content(CC_SPECS)
+        print(f"\nGarbage collected {collected} stale content blobs")
+
     writer.close()
     total = len(projects) + len(extras) + len(ideas) + (1 if spec_content else 0)
     print(f"\nDone. {total} items loaded.")
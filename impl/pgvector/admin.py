@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for the abra store.
+
+Usage:
+    # Remove content blobs no binding points to any more
+    .venv/bin/python pgvector/admin.py gc
+    .venv/bin/python pgvector/admin.py gc --prefix a001030201
+    .venv/bin/python pgvector/admin.py gc --dry-run
+
+    # Move expired bindings (expires_at in the past) to bindings_archive
+    .venv/bin/python pgvector/admin.py expire
+    .venv/bin/python pgvector/admin.py expire --dry-run
+
+    # Replicate to another instance: export the delta, apply it there
+    .venv/bin/python pgvector/admin.py export --since 0 -o changes.jsonl
+    .venv/bin/python pgvector/admin.py apply changes.jsonl
+
+    # Binary snapshot of the store (or of one subtree / scope), and back
+    .venv/bin/python pgvector/admin.py dump abra.snapshot
+    .venv/bin/python pgvector/admin.py dump subtree.snapshot --prefix a001030201
+    .venv/bin/python pgvector/admin.py restore subtree.snapshot --replace
+
+    # Delete a catcode subtree in batches (counts only without --confirm)
+    .venv/bin/python pgvector/admin.py delete-subtree a001030201
+    .venv/bin/python pgvector/admin.py delete-subtree a001030201 --confirm
+
+    # Give a new scope its own bindings partition; archive or drop a scope
+    .venv/bin/python pgvector/admin.py partition-scope alice
+    .venv/bin/python pgvector/admin.py detach-scope alice --confirm
+    .venv/bin/python pgvector/admin.py detach-scope alice --drop --confirm
+
+    # Render the catcode tree as static HTML/JSON (only changed pages)
+    .venv/bin/python pgvector/admin.py publish ~/public/abra
+
+    # Ingest changes under ~/.abra/sources.yaml source paths as they happen
+    .venv/bin/python pgvector/admin.py watch
+"""
+import sys
+import time
+import argparse
+
+from write_binding import AbraWriter, DELETE_BATCH
+from setup_db import bindings_layout, create_scope_partition, scope_partition_name
+
+
+def cmd_gc(args):
+    """Garbage collect unreferenced content blobs."""
+    writer = AbraWriter()
+    count = writer.gc_content(args.prefix, dry_run=args.dry_run)
+    writer.close()
+    where = f" under {args.prefix}" if args.prefix else ""
+    if args.dry_run:
+        print(f"{count} unreferenced content blobs{where} (dry run, nothing deleted)")
+    else:
+        print(f"Deleted {count} unreferenced content blobs{where}")
+
+
+def cmd_expire(args):
+    """Archive expired bindings in batches."""
+    writer = AbraWriter()
+    if args.dry_run:
+        count = writer.expire_bindings(dry_run=True)
+        print(f"{count} expired bindings (dry run, nothing moved)")
+    else:
+        count = writer.expire_bindings(batch_size=args.batch_size,
+                                       progress=lambda n: print(f"\r  {n} archived", end="", flush=True))
+        print(f"\rMoved {count} expired bindings to bindings_archive")
+    writer.close()
+
+
+def cmd_export(args):
+    """Write the change log since a position as JSON lines."""
+    import sync
+    from query import get_conn
+    conn = get_conn()
+    out = open(args.output, "w") if args.output else sys.stdout
+    header, count = sync.export_changes(conn, out, since=args.since,
+                                        include_replicated=args.include_replicated)
+    conn.close()
+    if args.output:
+        out.close()
+    print(f"Exported {count} changes from {header['instance']}; "
+          f"next time use --since {header['next_since']}", file=sys.stderr)
+
+
+def cmd_apply(args):
+    """Replay an export from another instance."""
+    import sync
+    writer = AbraWriter()
+    src = sys.stdin if args.file == "-" else open(args.file)
+    try:
+        header, stats = sync.apply_changes(writer, src, batch_size=args.batch_size, force=args.force)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        writer.close()
+    if "already applied" in stats:
+        print(f"Already applied: {header['instance']} up to {header['next_since']}")
+        return
+    print(f"Applied changes from {header['instance']} ({header['since']} -> {header['next_since']}):")
+    for what, n in sorted(stats.items()):
+        if what != "complete":
+            print(f"  {what:36s} {n:8d}")
+    if "complete" not in stats:
+        print("File ended early; position not advanced, apply it again once complete")
+
+
+def _snapshot_progress(table, rows, size):
+    if size is None:
+        print(f"  rebuilding {table[len('index '):]}")
+        return
+    count = f"{rows:9d} rows" if rows is not None and rows >= 0 else " " * 14
+    print(f"  {table:18s} {count} {size / 1e6:9.1f} MB")
+
+
+def cmd_dump(args):
+    """Write a binary snapshot of the store."""
+    import snapshot
+    from query import get_conn
+    conn = get_conn()
+    manifest = snapshot.dump(conn, args.file, scopes=args.scope, prefix=args.prefix,
+                             embeddings=not args.no_embeddings, progress=_snapshot_progress)
+    conn.close()
+    print(f"Wrote {args.file} in {manifest['seconds']:.1f}s")
+
+
+def cmd_restore(args):
+    """Load a binary snapshot."""
+    import snapshot
+    from query import get_conn
+    conn = get_conn()
+    try:
+        manifest = snapshot.restore(conn, args.file, replace=args.replace, progress=_snapshot_progress)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        conn.close()
+    filters = manifest["filters"]
+    what = ", ".join(f"{k}={v}" for k, v in filters.items() if v not in (None, True)) or "whole store"
+    print(f"Restored {args.file} ({what}, dumped {manifest['created_at']}) in {manifest['seconds']:.1f}s")
+
+
+def cmd_delete_subtree(args):
+    """Delete everything under a catcode, a batch at a time."""
+    writer = AbraWriter()
+    counts = writer.subtree_counts(args.catcode)
+    print(f"Under {args.catcode}:")
+    for table, n in counts.items():
+        print(f"  {table:18s} {n:8d}")
+    if not args.confirm:
+        writer.close()
+        print("\nDry run. Run with --confirm to delete.")
+        return
+
+    def progress(done, total):
+        print(f"\r  bindings {done}/{total}", end="", flush=True)
+
+    deleted = writer.delete_subtree(args.catcode, batch_size=args.batch_size, progress=progress)
+    writer.close()
+    if deleted["bindings"]:
+        print()
+    print("Deleted " + ", ".join(f"{n} {table}" for table, n in deleted.items()))
+
+
+def cmd_partition_scope(args):
+    """Move a scope out of bindings_default into its own partition."""
+    writer = AbraWriter()
+    cur = writer.conn.cursor()
+    if bindings_layout(cur) != "list":
+        print("bindings is not list-partitioned (see setup_db.py --partition list --migrate)")
+        sys.exit(1)
+    moved = create_scope_partition(cur, args.scope)
+    writer.conn.commit()
+    writer.close()
+    if moved is None:
+        print(f"Scope {args.scope} already has partition {scope_partition_name(args.scope)}")
+    else:
+        print(f"Created {scope_partition_name(args.scope)} ({moved} bindings moved from bindings_default)")
+
+
+def cmd_detach_scope(args):
+    """Detach a scope's partition: kept as a standalone table, or dropped."""
+    writer = AbraWriter()
+    cur = writer.conn.cursor()
+    if bindings_layout(cur) != "list":
+        print("Detaching needs one partition per scope (setup_db.py --partition list --migrate).")
+        print(f"To delete the scope's rows instead: DELETE FROM bindings WHERE scope = '{args.scope}'")
+        sys.exit(1)
+    table = scope_partition_name(args.scope)
+    cur.execute("SELECT COUNT(*) FROM bindings WHERE scope = %s", (args.scope,))
+    count = cur.fetchone()[0]
+    archive = f"{table.replace('bindings_s_', 'bindings_archived_', 1)}_{time.strftime('%Y%m%d')}"
+    action = "drop" if args.drop else f"keep as {archive}"
+    print(f"Scope {args.scope}: {count} bindings ({action})")
+    if not args.confirm:
+        writer.close()
+        print("\nDry run. Run with --confirm to detach.")
+        return
+    create_scope_partition(cur, args.scope)
+    cur.execute(f"ALTER TABLE bindings DETACH PARTITION {table}")
+    if args.drop:
+        cur.execute(f"DROP TABLE {table}")
+    else:
+        cur.execute(f"ALTER TABLE {table} RENAME TO {archive}")
+    writer.conn.commit()
+    writer.close()
+    print(f"Detached scope {args.scope}" + ("" if args.drop else f"; rows are in {archive}"))
+
+
+def cmd_publish(args):
+    """Render the catcode tree to a static site."""
+    from publish import publish
+    stats = publish(args.out_dir, scopes=args.scope, full=args.full)
+    print(f"Published {stats['pages']} pages to {args.out_dir} in {stats['seconds']:.1f}s: "
+          f"{stats['rendered']} rendered, {stats['unchanged']} unchanged, {stats['removed']} removed")
+    if stats["pii_skipped"]:
+        print(f"  {stats['pii_skipped']} bindings left out (PII in target)")
+
+
+def cmd_watch(args):
+    """Run the inotify ingestion daemon."""
+    import watch
+    watch.run(config=args.config, debounce=args.debounce, batch_size=args.batch_size,
+              queue_size=args.queue_size, once=args.once)
+
+
+HELP_TEXT = """
+abra maintenance commands
+
+Commands:
+  abra gc                        Delete content no binding points to
+  abra gc --prefix a001030201    Only within a catcode subtree
+  abra gc --dry-run              Count without deleting
+  abra expire                    Move expired bindings to bindings_archive (cron-able)
+  abra expire --dry-run          Count expired bindings
+  abra export --since N -o FILE   Changes since position N (printed by the last export)
+  abra apply FILE                Replay another instance's export (idempotent)
+  abra dump FILE                 Binary snapshot of bindings, content and the registry
+    --prefix a001030201          Only one catcode subtree
+    --scope alice                Only bindings in this scope (repeatable)
+    --no-embeddings              Leave embeddings out
+  abra restore FILE              Load a snapshot into empty tables
+    --replace                    Empty the tables first
+  abra delete-subtree a001030201 Count what a subtree delete would remove
+    --confirm                    Delete it in batches; rerun to resume if interrupted
+  abra partition-scope alice     Give a scope its own bindings partition
+  abra detach-scope alice        Count a scope's bindings
+    --confirm                    Detach its partition into a bindings_archived_* table
+    --drop                       Drop the partition instead of keeping it
+  abra publish ~/public/abra     Render the catcode tree as a static site (changed pages only)
+    --scope linkedtrust          Only bindings in this scope (repeatable)
+    --full                       Re-render every page
+  abra watch                     Ingest edits under sources.yaml paths as they happen
+  abra watch --once              Catch up on changes since the last run, then exit
+""".strip()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] in ('-h', '--help', 'help'):
+        print(HELP_TEXT)
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='abra maintenance commands', add_help=False)
+    sub = parser.add_subparsers(dest='command')
+
+    p_gc = sub.add_parser('gc', help='Delete unreferenced content blobs')
+    p_gc.add_argument('--prefix', default=None, help='Catcode subtree to limit collection to')
+    p_gc.add_argument('--dry-run', action='store_true', help='Count only, delete nothing')
+
+    p_exp = sub.add_parser('expire', help='Move expired bindings to bindings_archive')
+    p_exp.add_argument('--dry-run', action='store_true', help='Count only, move nothing')
+    p_exp.add_argument('--batch-size', type=int, default=DELETE_BATCH,
+                       help=f'Rows per transaction (default {DELETE_BATCH})')
+
+    p_export = sub.add_parser('export', help='Export the change log since a position')
+    p_export.add_argument('--since', type=int, default=0, help='Position from the previous export (default 0: all)')
+    p_export.add_argument('-o', '--output', default=None, help='File to write (default stdout)')
+    p_export.add_argument('--include-replicated', action='store_true',
+                          help='Also export changes that were applied from other instances')
+
+    p_apply = sub.add_parser('apply', help="Apply another instance's export")
+    p_apply.add_argument('file', help="Export file, or - for stdin")
+    p_apply.add_argument('--batch-size', type=int, default=500, help='Changes per transaction (default 500)')
+    p_apply.add_argument('--force', action='store_true', help='Apply even if it leaves a gap or was applied')
+
+    p_dump = sub.add_parser('dump', help='Write a binary snapshot')
+    p_dump.add_argument('file', help='Snapshot file to write')
+    p_dump.add_argument('--prefix', default=None, help='Only bindings under this catcode')
+    p_dump.add_argument('--scope', action='append', default=None, help='Only bindings in this scope')
+    p_dump.add_argument('--no-embeddings', action='store_true', help='Leave embeddings out')
+
+    p_restore = sub.add_parser('restore', help='Load a binary snapshot')
+    p_restore.add_argument('file', help='Snapshot file to load')
+    p_restore.add_argument('--replace', action='store_true',
+                           help='Empty bindings, content, the registry and sync state first')
+
+    p_del = sub.add_parser('delete-subtree', help='Delete a catcode subtree in batches')
+    p_del.add_argument('catcode', help='Catcode prefix to delete')
+    p_del.add_argument('--confirm', action='store_true', help='Delete (default is a dry run)')
+    p_del.add_argument('--batch-size', type=int, default=DELETE_BATCH,
+                       help=f'Rows per transaction (default {DELETE_BATCH})')
+
+    p_part = sub.add_parser('partition-scope', help='Give a scope its own bindings partition')
+    p_part.add_argument('scope', help='Scope to partition')
+
+    p_detach = sub.add_parser('detach-scope', help="Detach a scope's bindings partition")
+    p_detach.add_argument('scope', help='Scope to detach')
+    p_detach.add_argument('--drop', action='store_true', help='Drop the detached partition')
+    p_detach.add_argument('--confirm', action='store_true', help='Detach (default is a dry run)')
+
+    p_pub = sub.add_parser('publish', help='Render the catcode tree as static pages')
+    p_pub.add_argument('out_dir', help='Directory to write the site to')
+    p_pub.add_argument('--scope', action='append', default=None, help='Only publish bindings in this scope')
+    p_pub.add_argument('--full', action='store_true', help='Re-render every page')
+
+    p_watch = sub.add_parser('watch', help='Watch source paths and ingest changes')
+    p_watch.add_argument('--config', default='~/.abra/sources.yaml', help='sources.yaml to read')
+    p_watch.add_argument('--debounce', type=float, default=1.0, help='Seconds a file must be quiet (default 1)')
+    p_watch.add_argument('--batch-size', type=int, default=50, help='Files per write transaction (default 50)')
+    p_watch.add_argument('--queue-size', type=int, default=1000, help='Pending changes before back-pressure (default 1000)')
+    p_watch.add_argument('--once', action='store_true', help='Reconcile against the manifest and exit')
+
+    args = parser.parse_args()
+    if not args.command:
+        print(HELP_TEXT)
+        sys.exit(0)
+
+    cmds = {
+        'gc': cmd_gc,
+        'expire': cmd_expire,
+        'export': cmd_export,
+        'apply': cmd_apply,
+        'dump': cmd_dump,
+        'restore': cmd_restore,
+        'delete-subtree': cmd_delete_subtree,
+        'partition-scope': cmd_partition_scope,
+        'detach-scope': cmd_detach_scope,
+        'publish': cmd_publish,
+        'watch': cmd_watch,
+    }
+    cmds[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Alias index from real-world names to pet names.
+
+Pet names are slugs ("leanne-ussher", "robert-smith"), but people look them
+up by what they remember: a surname, a nickname, a spelling without the
+accent. name_aliases holds, for every name, the keys it can be found by:
+
+  slug   the pet name and its words         leanne-ussher, leanne ussher, ussher
+  full   each IS text target, normalized    leanne ussher
+  token  the words of those targets         leanne, ussher
+  nick   common nicknames of first names    bob, bobby, rob (for robert)
+  url    the slug of a LinkedIn profile     leanne ussher
+
+Every key is lowercased with punctuation collapsed, and also stored
+ASCII-folded (José -> jose), so a query only has to be folded once. A
+pg_trgm GIN index on alias makes misspellings a single indexed lookup too.
+
+Writes only ever add keys (add_aliases, one INSERT per batch of bindings);
+deleting bindings or renaming a name recomputes that name's keys
+(refresh_aliases). Rebuild everything for data written before with:
+
+    python aliases.py --rebuild
+    python aliases.py --show "Léanne Ussher"      # keys a full name produces
+
+Lookups (`abra about` and `read` merge exact alias hits with pet-name
+matches; all three of about, read and `names` suggest from it when nothing
+matches):
+
+    from aliases import suggest_names
+    suggest_names(cur, "golda", "Bob")   # -> [Suggestion(name='robert-smith', via='bob', ...)]
+"""
+import re
+import sys
+import argparse
+import unicodedata
+from collections import namedtuple
+
+from psycopg2.extras import execute_values
+
+Suggestion = namedtuple("Suggestion", "name_id name score via exact")
+
+MIN_TOKEN = 2
+MAX_ALIAS = 255
+SUGGEST_LIMIT = 5
+# pg_trgm similarity a misspelling needs to be suggested at all
+SIMILARITY = 0.3
+
+# Letters NFKD does not decompose into ASCII
+FOLD = str.maketrans({"ß": "ss", "æ": "ae", "œ": "oe", "ø": "o", "ł": "l", "đ": "d",
+                      "ð": "d", "þ": "th", "ı": "i"})
+
+NICKNAME_GROUPS = [
+    {"robert", "bob", "bobby", "rob", "robbie", "bert"},
+    {"william", "bill", "billy", "will", "willy", "liam"},
+    {"richard", "rick", "ricky", "dick", "rich"},
+    {"james", "jim", "jimmy", "jamie"},
+    {"john", "jack", "johnny"},
+    {"jonathan", "jon", "jonny"},
+    {"michael", "mike", "mikey", "mick"},
+    {"thomas", "tom", "tommy"},
+    {"joseph", "joe", "joey"},
+    {"charles", "charlie", "chuck", "chas"},
+    {"edward", "ed", "eddie", "ted", "ned"},
+    {"daniel", "dan", "danny"},
+    {"david", "dave", "davey"},
+    {"christopher", "chris", "kit"},
+    {"matthew", "matt"},
+    {"anthony", "tony"},
+    {"andrew", "andy", "drew"},
+    {"benjamin", "ben", "benny"},
+    {"samuel", "sam", "sammy"},
+    {"alexander", "alex", "xander", "sasha"},
+    {"nicholas", "nick", "nicky"},
+    {"steven", "stephen", "steve"},
+    {"gregory", "greg"},
+    {"timothy", "tim", "timmy"},
+    {"patrick", "pat", "paddy"},
+    {"peter", "pete"},
+    {"frederick", "fred", "freddy"},
+    {"kenneth", "ken", "kenny"},
+    {"lawrence", "larry"},
+    {"ronald", "ron", "ronnie"},
+    {"donald", "don", "donnie"},
+    {"gerald", "gerry", "jerry"},
+    {"eric", "erik", "rick"},
+    {"elizabeth", "liz", "beth", "betty", "eliza", "lisa", "libby"},
+    {"katherine", "catherine", "kathryn", "kate", "katie", "kathy", "cathy", "kat"},
+    {"margaret", "maggie", "meg", "peggy", "marge"},
+    {"jennifer", "jen", "jenny"},
+    {"jessica", "jess", "jessie"},
+    {"rebecca", "becky", "becca"},
+    {"susan", "sue", "suzy"},
+    {"patricia", "patty", "trish", "tricia"},
+    {"deborah", "debra", "deb", "debbie"},
+    {"barbara", "barb", "babs"},
+    {"victoria", "vicky", "tori"},
+    {"christine", "christina", "chris", "tina"},
+    {"alexandra", "alex", "sandra", "sasha"},
+    {"samantha", "sam", "sammy"},
+    {"abigail", "abby"},
+    {"kimberly", "kim"},
+    {"pamela", "pam"},
+    {"roberta", "bobbi", "bobbie"},
+]
+
+NICKNAMES = {}
+for _group in NICKNAME_GROUPS:
+    for _token in _group:
+        NICKNAMES.setdefault(_token, set()).update(_group - {_token})
+
+LINKEDIN_SLUG = re.compile(r"linkedin\.com/in/([^/?#]+)", re.I)
+# LinkedIn appends an id to taken slugs: leanne-ussher-4a1b2c3d
+SLUG_SUFFIX = re.compile(r"-[0-9a-f]*\d[0-9a-f]*$")
+
+
+def normalize(text):
+    """Lowercase, NFKC, runs of punctuation/whitespace to one space."""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(re.findall(r"[^\W_]+", text))
+
+
+def fold(text):
+    """ASCII-folded form: accents stripped, ß -> ss and the like."""
+    text = text.translate(FOLD)
+    return "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+
+
+def linkedin_slug(url):
+    """'leanne ussher' from https://www.linkedin.com/in/leanne-ussher-4a1b2c3d/, or None."""
+    m = LINKEDIN_SLUG.search(url or "")
+    if not m:
+        return None
+    return normalize(SLUG_SUFFIX.sub("", m.group(1)).replace("-", " ")) or None
+
+
+def alias_keys(pet_name, full_names=(), urls=()):
+    """{alias: kind} for a pet name, its IS text targets and profile URLs."""
+    keys = {}
+
+    def add(alias, kind):
+        for variant in (alias[:MAX_ALIAS], fold(alias)[:MAX_ALIAS]):
+            if len(variant) >= MIN_TOKEN and variant not in keys:
+                keys[variant] = kind
+
+    slug = pet_name.lower()
+    spaced = normalize(slug)
+    add(slug, "slug")
+    add(spaced, "slug")
+    for token in spaced.split():
+        add(token, "slug")
+    for text in full_names:
+        full = normalize(text)
+        add(full, "full")
+        for token in full.split():
+            add(token, "token")
+    for url in urls:
+        profile = linkedin_slug(url)
+        if profile:
+            add(profile, "url")
+    # Nicknames only for the first word of each form of the name
+    firsts = {spaced.split()[0]} if spaced else set()
+    firsts.update(normalize(t).split()[0] for t in full_names if normalize(t))
+    for first in firsts:
+        for nick in NICKNAMES.get(fold(first), ()):
+            add(nick, "nick")
+    return keys
+
+
+def binding_aliases(name, relationship, target_type, target_ref):
+    """alias_keys for one binding: IS text targets and LinkedIn URLs add to the slug's."""
+    full_names = [target_ref] if relationship == "IS" and target_type == "text" else []
+    urls = [target_ref] if target_type == "uri" and linkedin_slug(target_ref) else []
+    return alias_keys(name, full_names, urls)
+
+
+def add_aliases(cur, bindings):
+    """Index the keys of newly written bindings, given as
+    (name_id, name, relationship, target_type, target_ref). One INSERT."""
+    rows = {}
+    for name_id, name, relationship, target_type, target_ref in bindings:
+        for alias, kind in binding_aliases(name, relationship, target_type, target_ref).items():
+            rows.setdefault((name_id, alias), kind)
+    if rows:
+        execute_values(cur, "INSERT INTO name_aliases (name_id, alias, kind) VALUES %s ON CONFLICT DO NOTHING",
+                       [(name_id, alias, kind) for (name_id, alias), kind in rows.items()],
+                       page_size=1000)
+    return len(rows)
+
+
+def refresh_aliases(cur, name_ids):
+    """Recompute name_aliases for these names from their live and archived bindings.
+
+    Runs in the caller's transaction: one read, one delete, one insert.
+    """
+    name_ids = sorted(set(name_ids))
+    if not name_ids:
+        return 0
+    cur.execute("""
+        SELECT n.id, n.name, b.target_type, b.target_ref
+        FROM names n
+        LEFT JOIN (
+            SELECT scope, name_id, relationship_id, target_type, target_ref FROM bindings
+            UNION ALL
+            SELECT scope, name_id, relationship_id, target_type, target_ref FROM bindings_archive
+        ) b ON b.scope = n.scope AND b.name_id = n.id
+             AND ((b.target_type = 'text'
+                   AND b.relationship_id = (SELECT id FROM relationship_types WHERE relationship = 'IS'))
+                  OR (b.target_type = 'uri' AND b.target_ref ILIKE '%%linkedin.com/in/%%'))
+        WHERE n.id = ANY(%s)
+    """, (name_ids,))
+    found = {}
+    for name_id, name, target_type, target_ref in cur.fetchall():
+        pet, fulls, urls = found.setdefault(name_id, (name, [], []))
+        if target_type == "text":
+            fulls.append(target_ref)
+        elif target_type == "uri":
+            urls.append(target_ref)
+    rows = [(name_id, alias, kind)
+            for name_id, (pet, fulls, urls) in found.items()
+            for alias, kind in alias_keys(pet, fulls, urls).items()]
+    cur.execute("DELETE FROM name_aliases WHERE name_id = ANY(%s)", (name_ids,))
+    if rows:
+        execute_values(cur, "INSERT INTO name_aliases (name_id, alias, kind) VALUES %s ON CONFLICT DO NOTHING",
+                       rows, page_size=1000)
+    return len(rows)
+
+
+def suggest_names(cur, scope, query, limit=SUGGEST_LIMIT, include_archived=False):
+    """Names in scope that query could mean, best first.
+
+    One lookup in name_aliases: aliases equal to the folded query or one of
+    its words (GIN/btree), plus trigram matches for misspellings. A name
+    scores one point per query word it has as an alias plus its best
+    trigram similarity; exact is True when every query word matched.
+    """
+    q = fold(normalize(query))
+    if not q:
+        return []
+    tokens = [t for t in q.split() if len(t) >= MIN_TOKEN]
+    live = "bindings"
+    if include_archived:
+        live = "(SELECT scope, name_id FROM bindings UNION ALL SELECT scope, name_id FROM bindings_archive)"
+    cur.execute("SELECT set_config('pg_trgm.similarity_threshold', %s, true)", (str(SIMILARITY),))
+    cur.execute(f"""
+        SELECT n.id, n.name,
+               COUNT(DISTINCT a.alias) FILTER (WHERE a.alias = ANY(%(tokens)s))
+                   + MAX(similarity(a.alias, %(q)s)) AS score,
+               (array_agg(a.alias ORDER BY a.alias = %(q)s DESC, a.alias = ANY(%(tokens)s) DESC,
+                          similarity(a.alias, %(q)s) DESC))[1] AS via,
+               COUNT(DISTINCT a.alias) FILTER (WHERE a.alias = ANY(%(tokens)s)) AS hits,
+               BOOL_OR(a.alias = %(q)s) AS whole
+        FROM name_aliases a
+        JOIN names n ON n.id = a.name_id
+        WHERE n.scope = %(scope)s
+        AND (a.alias = %(q)s OR a.alias = ANY(%(tokens)s) OR a.alias %% %(q)s)
+        AND EXISTS (SELECT 1 FROM {live} b WHERE b.scope = n.scope AND b.name_id = n.id)
+        GROUP BY n.id, n.name
+        ORDER BY score DESC, n.name
+        LIMIT %(limit)s
+    """, {"scope": scope, "q": q, "tokens": tokens, "limit": limit})
+    return [Suggestion(name_id, name, score, via, bool(whole or (tokens and hits >= len(set(tokens)))))
+            for name_id, name, score, via, hits, whole in cur.fetchall()]
+
+
+def print_suggestions(suggestions):
+    if not suggestions:
+        return
+    print("Did you mean:")
+    for s in suggestions:
+        via = "" if s.via == s.name else f"  (via '{s.via}')"
+        print(f"  {s.name}{via}")
+
+
+def rebuild(batch_size=1000):
+    """Recompute the aliases of every name."""
+    from write_binding import AbraWriter
+    writer = AbraWriter()
+    cur = writer.conn.cursor()
+    cur.execute("SELECT id FROM names ORDER BY id")
+    ids = [r[0] for r in cur.fetchall()]
+    total = 0
+    for start in range(0, len(ids), batch_size):
+        with writer.batch():
+            total += refresh_aliases(cur, ids[start:start + batch_size])
+        print(f"  {min(start + batch_size, len(ids))}/{len(ids)} names")
+    cur.close()
+    writer.close()
+    print(f"Done. {total} aliases for {len(ids)} names.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alias index from real-world names to pet names")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute aliases for every name")
+    parser.add_argument("--show", metavar="FULL_NAME", help="Print the aliases a full name produces")
+    parser.add_argument("--pet-name", default=None, help="Pet name to use with --show")
+    args = parser.parse_args()
+
+    if args.show:
+        pet = args.pet_name or fold(normalize(args.show)).replace(" ", "-")
+        for alias, kind in sorted(alias_keys(pet, [args.show]).items(), key=lambda kv: (kv[1], kv[0])):
+            print(f"  {kind:6s} {alias}")
+        return
+    if args.rebuild:
+        rebuild()
+        return
+    parser.print_help()
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
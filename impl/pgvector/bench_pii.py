@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PII scanner on note-sized and contact-chunk-sized inputs.
+
+Compares the old three-regex check against the combined single-pass scanner
+for rejection, counting, redaction and chunked streaming. Inputs are synthetic
+so no database is needed.
+
+Usage:
+    python bench_pii.py
+    python bench_pii.py --seconds 2
+"""
+import re
+import time
+import random
+import argparse
+
+from pii import PIIScanner, CONTENT_CATEGORIES, iter_chunks
+
+LEGACY_PATTERNS = [
+    re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+'),
+    re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+    re.compile(r'\b\d{5}(-\d{4})?\b'),
+]
+
+WORDS = ("met with the team about budget and next steps for the cooperative "
+         "pilot workforce credentials follow up in april grant funding 2026 "
+         "design review currency trust claims badge conference").split()
+COMPANIES = ["LinkedTrust", "Acme Health", "Pima County", "Open Collective", "Tucson Coop"]
+TITLES = ["Director", "Engineer", "Founder", "Program Manager", "Consultant"]
+
+
+def legacy_check(text):
+    for pattern in LEGACY_PATTERNS:
+        if pattern.search(text):
+            return True
+    return False
+
+
+def make_note(rng, size=4000):
+    """Meeting-note-like prose, clean (the common case: scanned end to end)."""
+    words = []
+    length = 0
+    while length < size:
+        w = rng.choice(WORDS)
+        words.append(w)
+        length += len(w) + 1
+    return " ".join(words)
+
+
+def make_contact_chunk(rng, rows=200):
+    """A scrubbed contacts chunk as built by import_contacts_to_pgvector.py."""
+    lines = ["LinkedIn and Google contacts (chunk 1/1)",
+             "Scrubbed: no emails or phone numbers. For PII see CRM.", ""]
+    for i in range(rows):
+        lines.append(f"Person{i} Lastname{i} — {rng.choice(TITLES)} — at {rng.choice(COMPANIES)}"
+                     f" — (connected {rng.randint(1, 28)} Feb 2025)")
+    return "\n".join(lines)
+
+
+def bench(fn, text, seconds):
+    """Run fn(text) repeatedly for ~seconds. Returns MB/s."""
+    n = 0
+    start = time.perf_counter()
+    while True:
+        fn(text)
+        n += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            break
+    return n * len(text.encode("utf-8")) / elapsed / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PII scanning throughput")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per measurement (default 1)")
+    args = parser.parse_args()
+
+    rng = random.Random(26)
+    inputs = {
+        "note (~4 KB)": make_note(rng),
+        "contact chunk (~200 rows)": make_contact_chunk(rng),
+    }
+    scanner = PIIScanner()
+    content_scanner = PIIScanner(CONTENT_CATEGORIES)
+    cases = [
+        ("legacy 3-regex check", legacy_check),
+        ("scanner.contains", scanner.contains),
+        ("scanner.scan", scanner.scan),
+        ("scanner.redact (content)", content_scanner.redact),
+        ("scanner.scan_stream 4 KB", lambda t: scanner.scan_stream(iter_chunks(t, 4096))),
+    ]
+
+    for label, text in inputs.items():
+        print(f"\n{label}: {len(text.encode('utf-8'))} bytes")
+        for name, fn in cases:
+            print(f"  {name:28s} {bench(fn, text, args.seconds):8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark `abra publish` full and incremental builds.
+
+Builds a synthetic catcode tree (default 100k bindings over ~2,000 leaf
+catcodes, one content blob per 10 bindings) in memory and publishes it to a
+temp directory: a full build, a rebuild with nothing changed, a rebuild
+after touching 1% of the leaves, and a forced full rebuild. The in-memory
+source fingerprints rows the way the database query does, so no database
+is needed.
+
+Usage:
+    python bench_publish.py
+    python bench_publish.py --bindings 20000 --changed 0.05
+"""
+import random
+import hashlib
+import argparse
+import tempfile
+from collections import defaultdict
+
+from catcode_tree import CatcodeTree
+from publish import Publisher, Binding, Blob
+
+WORDS = ("met with the team about budget and next steps for the cooperative "
+         "pilot workforce credentials follow up in april grant funding 2026 "
+         "design review currency trust claims badge conference").split()
+
+
+class MemorySource:
+    """StoreSource stand-in over lists of Binding and Blob rows."""
+
+    def __init__(self, bindings, blobs):
+        self.bindings = defaultdict(list)
+        self.blobs = defaultdict(list)
+        for b in bindings:
+            self.bindings[b.catcode].append(b)
+        for blob in blobs:
+            self.blobs[blob.catcode].append(blob)
+
+    def fingerprints(self):
+        prints = {}
+        for code, rows in self.bindings.items():
+            prints[code] = "b:" + hashlib.md5("".join(
+                hashlib.md5("|".join(map(str, b[:-1])).encode()).hexdigest() for b in rows
+            ).encode()).hexdigest()
+        for code, rows in self.blobs.items():
+            prints[code] = prints.get(code, "") + " c:" + hashlib.md5("".join(
+                f"{blob.id}|{blob.content}" for blob in rows).encode()).hexdigest()
+        return prints
+
+    def rows(self, catcodes):
+        bindings = [b for code in catcodes for b in self.bindings.get(code, [])]
+        blobs = [blob for code in catcodes for blob in self.blobs.get(code, [])]
+        return bindings, blobs
+
+
+def make_store(rng, n_bindings, fanout=(10, 20, 10)):
+    """Registry rows, bindings and blobs for a tree with the given fan-out per level."""
+    rows = [("a0", None, "site")]
+    level = ["a0"]
+    for depth, width in enumerate(fanout):
+        nxt = []
+        for parent in level:
+            for i in range(1, width + 1):
+                code = f"{parent}{i:02d}"
+                rows.append((code, parent, f"{rng.choice(WORDS)}-{depth}-{i}"))
+                nxt.append(code)
+        level = nxt
+
+    bindings = []
+    blobs = []
+    for i in range(n_bindings):
+        leaf = level[i % len(level)]
+        if i % 10 == 0:
+            text = " ".join(rng.choice(WORDS) for _ in range(300))
+            blobs.append(Blob(len(blobs) + 1, leaf, f"note-{i}.md", None, text))
+            target = ("content", str(len(blobs)), leaf)
+        else:
+            target = ("text", f"{rng.choice(WORDS)} {rng.choice(WORDS)}", None)
+        bindings.append(Binding(i + 1, leaf, "bench", f"person-{i % 5000}", "ABOUT",
+                                target[0], target[1], rng.choice(WORDS), None, target[2]))
+    return rows, bindings, blobs, level
+
+
+def run(label, out_dir, source, tree, **kwargs):
+    stats = Publisher(out_dir, source, tree).build(**kwargs)
+    print(f"  {label:28s} {stats['seconds']:7.2f} s  {stats['rendered']:6d} rendered"
+          f"  {stats['unchanged']:6d} unchanged")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark static site builds")
+    parser.add_argument("--bindings", type=int, default=100000, help="Bindings in the tree (default 100000)")
+    parser.add_argument("--changed", type=float, default=0.01, help="Fraction of leaves changed (default 0.01)")
+    args = parser.parse_args()
+
+    rng = random.Random(26)
+    rows, bindings, blobs, leaves = make_store(rng, args.bindings)
+    tree = CatcodeTree(rows)
+    print(f"{len(rows)} catcodes, {len(bindings)} bindings, {len(blobs)} blobs\n")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        run("full build", out_dir, MemorySource(bindings, blobs), tree)
+        run("rebuild, nothing changed", out_dir, MemorySource(bindings, blobs), tree)
+
+        touched = set(rng.sample(leaves, max(1, int(len(leaves) * args.changed))))
+        edited = [b._replace(qualifier="edited") if b.catcode in touched else b for b in bindings]
+        run(f"rebuild, {len(touched)} leaves changed", out_dir, MemorySource(edited, blobs), tree)
+        run("forced full rebuild", out_dir, MemorySource(edited, blobs), tree, full=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+In-memory catcode tree, resolvable by code or by label path.
+
+The whole catcode_registry is loaded once into a tree of nodes keyed both by
+code and by label segment, so either direction is a walk of the tree's depth:
+
+    from catcode_tree import get_tree
+    tree = get_tree(conn)
+    tree.resolve("linkedtrust/2026/projects")   # -> "a001030201"
+    tree.label_path("a001030201")               # -> "linkedtrust/2026/projects"
+    node = tree.node("a0010302")
+    node.total_bindings, node.total_content     # whole subtree
+
+get_tree() fingerprints the registry with one aggregate (row count and the
+sum of row xmins, which moves on every committed insert, update or delete)
+and only reloads when the fingerprint moved. Writers share no version row,
+so registering catcodes never serializes on it. The tree (and the
+per-subtree binding/content counts, refreshed every COUNTS_TTL seconds) is
+also cached in ~/.abra/cache, one file per database, so a fresh `abra tree`
+process skips loading the registry.
+
+Browse it with `abra tree [PREFIX_OR_LABEL_PATH] [--depth N]`.
+"""
+import os
+import re
+import json
+import time
+
+CACHE_DIR = os.path.expanduser("~/.abra/cache")
+COUNTS_TTL = 300
+
+
+class Node:
+    __slots__ = ("code", "label", "segment", "parent", "children", "by_segment",
+                 "bindings", "content", "total_bindings", "total_content")
+
+    def __init__(self, code, label):
+        self.code = code
+        self.label = label
+        self.segment = label.rstrip("/").rsplit("/", 1)[-1]
+        self.parent = None
+        self.children = []
+        self.by_segment = {}
+        self.bindings = self.content = 0
+        self.total_bindings = self.total_content = 0
+
+
+class CatcodeTree:
+    def __init__(self, rows, version=None):
+        """rows are (catcode, parent_catcode, label) from catcode_registry."""
+        self.version = version
+        self.rows = [tuple(r) for r in rows]
+        self.counts_at = None
+        self._counts = ({}, {})
+        self.nodes = {code: Node(code, label) for code, _, label in self.rows}
+        self.roots = []
+        self.by_segment = {}
+        for code, parent, _ in sorted(self.rows):
+            node = self.nodes[code]
+            parent_node = self.nodes.get(parent)
+            if parent_node is None:
+                self.roots.append(node)
+                self.by_segment.setdefault(node.segment, node)
+            else:
+                node.parent = parent_node
+                parent_node.children.append(node)
+                parent_node.by_segment.setdefault(node.segment, node)
+        self.by_label = {label: code for code, _, label in self.rows}
+
+    def node(self, code):
+        """Registered node for code, or for its nearest registered ancestor."""
+        while code:
+            if code in self.nodes:
+                return self.nodes[code]
+            code = code[:-2]
+        return None
+
+    def label_path(self, code):
+        """Label path for a code, built from segment labels up the tree."""
+        node = self.node(code)
+        if node is None:
+            return None
+        parts = []
+        while node:
+            parts.append(node.segment)
+            node = node.parent
+        return "/".join(reversed(parts))
+
+    def resolve(self, path):
+        """Catcode for a label path like 'linkedtrust/2026/projects', or None."""
+        path = path.strip("/")
+        if path in self.by_label:
+            return self.by_label[path]
+        level = self.by_segment
+        node = None
+        for segment in path.split("/"):
+            node = level.get(segment)
+            if node is None:
+                return None
+            level = node.by_segment
+        return node.code
+
+    def lookup(self, key):
+        """Node for a code or a label path."""
+        if key in self.nodes:
+            return self.nodes[key]
+        code = self.resolve(key)
+        return self.nodes.get(code) if code else None
+
+    def set_counts(self, bindings, content, counts_at=None):
+        """Attach per-catcode counts and sum them up each subtree.
+
+        Rows whose catcode is not registered count towards the nearest
+        registered ancestor.
+        """
+        for node in self.nodes.values():
+            node.bindings = node.content = 0
+        for attr, counts in (("bindings", bindings), ("content", content)):
+            for code, n in counts.items():
+                node = self.node(code)
+                if node:
+                    setattr(node, attr, getattr(node, attr) + n)
+        for node in sorted(self.nodes.values(), key=lambda n: -len(n.code)):
+            node.total_bindings = node.bindings + sum(c.total_bindings for c in node.children)
+            node.total_content = node.content + sum(c.total_content for c in node.children)
+        self._counts = (bindings, content)
+        self.counts_at = counts_at or time.time()
+
+    def walk(self, start=None, depth=None):
+        """Yield (node, level) depth-first from start (or every root)."""
+        stack = [(n, 0) for n in reversed([start] if start else self.roots)]
+        while stack:
+            node, level = stack.pop()
+            yield node, level
+            if depth is None or level < depth:
+                stack.extend((c, level + 1) for c in reversed(node.children))
+
+    def to_json(self):
+        bindings, content = self._counts
+        return {"version": self.version, "rows": self.rows, "counts_at": self.counts_at,
+                "bindings": bindings, "content": content}
+
+    @classmethod
+    def from_json(cls, data):
+        tree = cls(data["rows"], data["version"])
+        if data.get("counts_at"):
+            tree.set_counts(data["bindings"], data["content"], data["counts_at"])
+        return tree
+
+
+def registry_version(cur):
+    """Fingerprint of the committed registry: "rows:xmin sum".
+
+    Any update or insert adds a tuple with a new xmin, and a delete changes
+    the count. It is read in its own snapshot before the rows are, so a
+    change committed in between only causes one extra reload later.
+    """
+    cur.execute("SELECT COUNT(*), COALESCE(SUM(xmin::text::bigint), 0) FROM catcode_registry")
+    rows, xmins = cur.fetchone()
+    return f"{rows}:{xmins}"
+
+
+def cache_path_for(conn):
+    """Cache file for conn's database, so two databases never share a tree."""
+    params = conn.get_dsn_parameters()
+    key = "-".join(str(params.get(k) or "") for k in ("host", "port", "dbname"))
+    return os.path.join(CACHE_DIR, f"catcode_tree-{re.sub(r'[^A-Za-z0-9._-]+', '_', key)}.json")
+
+
+def load_tree(cur, version=None):
+    version = version or registry_version(cur)
+    cur.execute("SELECT catcode, parent_catcode, label FROM catcode_registry")
+    return CatcodeTree(cur.fetchall(), version)
+
+
+def load_counts(cur, tree):
+    cur.execute("SELECT catcode, COUNT(*) FROM bindings WHERE catcode IS NOT NULL GROUP BY catcode")
+    bindings = dict(cur.fetchall())
+    cur.execute("SELECT catcode, COUNT(*) FROM content WHERE catcode IS NOT NULL GROUP BY catcode")
+    content = dict(cur.fetchall())
+    tree.set_counts(bindings, content)
+
+
+def _read_cache(path):
+    try:
+        with open(path) as f:
+            return CatcodeTree.from_json(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(tree, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(tree.to_json(), f)
+    os.replace(tmp, path)
+
+
+_trees = {}   # cache path -> tree, for repeated calls in one process
+
+
+def get_tree(conn, counts=True, fresh=False, cache_path=None):
+    """The current catcode tree: in-process, then disk cache, then the registry.
+
+    One registry_version() query decides whether a cached tree is still
+    valid. Counts are reloaded when the tree is, or when older than
+    COUNTS_TTL seconds; fresh=True reloads everything.
+    """
+    cache_path = cache_path or cache_path_for(conn)
+    cur = conn.cursor()
+    version = registry_version(cur)
+    tree = None if fresh else _trees.get(cache_path) or _read_cache(cache_path)
+    changed = False
+    if tree is None or tree.version != version:
+        tree = load_tree(cur, version)
+        changed = True
+    if counts and (changed or fresh or tree.counts_at is None
+                   or time.time() - tree.counts_at > COUNTS_TTL):
+        load_counts(cur, tree)
+        changed = True
+    cur.close()
+    if changed:
+        _write_cache(tree, cache_path)
+    _trees[cache_path] = tree
+    return tree
+
+
+def print_tree(tree, key=None, depth=None):
+    """Print a subtree (or the whole tree) with subtree counts."""
+    start = None
+    if key:
+        start = tree.lookup(key)
+        if start is None:
+            print(f"No catcode or label path matching '{key}'")
+            return False
+        print(f"{start.code}  {tree.label_path(start.code)}\n")
+    rows = list(tree.walk(start, depth))
+    if not rows:
+        print("Catcode registry is empty")
+        return False
+    width = max(len(n.code) + 2 * level for n, level in rows)
+    for node, level in rows:
+        indent = "  " * level
+        counts = ""
+        if tree.counts_at:
+            counts = f"{node.total_bindings:7d} bindings {node.total_content:6d} content"
+        more = f"  (+{len(node.children)} below)" if depth is not None and level == depth and node.children else ""
+        print(f"  {indent}{node.code:{width - len(indent)}s}  {node.segment:30s} {counts}{more}")
+    if tree.counts_at:
+        age = int(time.time() - tree.counts_at)
+        print(f"\n  counts as of {age}s ago (subtree totals)")
+    return True
+
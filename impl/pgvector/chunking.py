@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Split content blobs into retrieval-sized chunks with byte offsets.
+
+Two chunkers:
+  markdown — paragraph- and heading-aware. A heading starts a new chunk and
+             its path ("Goals > Funding") is kept as the chunk heading.
+             Paragraphs are packed up to max_bytes; fenced code stays whole.
+  records  — one record per line (contact lists). The preamble before the
+             first blank line becomes the heading; records are grouped
+             without ever splitting a line.
+
+Offsets are UTF-8 byte positions into the stored content, so
+content[start:end] (on the encoded bytes) is exactly the chunk text.
+
+Usage from a processing session:
+    from chunking import chunk_text
+    for chunk in chunk_text(text, "markdown"):
+        print(chunk.index, chunk.start, chunk.end, chunk.heading)
+
+Also usable as CLI to chunk content stored before chunking existed:
+    python chunking.py --backfill
+"""
+import os
+import re
+import sys
+import argparse
+from collections import namedtuple
+
+Chunk = namedtuple("Chunk", "index start end heading text")
+
+MAX_CHUNK_BYTES = 1500
+MAX_RECORDS = 25
+
+HEADING_RE = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+FENCE_RE = re.compile(r'^\s*(```|~~~)')
+
+
+def _lines(text):
+    """Yield (line, start_byte, end_byte) for each line, keeping line endings."""
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        size = len(line.encode("utf-8"))
+        yield line, pos, pos + size
+        pos += size
+
+
+def _blocks(text):
+    """Group lines into blocks: paragraphs, headings and fenced code.
+
+    Yields (kind, start_byte, end_byte, lines) with kind 'heading' or 'text'.
+    """
+    block = []
+    fenced = False
+    for line, start, end in _lines(text):
+        stripped = line.strip()
+        if fenced:
+            block.append((line, start, end))
+            if FENCE_RE.match(line):
+                fenced = False
+                yield "text", block[0][1], end, block
+                block = []
+            continue
+        if FENCE_RE.match(line):
+            if block:
+                yield "text", block[0][1], block[-1][2], block
+            block = [(line, start, end)]
+            fenced = True
+            continue
+        if HEADING_RE.match(line):
+            if block:
+                yield "text", block[0][1], block[-1][2], block
+                block = []
+            yield "heading", start, end, [(line, start, end)]
+            continue
+        if not stripped:
+            if block:
+                yield "text", block[0][1], block[-1][2], block
+                block = []
+            continue
+        block.append((line, start, end))
+    if block:
+        yield "text", block[0][1], block[-1][2], block
+
+
+def chunk_markdown(text, max_bytes=MAX_CHUNK_BYTES):
+    """Paragraph/heading-aware chunks. Returns list of Chunk."""
+    data = text.encode("utf-8")
+    chunks = []
+    headings = []          # [(level, title)] path of the current section
+    start = end = None
+
+    def flush():
+        if start is not None:
+            heading = " > ".join(title for _, title in headings) or None
+            body = data[start:end].decode("utf-8")
+            chunks.append(Chunk(len(chunks), start, end, heading, body))
+
+    for kind, b_start, b_end, lines in _blocks(text):
+        if kind == "heading":
+            flush()
+            start = end = None
+            m = HEADING_RE.match(lines[0][0])
+            level = len(m.group(1))
+            headings = [h for h in headings if h[0] < level] + [(level, m.group(2))]
+            continue
+        if start is not None and b_end - start > max_bytes:
+            flush()
+            start = None
+        if start is None:
+            start = b_start
+        end = b_end
+    flush()
+    return chunks
+
+
+def chunk_records(text, max_records=MAX_RECORDS, max_bytes=MAX_CHUNK_BYTES):
+    """Record-aware chunks for one-record-per-line lists. Returns list of Chunk."""
+    data = text.encode("utf-8")
+    lines = list(_lines(text))
+    heading = None
+    first = 0
+    # Preamble: everything before the first blank line, if there is one
+    for i, (line, _, _) in enumerate(lines):
+        if not line.strip():
+            preamble = [l.strip() for l, _, _ in lines[:i] if l.strip()]
+            heading = preamble[0] if preamble else None
+            first = i + 1
+            break
+
+    chunks = []
+    group = []
+    for line, start, end in lines[first:]:
+        if not line.strip():
+            continue
+        if group and (len(group) >= max_records or end - group[0][1] > max_bytes):
+            s, e = group[0][1], group[-1][2]
+            chunks.append(Chunk(len(chunks), s, e, heading, data[s:e].decode("utf-8")))
+            group = []
+        group.append((line, start, end))
+    if group:
+        s, e = group[0][1], group[-1][2]
+        chunks.append(Chunk(len(chunks), s, e, heading, data[s:e].decode("utf-8")))
+    return chunks
+
+
+CHUNKERS = {
+    "markdown": chunk_markdown,
+    "records": chunk_records,
+}
+
+
+def detect_kind(source_file):
+    """Pick a chunker from the source file name: CSV-derived lists are records, the rest prose."""
+    if source_file and source_file.lower().endswith(".csv"):
+        return "records"
+    return "markdown"
+
+
+def chunk_text(text, kind="markdown"):
+    return CHUNKERS[kind](text)
+
+
+def backfill(batch_size=100):
+    """Chunk every content row that has no chunks yet.
+
+    Walks content by id, so rows that yield no chunks (empty or heading-only
+    text) are passed once instead of being selected again on every batch.
+    """
+    from write_binding import AbraWriter
+    writer = AbraWriter()
+    total = 0
+    last_id = 0
+    while True:
+        cur = writer.conn.cursor()
+        cur.execute("""
+            SELECT c.id, c.source_file, c.content FROM content c
+            WHERE c.id > %s
+              AND NOT EXISTS (SELECT 1 FROM content_chunks ch WHERE ch.content_id = c.id)
+            ORDER BY c.id LIMIT %s
+        """, (last_id, batch_size))
+        rows = cur.fetchall()
+        cur.close()
+        if not rows:
+            break
+        with writer.batch():
+            for cid, source_file, content in rows:
+                writer.chunk_content(cid, content, detect_kind(source_file))
+        last_id = rows[-1][0]
+        total += len(rows)
+        print(f"  chunked {total} content rows")
+    writer.close()
+    print(f"Done. {total} content rows chunked.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chunk content for precise retrieval")
+    parser.add_argument("--backfill", action="store_true", help="Chunk all content rows without chunks")
+    parser.add_argument("--show", metavar="FILE", help="Print the chunks a file would produce")
+    parser.add_argument("--kind", choices=sorted(CHUNKERS), help="Chunker to use with --show")
+    args = parser.parse_args()
+
+    if args.show:
+        with open(os.path.expanduser(args.show)) as f:
+            text = f.read()
+        for chunk in chunk_text(text, args.kind or detect_kind(args.show)):
+            heading = f"  § {chunk.heading}" if chunk.heading else ""
+            print(f"[{chunk.index}] bytes {chunk.start}-{chunk.end}{heading}")
+        return
+    if args.backfill:
+        backfill()
+        return
+    parser.print_help()
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -54,13 +54,16 @@ Staging file format (array of entries):
 target_ref of "__CONTENT_ID__" gets replaced with the actual content.id after insertion.
 """
 import os
-import re
 import sys
 import json
 import argparse
 import psycopg2
 from dotenv import load_dotenv
 
+from write_binding import (content_hash, check_pii, scrub_content, binding_pii, content_pii, binding_expiry,
+                           binding_params, BINDING_INSERT, BINDING_VALUES)
+from aliases import add_aliases
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 PG_HOST = os.getenv("PG_HOST", "10.0.0.100")
@@ -69,21 +72,6 @@ PG_USER = os.getenv("PG_USER", "cobox")
 PG_PASSWORD = os.getenv("PG_PASSWORD", "")
 PG_DATABASE = os.getenv("PG_DATABASE", "abra")
 
-# Patterns that suggest PII in a binding target_ref
-PII_PATTERNS = [
-    re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+'),  # email
-    re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),  # phone
-    re.compile(r'\b\d{5}(-\d{4})?\b'),  # zip code
-]
-
-
-def check_pii(target_ref):
-    """Return True if target_ref appears to contain PII."""
-    for pattern in PII_PATTERNS:
-        if pattern.search(target_ref):
-            return True
-    return False
-
 
 def import_staging(staging_file, dry_run=False):
     with open(staging_file) as f:
@@ -96,6 +84,10 @@ def import_staging(staging_file, dry_run=False):
     if dry_run:
         for entry in entries:
             print(f"\n  {entry['source_file']} ({entry.get('note_date', '?')})")
+            hits = content_pii.scan(entry['content'])
+            if hits:
+                detail = ", ".join(f"{cat} {n}" for cat, n in sorted(hits.items()))
+                print(f"    content PII: {detail} (will be handled per ABRA_CONTENT_PII)")
             for b in entry['bindings']:
                 qual = f' "{b["qualifier"]}"' if b.get('qualifier') else ''
                 pii_flag = " *** PII DETECTED - WILL SKIP ***" if check_pii(b.get('target_ref', '')) else ''
@@ -116,13 +108,26 @@ def import_staging(staging_file, dry_run=False):
 
     imported = 0
     skipped_pii = 0
+    skipped_content = 0
     for entry in entries:
-        # Insert content
+        content = scrub_content(entry['content'])
+        if content is None:
+            print(f"  SKIPPED (PII in content): {entry['source_file']}")
+            skipped_content += 1
+            continue
+
+        # Insert content (or reuse the existing row holding the same bytes)
+        digest = content_hash(content)
         cur.execute(
-            "INSERT INTO content (source_file, content, note_date) VALUES (%s, %s, %s) RETURNING id",
-            (entry['source_file'], entry['content'], entry.get('note_date'))
+            """INSERT INTO content (source_file, content, note_date, content_hash) VALUES (%s, %s, %s, %s)
+               ON CONFLICT (content_hash) DO NOTHING RETURNING id""",
+            (entry['source_file'], content, entry.get('note_date'), digest)
         )
-        content_id = cur.fetchone()[0]
+        row = cur.fetchone()
+        if row is None:
+            cur.execute("SELECT id FROM content WHERE content_hash = %s", (digest,))
+            row = cur.fetchone()
+        content_id = row[0]
 
         # Insert bindings
         for b in entry['bindings']:
@@ -137,12 +142,14 @@ def import_staging(staging_file, dry_run=False):
                 continue
 
             cur.execute(
-                """INSERT INTO bindings (scope, name, relationship, target_type, target_ref, qualifier, permanence, source_date, catcode)
-                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (b['scope'], b['name'], b['relationship'], b['target_type'],
-                 target_ref, b.get('qualifier'), b.get('permanence', 'CURRENT'),
-                 entry.get('note_date'), b.get('catcode'))
+                f"{BINDING_INSERT} {BINDING_VALUES} RETURNING name_id",
+                binding_params(b['scope'], b['name'], b['relationship'], b['target_type'],
+                               target_ref, b.get('qualifier'), b.get('permanence', 'CURRENT'),
+                               entry.get('note_date'), b.get('catcode'),
+                               binding_expiry(b.get('permanence', 'CURRENT'), b.get('expires_at'),
+                                              b.get('ttl_days')))
             )
+            add_aliases(cur, [(cur.fetchone()[0], b['name'], b['relationship'], b['target_type'], target_ref)])
 
         imported += 1
         conn.commit()
@@ -152,6 +159,11 @@ def import_staging(staging_file, dry_run=False):
     print(f"\nImported {imported} entries with bindings.")
     if skipped_pii:
         print(f"Skipped {skipped_pii} bindings containing PII. These belong in the CRM.")
+    if skipped_content:
+        print(f"Skipped {skipped_content} entries whose content contains PII.")
+    hits = binding_pii.counts + content_pii.counts
+    if hits:
+        print("PII hits: " + ", ".join(f"{cat} {n}" for cat, n in sorted(hits.items())))
 
 
 def main():
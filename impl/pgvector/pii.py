@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+PII scanner shared by everything that writes to pgvector.
+
+Design rule: no PII (email, phone, address) in pgvector. Contact details go
+to the CRM. All categories are combined into one alternation so a blob is
+scanned in a single pass, and every scanner keeps per-category hit counters.
+
+    from pii import PIIScanner
+    scanner = PIIScanner()
+    scanner.contains("call 520-555-1234")      # -> True (rejection)
+    scanner.redact("mail bob@example.com")     # -> ("mail [redacted-email]", Counter({'email': 1}))
+    scanner.scan_stream(open(path))            # -> Counter, reads in chunks
+    scanner.counts                             # cumulative hits per category
+
+Bindings are checked for every category. Content bodies default to email and
+phone only: five-digit numbers are too common in notes and project docs to
+treat as zip codes.
+
+Also usable as CLI to check files before importing them:
+    python pii.py ~/notes/*.txt
+"""
+import re
+import sys
+from collections import Counter
+
+# category -> (cheap lookahead a candidate must satisfy, pattern body).
+# Every pattern starts at a token boundary, so the combined regex first
+# rejects mid-word positions with one lookbehind, then the lookaheads, before
+# trying any alternative. Flags the same text as the old separate regexes
+# (email, r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', r'\b\d{5}(-\d{4})?\b'), in one pass.
+PATTERNS = {
+    "email": (r'[\w.+-]*@', r'(?<![\w.+-])[\w.+-]+@[\w-]+\.[\w.-]+'),
+    "phone": (r'\d', r'\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
+    "zip": (r'\d', r'\d{5}(?:-\d{4})?\b'),
+}
+CATEGORIES = tuple(PATTERNS)
+CONTENT_CATEGORIES = ("email", "phone")
+
+STREAM_CHUNK = 64 * 1024
+# Longest match we expect to straddle a chunk boundary
+STREAM_OVERLAP = 256
+
+
+def iter_chunks(text, size=STREAM_CHUNK):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+class PIIScanner:
+    def __init__(self, categories=CATEGORIES):
+        unknown = set(categories) - set(PATTERNS)
+        if unknown:
+            raise ValueError(f"Unknown PII categories: {', '.join(sorted(unknown))}")
+        self.categories = tuple(categories)
+        hints = dict.fromkeys(PATTERNS[c][0] for c in self.categories)
+        alternatives = "|".join(f"(?P<{c}>{PATTERNS[c][1]})" for c in self.categories)
+        self.pattern = re.compile(rf"(?<!\w)(?={'|'.join(hints)})(?:{alternatives})")
+        self.counts = Counter()
+
+    def find(self, text):
+        """Return the category of the first PII hit in text, or None."""
+        m = self.pattern.search(text)
+        if not m:
+            return None
+        self.counts[m.lastgroup] += 1
+        return m.lastgroup
+
+    def contains(self, text):
+        """True if text contains any PII. Stops at the first hit."""
+        return self.find(text) is not None
+
+    def scan(self, text):
+        """Count every PII hit in text. Returns Counter of category -> hits."""
+        hits = Counter(m.lastgroup for m in self.pattern.finditer(text))
+        self.counts.update(hits)
+        return hits
+
+    def redact(self, text):
+        """Replace PII with [redacted-<category>]. Returns (text, Counter of hits)."""
+        hits = Counter()
+
+        def replace(m):
+            hits[m.lastgroup] += 1
+            return f"[redacted-{m.lastgroup}]"
+
+        redacted = self.pattern.sub(replace, text)
+        self.counts.update(hits)
+        return redacted, hits
+
+    def _segments(self, chunks):
+        """Split a stream of text chunks into (category, text) segments.
+
+        category is None for plain text. Matches touching the end of the
+        buffer, or starting in the last STREAM_OVERLAP chars, are held back
+        until the next chunk arrives so nothing is split across a boundary.
+        One already-emitted char is kept in front of the carry so \\b sees the
+        real preceding character.
+        """
+        carry, ctx = "", 0
+        for chunk in chunks:
+            if not chunk:
+                continue
+            buf = carry + chunk
+            safe = max(ctx, len(buf) - STREAM_OVERLAP)
+            pos = ctx
+            for m in self.pattern.finditer(buf, ctx):
+                if m.end() >= len(buf) or m.start() >= safe:
+                    safe = min(safe, m.start())
+                    break
+                if m.start() > pos:
+                    yield None, buf[pos:m.start()]
+                yield m.lastgroup, m.group()
+                pos = m.end()
+            safe = max(safe, pos)
+            if safe > pos:
+                yield None, buf[pos:safe]
+            ctx = 1 if safe > 0 else 0
+            carry = buf[safe - ctx:]
+        pos = ctx
+        for m in self.pattern.finditer(carry, ctx):
+            if m.start() > pos:
+                yield None, carry[pos:m.start()]
+            yield m.lastgroup, m.group()
+            pos = m.end()
+        if pos < len(carry):
+            yield None, carry[pos:]
+
+    def scan_stream(self, chunks):
+        """Count PII hits over an iterable of text chunks (e.g. an open file)."""
+        hits = Counter(cat for cat, _ in self._segments(chunks) if cat)
+        self.counts.update(hits)
+        return hits
+
+    def redact_stream(self, chunks):
+        """Yield redacted text for an iterable of text chunks."""
+        for cat, text in self._segments(chunks):
+            if cat:
+                self.counts[cat] += 1
+                yield f"[redacted-{cat}]"
+            else:
+                yield text
+
+
+def scan_file(path, scanner=None):
+    """Stream a file through a scanner. Returns Counter of hits."""
+    scanner = scanner or PIIScanner()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return scanner.scan_stream(iter(lambda: f.read(STREAM_CHUNK), ""))
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python pii.py FILE [FILE ...]")
+        sys.exit(1)
+    scanner = PIIScanner()
+    flagged = 0
+    for path in sys.argv[1:]:
+        hits = scan_file(path, scanner)
+        if hits:
+            flagged += 1
+            detail = ", ".join(f"{cat} {n}" for cat, n in sorted(hits.items()))
+            print(f"  {path}: {detail}")
+    total = ", ".join(f"{cat} {n}" for cat, n in sorted(scanner.counts.items())) or "none"
+    print(f"\n{flagged}/{len(sys.argv) - 1} files contain PII ({total})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Render the catcode tree as a static site.
+
+Every registered catcode becomes a directory named from its label path
+(linkedtrust/2026/projects/), holding index.html and index.json with the
+bindings and content filed under it. Binding targets with PII are left out
+and content bodies are redacted, as in store_content. With --scope, only
+bindings in those scopes are published, with just the content they point to.
+
+Builds are incremental. The database returns one fingerprint per catcode
+(an md5 over its rows, computed server-side), and each page's hash covers
+those fingerprints plus its place in the tree. Only pages whose hash moved
+are fetched and re-rendered; .publish-manifest.json in the output directory
+records what was built. Files are written to a temp file and renamed, so a
+web server never sees a half-written page.
+
+Usage:
+    .venv/bin/python pgvector/admin.py publish ~/public/abra
+    .venv/bin/python pgvector/admin.py publish ~/public/abra --scope linkedtrust
+    .venv/bin/python pgvector/admin.py publish ~/public/abra --full
+"""
+import os
+import re
+import json
+import time
+import html
+import hashlib
+from collections import namedtuple, defaultdict
+
+from pii import PIIScanner, CONTENT_CATEGORIES
+
+# Bump when the page layout changes, so the next run re-renders everything
+TEMPLATE_VERSION = 1
+MANIFEST = ".publish-manifest.json"
+
+Binding = namedtuple("Binding", "id catcode scope name relationship target_type target_ref "
+                                "qualifier source_date content_catcode")
+Blob = namedtuple("Blob", "id catcode source_file note_date content")
+
+binding_pii = PIIScanner()
+content_pii = PIIScanner(CONTENT_CATEGORIES)
+
+
+class StoreSource:
+    """Rows to publish, read from the abra database."""
+
+    def __init__(self, conn, scopes=None):
+        self.conn = conn
+        self.scopes = list(scopes) if scopes else None
+
+    def _scope_filter(self):
+        if self.scopes:
+            return " AND b.scope = ANY(%s)", [self.scopes]
+        return "", []
+
+    def _content_filter(self):
+        # With scopes, only blobs a published binding points to; other
+        # scopes' notes filed under the same catcode stay private
+        if self.scopes:
+            return """ AND EXISTS (SELECT 1 FROM bindings b WHERE b.target_type = 'content'
+                                   AND b.target_ref = c.id::text AND b.scope = ANY(%s))""", [self.scopes]
+        return "", []
+
+    def fingerprints(self):
+        """{catcode: fingerprint} over the bindings and content filed under it."""
+        where, params = self._scope_filter()
+        cur = self.conn.cursor()
+        cur.execute(f"""
+            SELECT b.catcode, md5(string_agg(md5(concat_ws('|', b.id, b.scope, b.name,
+                       b.relationship, b.target_type, b.target_ref, b.qualifier,
+                       b.source_date, c.catcode)), '' ORDER BY b.id))
+            FROM bindings_named b
+            LEFT JOIN content c ON b.target_type = 'content' AND c.id::text = b.target_ref
+            WHERE b.catcode IS NOT NULL{where}
+            GROUP BY b.catcode
+        """, params)
+        prints = {code: f"b:{fp}" for code, fp in cur.fetchall()}
+        where, params = self._content_filter()
+        cur.execute(f"""
+            SELECT c.catcode, md5(string_agg(concat_ws('|', c.id, c.content_hash, c.source_file,
+                                                       c.note_date), '' ORDER BY c.id))
+            FROM content c WHERE c.catcode IS NOT NULL{where}
+            GROUP BY c.catcode
+        """, params)
+        for code, fp in cur.fetchall():
+            prints[code] = prints.get(code, "") + f" c:{fp}"
+        cur.close()
+        return prints
+
+    def rows(self, catcodes):
+        """(bindings, blobs) filed under exactly these catcodes."""
+        where, params = self._scope_filter()
+        cur = self.conn.cursor()
+        cur.execute(f"""
+            SELECT b.id, b.catcode, b.scope, b.name, b.relationship, b.target_type, b.target_ref,
+                   b.qualifier, b.source_date, c.catcode
+            FROM bindings_named b
+            LEFT JOIN content c ON b.target_type = 'content' AND c.id::text = b.target_ref
+            WHERE b.catcode = ANY(%s){where}
+            ORDER BY b.name, b.id
+        """, [list(catcodes)] + params)
+        bindings = [Binding(*r) for r in cur.fetchall()]
+        where, params = self._content_filter()
+        cur.execute(f"""
+            SELECT c.id, c.catcode, c.source_file, c.note_date, c.content FROM content c
+            WHERE c.catcode = ANY(%s){where}
+            ORDER BY c.note_date NULLS LAST, c.id
+        """, [list(catcodes)] + params)
+        blobs = [Blob(*r) for r in cur.fetchall()]
+        cur.close()
+        return bindings, blobs
+
+
+def slug(segment):
+    return re.sub(r"[^a-z0-9-]+", "-", segment.lower()).strip("-")
+
+
+def page_paths(tree):
+    """{catcode: relative directory} for every node; siblings never share one."""
+    paths = {}
+    for node, _ in tree.walk():
+        parent = paths[node.parent.code] if node.parent else ""
+        taken = {paths[c.code] for c in (node.parent.children if node.parent else tree.roots)
+                 if c.code in paths}
+        path = os.path.join(parent, slug(node.segment) or node.code)
+        if path in taken:
+            path = os.path.join(parent, f"{slug(node.segment)}-{node.code}".strip("-"))
+        paths[node.code] = path
+    return paths
+
+
+def atomic_write(path, text):
+    """Write text to path via a temp file and rename."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _link(from_dir, to_dir, anchor=""):
+    rel = os.path.relpath(to_dir or ".", from_dir or ".")
+    return f"{rel}/index.html{anchor}"
+
+
+class Publisher:
+    def __init__(self, out_dir, source, tree):
+        self.out_dir = out_dir
+        self.source = source
+        self.tree = tree
+        self.paths = page_paths(tree)
+        self.stats = {"pages": 0, "rendered": 0, "unchanged": 0, "removed": 0,
+                      "bindings": 0, "blobs": 0, "pii_skipped": 0}
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.out_dir, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _page_hash(self, node, prints):
+        """Hash of everything a node's page shows: its rows' fingerprints,
+        its label, breadcrumbs and child links."""
+        crumbs = []
+        up = node.parent
+        while up:
+            crumbs.append((up.segment, self.paths[up.code]))
+            up = up.parent
+        data = {
+            "v": TEMPLATE_VERSION, "label": node.label, "path": self.paths[node.code],
+            "rows": prints, "crumbs": crumbs,
+            "children": [(c.code, c.segment, self.paths[c.code]) for c in node.children],
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+    def build(self, full=False):
+        start = time.perf_counter()
+        os.makedirs(self.out_dir, exist_ok=True)
+        old = self._load_manifest()
+
+        # Each row's catcode counts towards its nearest registered node
+        owned = defaultdict(list)
+        for code, fp in self.source.fingerprints().items():
+            node = self.tree.node(code)
+            if node:
+                owned[node.code].append((code, fp))
+
+        manifest = {}
+        stale = []
+        for code, node in self.tree.nodes.items():
+            digest = self._page_hash(node, sorted(owned.get(code, [])))
+            manifest[code] = {"hash": digest, "path": self.paths[code]}
+            prev = old.get(code)
+            if not full and prev and prev["hash"] == digest and prev["path"] == self.paths[code]:
+                self.stats["unchanged"] += 1
+            else:
+                stale.append(node)
+        self.stats["pages"] = len(manifest)
+
+        # Pages that went away or moved; before rendering, so a page that
+        # moved into a freed path is not deleted after it is written
+        for code, prev in old.items():
+            if code and (code not in manifest or manifest[code]["path"] != prev["path"]):
+                self._remove(prev["path"])
+
+        # Fetch rows for stale pages only, a few hundred catcodes per query
+        for i in range(0, len(stale), 200):
+            group = stale[i:i + 200]
+            raw = [c for node in group for c, _ in owned.get(node.code, [])]
+            bindings, blobs = self.source.rows(raw) if raw else ([], [])
+            by_node = defaultdict(lambda: ([], []))
+            for b in bindings:
+                by_node[self.tree.node(b.catcode).code][0].append(b)
+            for blob in blobs:
+                by_node[self.tree.node(blob.catcode).code][1].append(blob)
+            for node in group:
+                self.render(node, *by_node[node.code])
+                self.stats["rendered"] += 1
+
+        self._render_root(None if full else old.get("", {}).get("hash"), manifest)
+        atomic_write(os.path.join(self.out_dir, MANIFEST), json.dumps(manifest))
+        self.stats["seconds"] = time.perf_counter() - start
+        return self.stats
+
+    def _remove(self, path):
+        directory = os.path.join(self.out_dir, path)
+        for name in ("index.html", "index.json"):
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+        # Leave directories that still hold other pages
+        while directory != self.out_dir:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+        self.stats["removed"] += 1
+
+    def _render_root(self, prev_hash, manifest):
+        roots = [(n.code, n.segment, self.paths[n.code]) for n in self.tree.roots]
+        digest = hashlib.sha256(json.dumps([TEMPLATE_VERSION, roots]).encode()).hexdigest()
+        manifest[""] = {"hash": digest, "path": ""}
+        if digest == prev_hash and os.path.exists(os.path.join(self.out_dir, "index.html")):
+            return
+        items = "".join(f'<li><a href="{html.escape(path)}/index.html">{html.escape(segment)}</a>'
+                        f' <code>{code}</code></li>\n' for code, segment, path in roots)
+        atomic_write(os.path.join(self.out_dir, "index.html"), PAGE.format(
+            title="abra", crumbs="", body=f"<ul>\n{items}</ul>"))
+
+    def render(self, node, bindings, blobs):
+        """Write index.html and index.json for one catcode."""
+        here = self.paths[node.code]
+        directory = os.path.join(self.out_dir, here)
+        os.makedirs(directory, exist_ok=True)
+
+        published = []
+        for b in bindings:
+            if binding_pii.contains(b.target_ref):
+                self.stats["pii_skipped"] += 1
+                continue
+            published.append(b)
+        texts = [(blob, content_pii.redact(blob.content)[0]) for blob in blobs]
+        self.stats["bindings"] += len(published)
+        self.stats["blobs"] += len(texts)
+
+        crumbs = []
+        up = node.parent
+        while up:
+            crumbs.append(f'<a href="{_link(here, self.paths[up.code])}">{html.escape(up.segment)}</a>')
+            up = up.parent
+        crumbs.append(f'<a href="{_link(here, "")}">abra</a>')
+
+        parts = [f"<p><code>{node.code}</code></p>"]
+        if node.children:
+            parts.append("<h2>Below</h2>\n<ul>")
+            parts.extend(f'<li><a href="{_link(here, self.paths[c.code])}">{html.escape(c.segment)}</a></li>'
+                         for c in node.children)
+            parts.append("</ul>")
+        if published:
+            parts.append("<h2>Bindings</h2>\n<table>")
+            for b in published:
+                parts.append(f"<tr><td>{html.escape(b.name)}</td><td>{b.relationship}</td>"
+                             f"<td>{self._target(here, b)}</td>"
+                             f"<td>{html.escape(b.qualifier or '')}</td><td>{b.source_date or ''}</td></tr>")
+            parts.append("</table>")
+        for blob, text in texts:
+            date = f" ({blob.note_date})" if blob.note_date else ""
+            parts.append(f'<h3 id="c{blob.id}">{html.escape(blob.source_file or f"content {blob.id}")}'
+                         f"{date}</h3>\n<pre>{html.escape(text)}</pre>")
+
+        atomic_write(os.path.join(directory, "index.html"), PAGE.format(
+            title=html.escape(node.label), crumbs=" / ".join(reversed(crumbs)), body="\n".join(parts)))
+        atomic_write(os.path.join(directory, "index.json"), json.dumps({
+            "catcode": node.code, "label": node.label,
+            "children": [{"catcode": c.code, "label": c.label, "path": self.paths[c.code]}
+                         for c in node.children],
+            "bindings": [{"name": b.name, "relationship": b.relationship, "target_type": b.target_type,
+                          "target_ref": b.target_ref, "qualifier": b.qualifier,
+                          "source_date": str(b.source_date) if b.source_date else None}
+                         for b in published],
+            "content": [{"id": blob.id, "source_file": blob.source_file,
+                         "note_date": str(blob.note_date) if blob.note_date else None, "content": text}
+                        for blob, text in texts],
+        }, indent=1))
+
+    def _target(self, here, b):
+        if b.target_type != "content":
+            return html.escape(b.target_ref)
+        node = self.tree.node(b.content_catcode) if b.content_catcode else None
+        if node is None:
+            return f"content {html.escape(b.target_ref)}"
+        href = _link(here, self.paths[node.code], f"#c{b.target_ref}")
+        return f'<a href="{html.escape(href)}">content {html.escape(b.target_ref)}</a>'
+
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<nav>{crumbs}</nav>
+<h1>{title}</h1>
+{body}
+</body></html>
+"""
+
+
+def publish(out_dir, scopes=None, full=False):
+    """Build or update the site in out_dir from the database. Returns build stats."""
+    from query import get_conn
+    from catcode_tree import get_tree
+    conn = get_conn()
+    tree = get_tree(conn, counts=False)
+    stats = Publisher(os.path.expanduser(out_dir), StoreSource(conn, scopes), tree).build(full=full)
+    conn.close()
+    return stats
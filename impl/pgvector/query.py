@@ -7,17 +7,26 @@ Usage:
     .venv/bin/python pgvector/query.py who credentials
     .venv/bin/python pgvector/query.py who "workforce dev"
 
-    # What do I know about someone?
+    # What do I know about someone? (pet name, or real name / nickname / surname)
     .venv/bin/python pgvector/query.py about bobbi-vernon
     .venv/bin/python pgvector/query.py about eric
+    .venv/bin/python pgvector/query.py about "Ussher"
+    .venv/bin/python pgvector/query.py about eric --crm   # + company/title from Odoo
 
     # Who did I meet in a time range?
     .venv/bin/python pgvector/query.py when 2025-10
     .venv/bin/python pgvector/query.py when 2025-07 2025-08
+    .venv/bin/python pgvector/query.py when --last 90d
+    .venv/bin/python pgvector/query.py when 2025-01 2026-01 --histogram week
 
-    # Search note content
+    # Search note content (prints matching chunks; --context N adds neighbours)
     .venv/bin/python pgvector/query.py search "cooperative"
-    .venv/bin/python pgvector/query.py search "donor advised"
+    .venv/bin/python pgvector/query.py search "donor advised" --context 1
+
+    # Read a blob, one chunk of it, or only the chunks matching a term
+    .venv/bin/python pgvector/query.py read 35
+    .venv/bin/python pgvector/query.py read 35:4 --context 1
+    .venv/bin/python pgvector/query.py read streetwell --match funding
 
     # Who is related to a name/topic?
     .venv/bin/python pgvector/query.py related linkedtrust
@@ -29,13 +38,22 @@ Usage:
     # Dump all names (with optional prefix filter)
     .venv/bin/python pgvector/query.py names
     .venv/bin/python pgvector/query.py names eric
+
+    # Browse the catcode tree with per-subtree binding/content counts
+    .venv/bin/python pgvector/query.py tree
+    .venv/bin/python pgvector/query.py tree linkedtrust/2026 --depth 1
 """
 import os
+import re
 import sys
 import argparse
+import calendar
+from datetime import date, timedelta
 import psycopg2
 from dotenv import load_dotenv
 
+from aliases import suggest_names, print_suggestions
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 PG_HOST = os.getenv("PG_HOST", "10.0.0.100")
@@ -52,14 +70,41 @@ def get_conn():
     )
 
 
+# Live and archived bindings together, for --include-archived
+WITH_ARCHIVE = """(
+        SELECT id, scope, name_id, relationship_id, target_type, target_ref, qualifier,
+               permanence, source_date, catcode, created_at, expires_at{named} FROM {live}
+        UNION ALL
+        SELECT id, scope, name_id, relationship_id, target_type, target_ref, qualifier,
+               permanence, source_date, catcode, created_at, expires_at{named} FROM {archive}
+    )"""
+
+# Relationship ids for filters on the integer-keyed tables
+ABOUT = "(SELECT id FROM relationship_types WHERE relationship = 'ABOUT')"
+RELATED = "(SELECT id FROM relationship_types WHERE relationship = 'RELATED')"
+
+
+def bindings_from(args, named=True):
+    """Table (or union) a query should read bindings from.
+
+    named reads the bindings_named view, which joins in the name and
+    relationship strings; otherwise rows carry only name_id/relationship_id.
+    """
+    live, archive = ("bindings_named", "bindings_archive_named") if named else ("bindings", "bindings_archive")
+    if not getattr(args, "include_archived", False):
+        return live
+    return WITH_ARCHIVE.format(live=live, archive=archive, named=", name, relationship" if named else "")
+
+
 def cmd_who(args):
     """Find people by topic/qualifier keyword."""
+    table = bindings_from(args)
     term = args.term
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("""
+    cur.execute(f"""
         SELECT DISTINCT b.name, b.qualifier, b.source_date
-        FROM bindings b
+        FROM {table} b
         WHERE b.scope = %s
         AND b.relationship = 'ABOUT'
         AND b.qualifier ILIKE %s
@@ -68,9 +113,9 @@ def cmd_who(args):
     rows = cur.fetchall()
     if not rows:
         # Also try content search as fallback
-        cur.execute("""
+        cur.execute(f"""
             SELECT DISTINCT b.name, b.qualifier, b.source_date
-            FROM bindings b
+            FROM {table} b
             JOIN content c ON c.id = CAST(b.target_ref AS INTEGER)
             WHERE b.scope = %s
             AND b.relationship = 'ABOUT'
@@ -92,58 +137,152 @@ def cmd_who(args):
     conn.close()
 
 
+CRM_REF = re.compile(r'^crm:odoo/contact/(\d+)$')
+
+
+def resolve_crm_refs(bindings):
+    """Look up company/title for every crm:odoo/contact/ID ref in one CRM call.
+
+    Returns {odoo_id: details or None}; empty if the CRM is not configured or
+    unreachable, so `about` still prints everything it knows locally.
+    """
+    ids = [int(m.group(1)) for b in bindings
+           for m in [CRM_REF.match(b[3] or "")] if m]
+    if not ids:
+        return {}
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'connectors', 'odoo'))
+    from connector import OdooConnector
+    from partner_cache import PartnerCache
+    crm = OdooConnector()
+    if not crm.is_ready():
+        print("(CRM not ready, skipping --crm. Check ~/.abra/sources.yaml)\n")
+        return {}
+    cache = PartnerCache()
+    try:
+        details = cache.resolve(crm, ids)
+    except Exception as e:
+        print(f"(CRM lookup failed: {e})\n")
+        return {}
+    cache.save()
+    return details
+
+
+def print_alias_notes(term, aliased):
+    """Say how term led to names it is not a substring of."""
+    notes = [s for s in aliased if term.lower() not in s.name.lower()]
+    for s in notes:
+        print(f"('{term}' is {s.name}, via '{s.via}')")
+    if notes:
+        print()
+
+
 def cmd_about(args):
     """Show everything known about a name."""
+    table = bindings_from(args)
     name = args.name
     conn = get_conn()
     cur = conn.cursor()
-    # Find matching names
-    cur.execute("""
-        SELECT DISTINCT name FROM bindings
-        WHERE scope = %s AND name ILIKE %s
-        ORDER BY name
-    """, (args.scope, f"%{name}%"))
-    names = [r[0] for r in cur.fetchall()]
-    if not names:
+    # Real names, surnames, nicknames and unaccented spellings through
+    # name_aliases; misspellings only come back as suggestions
+    suggestions = suggest_names(cur, args.scope, name, include_archived=args.include_archived)
+    aliased = [s for s in suggestions if s.exact]
+    # Names containing the term or exactly aliased by it that still have bindings
+    cur.execute(f"""
+        SELECT n.id, n.name FROM names n
+        WHERE n.scope = %s AND (n.name ILIKE %s OR n.id = ANY(%s))
+        AND EXISTS (SELECT 1 FROM {bindings_from(args, named=False)} b
+                    WHERE b.scope = n.scope AND b.name_id = n.id)
+        ORDER BY n.name
+    """, (args.scope, f"%{name}%", [s.name_id for s in aliased]))
+    matched = cur.fetchall()
+    if not matched:
         print(f"No names matching '{name}'")
+        print_suggestions(suggestions)
         cur.close()
         conn.close()
         return
-
+    print_alias_notes(name, aliased)
+    names = [n for _, n in matched]
+
+    # One query for all bindings and one for all content snippets, however many names match
+    cur.execute(f"""
+        SELECT name, relationship, target_type, target_ref, qualifier, source_date
+        FROM {table}
+        WHERE scope = %s AND name_id = ANY(%s)
+        ORDER BY name, relationship, source_date
+    """, (args.scope, [i for i, _ in matched]))
+    bindings = cur.fetchall()
+    content_ids = {int(b[3]) for b in bindings
+                   if b[1] == 'ABOUT' and b[2] == 'content' and (b[3] or "").isdigit()}
+    snippets = {}
+    if content_ids:
+        cur.execute("SELECT id, source_file, LEFT(content, 200) FROM content WHERE id = ANY(%s)",
+                    (list(content_ids),))
+        snippets = {cid: (source, text) for cid, source, text in cur.fetchall()}
+    crm = resolve_crm_refs(bindings) if args.crm else {}
+
+    by_name = {}
+    for b in bindings:
+        by_name.setdefault(b[0], []).append(b[1:])
     for n in names:
         print(f"=== {n} ===")
-        cur.execute("""
-            SELECT relationship, target_type, target_ref, qualifier, source_date
-            FROM bindings
-            WHERE scope = %s AND name = %s
-            ORDER BY relationship, source_date
-        """, (args.scope, n))
-        for rel, ttype, tref, qual, date in cur.fetchall():
+        for rel, ttype, tref, qual, date in by_name.get(n, []):
             d = f" ({date})" if date else ""
             q = f" [{qual}]" if qual else ""
-            if rel == 'ABOUT' and ttype == 'content':
-                # Fetch content snippet
-                try:
-                    cur2 = conn.cursor()
-                    cur2.execute("SELECT source_file, LEFT(content, 200) FROM content WHERE id = %s", (int(tref),))
-                    row = cur2.fetchone()
-                    cur2.close()
-                    if row:
-                        print(f"  {rel}{q}{d}")
-                        print(f"    source: {row[0]}")
-                        print(f"    {row[1][:150]}...")
-                        continue
-                except (ValueError, TypeError):
-                    pass
+            if rel == 'ABOUT' and ttype == 'content' and (tref or "").isdigit():
+                row = snippets.get(int(tref))
+                if row:
+                    print(f"  {rel}{q}{d}")
+                    print(f"    source: {row[0]}")
+                    print(f"    {row[1][:150]}...")
+                    continue
             print(f"  {rel} [{ttype}] {tref[:80]}{q}{d}")
+            m = CRM_REF.match(tref or "")
+            if m and int(m.group(1)) in crm:
+                details = crm[int(m.group(1))]
+                if details is None:
+                    print("    (no longer in CRM)")
+                else:
+                    shown = [v for v in (details.get("function"), details.get("company_name")) if v]
+                    if shown:
+                        print(f"    {' at '.join(shown)}")
         print()
     cur.close()
     conn.close()
 
 
-def cmd_when(args):
-    """Find contacts by date range."""
-    start = args.start
+LAST_UNITS = {"d": "days", "w": "weeks", "m": "months", "y": "years"}
+
+
+def months_back(day, n):
+    """Same day n months earlier, clamped to the end of shorter months."""
+    y, m = divmod(day.year * 12 + day.month - 1 - n, 12)
+    return day.replace(year=y, month=m + 1, day=min(day.day, calendar.monthrange(y, m + 1)[1]))
+
+
+def parse_last(value, today=None):
+    """Start date for --last 90d / 12w / 6m / 1y."""
+    m = re.fullmatch(r"(\d+)([dwmy])", value.strip().lower())
+    if not m:
+        raise ValueError(f"--last wants a count and unit (d, w, m, y), e.g. 90d; got '{value}'")
+    n, unit = int(m.group(1)), m.group(2)
+    today = today or date.today()
+    if unit == "d":
+        return today - timedelta(days=n)
+    if unit == "w":
+        return today - timedelta(weeks=n)
+    return months_back(today, n * 12 if unit == "y" else n)
+
+
+def when_window(args):
+    """(start_date, end_date) for cmd_when; end_date None means open-ended."""
+    if args.last:
+        return parse_last(args.last).isoformat(), None
+    start = args.since or args.start
+    if not start:
+        raise ValueError("when needs a date, --since DATE or --last 90d")
+    if args.since:
+        return (start + "-01" if len(start) == 7 else start), None
     # If just a month like "2025-10", expand
     if len(start) == 7:
         start_date = start + "-01"
@@ -160,44 +299,165 @@ def cmd_when(args):
     else:
         start_date = start
         end_date = args.end or "2099-12-31"
+    return start_date, end_date
+
+
+def cmd_when(args):
+    """Find contacts by date range, or count them per day/week/month."""
+    table = bindings_from(args, named=False)
+    try:
+        start_date, end_date = when_window(args)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    span = f"{start_date} to {end_date}" if end_date else f"{start_date} on"
+    # Range scans use idx_bindings_scope_rel_date (scope, relationship_id, source_date)
+    where = f"b.scope = %s AND b.relationship_id = {ABOUT} AND b.source_date >= %s"
+    params = [args.scope, start_date]
+    if end_date:
+        where += " AND b.source_date < %s"
+        params.append(end_date)
 
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("""
-        SELECT DISTINCT b.name, b.qualifier, b.source_date
-        FROM bindings b
-        WHERE b.scope = %s
-        AND b.relationship = 'ABOUT'
-        AND b.source_date >= %s AND b.source_date < %s
-        ORDER BY b.source_date, b.name
-    """, (args.scope, start_date, end_date))
+    if args.histogram:
+        when_histogram(cur, args, where, params, span)
+        cur.close()
+        conn.close()
+        return
+    cur.execute(f"""
+        SELECT DISTINCT n.name, b.qualifier, b.source_date
+        FROM {table} b
+        JOIN names n ON n.id = b.name_id
+        WHERE {where}
+        ORDER BY b.source_date, n.name
+    """, params)
     rows = cur.fetchall()
     if not rows:
-        print(f"No contacts found for {start_date} to {end_date}")
+        print(f"No contacts found for {span}")
     else:
-        print(f"Contacts from {start_date} to {end_date}:\n")
+        print(f"Contacts from {span}:\n")
         for name, qual, date in rows:
             print(f"  {date}: {name} — {qual}")
     cur.close()
     conn.close()
 
 
+def when_histogram(cur, args, where, params, span):
+    """One aggregate query: bindings, distinct names and top names per bucket."""
+    table = bindings_from(args, named=False)
+    # Grouped by name_id; only the names that make a top list are looked up
+    cur.execute(f"""
+        WITH hits AS (
+            SELECT date_trunc(%s, b.source_date)::date AS bucket, b.name_id, COUNT(*) AS n
+            FROM {table} b
+            WHERE {where}
+            GROUP BY 1, 2
+        ), ranked AS (
+            SELECT bucket, name_id, n,
+                   ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY n DESC, name_id) AS rank
+            FROM hits
+        ), leaders AS (
+            SELECT r.bucket, r.rank, n.name FROM ranked r
+            JOIN names n ON n.id = r.name_id
+            WHERE r.rank <= %s
+        )
+        SELECT bucket, SUM(n)::int, COUNT(*)::int,
+               (SELECT array_agg(l.name ORDER BY l.rank) FROM leaders l WHERE l.bucket = ranked.bucket)
+        FROM ranked
+        GROUP BY bucket
+        ORDER BY bucket
+    """, [args.histogram] + params + [args.top])
+    rows = cur.fetchall()
+    if not rows:
+        print(f"No contacts found for {span}")
+        return
+    print(f"Per {args.histogram}, {span}:\n")
+    peak = max(total for _, total, _, _ in rows)
+    label = {"day": 10, "week": 10, "month": 7}[args.histogram]
+    for bucket, total, names, top in rows:
+        bar = "#" * max(1, round(20 * total / peak))
+        print(f"  {str(bucket)[:label]:10s} {bar:20s} {total:5d} ({names} names) {', '.join(top)}")
+    print(f"\n  {sum(r[1] for r in rows)} bindings in {len(rows)} {args.histogram}s")
+
+
+def fetch_chunks(cur, content_id, first, last):
+    """Chunks first..last (inclusive) of a content blob, in order."""
+    cur.execute("""
+        SELECT chunk_index, start_byte, end_byte, heading, body
+        FROM content_chunks
+        WHERE content_id = %s AND chunk_index BETWEEN %s AND %s
+        ORDER BY chunk_index
+    """, (content_id, first, last))
+    return cur.fetchall()
+
+
+def print_chunk_hits(cur, hits, context):
+    """Print matching chunks grouped by blob, with `context` neighbours each side."""
+    by_content = {}
+    for cid, idx, src, date in hits:
+        by_content.setdefault((cid, src, date), []).append(idx)
+    for (cid, src, date), indexes in by_content.items():
+        print(f"  [{cid}] {src} ({date})")
+        # Merge overlapping context windows
+        windows = []
+        for idx in sorted(indexes):
+            first, last = max(0, idx - context), idx + context
+            if windows and first <= windows[-1][1] + 1:
+                windows[-1][1] = max(windows[-1][1], last)
+            else:
+                windows.append([first, last])
+        for first, last in windows:
+            for idx, start, end, heading, body in fetch_chunks(cur, cid, first, last):
+                marker = "*" if idx in indexes else " "
+                h = f"  § {heading}" if heading else ""
+                print(f"   {marker}[{cid}:{idx}] bytes {start}-{end}{h}")
+                for line in body.strip().split('\n'):
+                    print(f"      {line}")
+        print()
+
+
 def cmd_search(args):
-    """Search note content."""
+    """Search note content. Returns the matching chunks, not whole blobs."""
     term = args.term
     conn = get_conn()
     cur = conn.cursor()
+    cur.execute("""
+        SELECT ch.content_id, ch.chunk_index, c.source_file, c.note_date
+        FROM content_chunks ch
+        JOIN content c ON c.id = ch.content_id
+        WHERE ch.tsv @@ plainto_tsquery('english', %s)
+        ORDER BY c.note_date, ch.content_id, ch.chunk_index
+    """, (term,))
+    hits = cur.fetchall()
+    if not hits:
+        # Substring fallback for terms the English stemmer drops or mangles
+        cur.execute("""
+            SELECT ch.content_id, ch.chunk_index, c.source_file, c.note_date
+            FROM content_chunks ch
+            JOIN content c ON c.id = ch.content_id
+            WHERE ch.body ILIKE %s
+            ORDER BY c.note_date, ch.content_id, ch.chunk_index
+        """, (f"%{term}%",))
+        hits = cur.fetchall()
+    if hits:
+        print(f"Notes matching '{term}':\n")
+        print_chunk_hits(cur, hits, args.context)
+
+    # Content stored before chunking existed (run `python chunking.py --backfill`)
     cur.execute("""
         SELECT c.id, c.source_file, c.note_date, c.content
         FROM content c
         WHERE c.content ILIKE %s
+        AND NOT EXISTS (SELECT 1 FROM content_chunks ch WHERE ch.content_id = c.id)
         ORDER BY c.note_date
     """, (f"%{term}%",))
     rows = cur.fetchall()
-    if not rows:
+    if not rows and not hits:
         print(f"No notes matching '{term}'")
-    else:
-        print(f"Notes matching '{term}':\n")
+    elif rows:
+        if not hits:
+            print(f"Notes matching '{term}':\n")
         for cid, src, date, content in rows:
             print(f"  [{cid}] {src} ({date})")
             # Show up to 5 matching lines
@@ -218,13 +478,14 @@ def cmd_search(args):
 
 def cmd_related(args):
     """Find who is related to a name or topic."""
+    table = bindings_from(args)
     target = args.target
     conn = get_conn()
     cur = conn.cursor()
     # RELATED bindings where target_ref matches
-    cur.execute("""
+    cur.execute(f"""
         SELECT b.name, b.qualifier, b.source_date
-        FROM bindings b
+        FROM {table} b
         WHERE b.scope = %s
         AND b.relationship = 'RELATED'
         AND (b.target_ref ILIKE %s OR b.qualifier ILIKE %s)
@@ -244,11 +505,12 @@ def cmd_related(args):
 
 def cmd_refs(args):
     """List all LinkedTrust reference docs."""
+    table = bindings_from(args)
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("""
+    cur.execute(f"""
         SELECT b.name, b.qualifier, b.source_date
-        FROM bindings b
+        FROM {table} b
         WHERE b.scope = 'linkedtrust'
         AND b.relationship = 'ABOUT'
         ORDER BY b.source_date NULLS LAST
@@ -267,19 +529,24 @@ def cmd_refs(args):
 
 def cmd_names(args):
     """List names that have context (ABOUT or RELATED bindings)."""
+    table = bindings_from(args, named=False)
     prefix = args.prefix or ""
     conn = get_conn()
     cur = conn.cursor()
-    cur.execute("""
-        SELECT DISTINCT b.name, b.qualifier, b.source_date
-        FROM bindings b
-        WHERE b.scope = %s AND b.name ILIKE %s
-        AND b.relationship IN ('ABOUT', 'RELATED')
-        ORDER BY b.name
+    cur.execute(f"""
+        SELECT DISTINCT n.name, b.qualifier, b.source_date
+        FROM names n
+        JOIN {table} b ON b.scope = n.scope AND b.name_id = n.id
+        WHERE n.scope = %s AND n.name ILIKE %s
+        AND b.relationship_id IN ({ABOUT}, {RELATED})
+        ORDER BY n.name
     """, (args.scope, f"{prefix}%"))
     rows = cur.fetchall()
     if not rows:
         print(f"No names matching '{prefix}*'")
+        if prefix:
+            print_suggestions(suggest_names(cur, args.scope, prefix,
+                                            include_archived=args.include_archived))
     else:
         # Group by name, show first qualifier
         seen = {}
@@ -295,39 +562,62 @@ def cmd_names(args):
 
 
 def cmd_read(args):
-    """Read the full content linked to a name or content ID."""
+    """Read the full content linked to a name or content ID, or one chunk of it."""
+    table = bindings_from(args)
     target = args.target
     conn = get_conn()
     cur = conn.cursor()
+    # CONTENT_ID:CHUNK as printed by search — just that chunk and its neighbours
+    if ":" in target:
+        cid, _, idx = target.partition(":")
+        if cid.isdigit() and idx.isdigit():
+            cur.execute("SELECT source_file, note_date FROM content WHERE id = %s", (int(cid),))
+            row = cur.fetchone()
+            if row:
+                print_chunk_hits(cur, [(int(cid), int(idx), row[0], row[1])], args.context)
+            else:
+                print(f"No content {cid}")
+            cur.close()
+            conn.close()
+            return
     # Try as content ID first
     try:
         cid = int(target)
         cur.execute("SELECT source_file, note_date, content FROM content WHERE id = %s", (cid,))
         row = cur.fetchone()
         if row:
-            print(f"[{cid}] {row[0]} ({row[1]})\n")
-            print(row[2])
+            if args.match:
+                print_matching_chunks(cur, [(cid, row[0], row[1], row[2])], args.match, args.context)
+            else:
+                print(f"[{cid}] {row[0]} ({row[1]})\n")
+                print(row[2])
             cur.close()
             conn.close()
             return
     except ValueError:
         pass
-    # Find by name — get all ABOUT content bindings
-    cur.execute("""
+    # Find by name (containing the term, or exactly aliased by it as in
+    # about) — get all ABOUT content bindings
+    suggestions = suggest_names(cur, args.scope, target, include_archived=args.include_archived)
+    aliased = [s for s in suggestions if s.exact]
+    cur.execute(f"""
         SELECT c.id, c.source_file, c.note_date, c.content
-        FROM bindings b
+        FROM {table} b
         JOIN content c ON c.id = CAST(b.target_ref AS INTEGER)
-        WHERE b.name ILIKE %s
+        WHERE b.scope = %s
+        AND (b.name ILIKE %s OR b.name_id = ANY(%s))
         AND b.relationship = 'ABOUT'
         AND b.target_type = 'content'
         ORDER BY c.note_date
-    """, (f"%{target}%",))
+    """, (args.scope, f"%{target}%", [s.name_id for s in aliased]))
     rows = cur.fetchall()
-    if not rows:
+    if rows:
+        print_alias_notes(target, aliased)
+    else:
         # Try linkedtrust scope too
-        cur.execute("""
+        cur.execute(f"""
             SELECT c.id, c.source_file, c.note_date, c.content
-            FROM bindings b
+            FROM {table} b
             JOIN content c ON c.id = CAST(b.target_ref AS INTEGER)
             WHERE b.scope = 'linkedtrust'
             AND b.name ILIKE %s
@@ -338,6 +628,9 @@ def cmd_read(args):
         rows = cur.fetchall()
     if not rows:
         print(f"No content found for '{target}'")
+        print_suggestions(suggestions)
+    elif args.match:
+        print_matching_chunks(cur, rows, args.match, args.context)
     else:
         for cid, src, date, content in rows:
             print(f"[{cid}] {src} ({date})")
@@ -348,6 +641,34 @@ def cmd_read(args):
     conn.close()
 
 
+def print_matching_chunks(cur, rows, term, context):
+    """Print only the chunks of the given blobs that match term."""
+    ids = [r[0] for r in rows]
+    cur.execute("""
+        SELECT ch.content_id, ch.chunk_index, c.source_file, c.note_date
+        FROM content_chunks ch
+        JOIN content c ON c.id = ch.content_id
+        WHERE ch.content_id = ANY(%s)
+        AND (ch.tsv @@ plainto_tsquery('english', %s) OR ch.body ILIKE %s)
+        ORDER BY c.note_date, ch.content_id, ch.chunk_index
+    """, (ids, term, f"%{term}%"))
+    hits = cur.fetchall()
+    if not hits:
+        print(f"No chunks matching '{term}'")
+    else:
+        print_chunk_hits(cur, hits, context)
+
+
+def cmd_tree(args):
+    """Browse the catcode tree from a code or label path."""
+    from catcode_tree import get_tree, print_tree
+    conn = get_conn()
+    tree = get_tree(conn, fresh=args.fresh)
+    conn.close()
+    if not print_tree(tree, args.prefix, args.depth):
+        sys.exit(1)
+
+
 HELP_TEXT = """
 abra — query your contacts, notes, and relationships
 
@@ -355,18 +676,30 @@ Commands:
   abra who "credentials"         Find people by topic keyword
   abra about bobbi-vernon        Everything known about a person
   abra about eric                Partial match works too
+  abra about "Ussher"            Real names, nicknames ("Bob"), no accents needed
+  abra about eric --crm          Also show company/title from the CRM (cached)
   abra when 2025-10              Who did I meet that month?
   abra when 2025-07 2025-09      Date range (July thru August)
-  abra search "cooperative"      Full-text search across all notes
+  abra when --since 2025-06      Everything from a date on
+  abra when --last 90d           The last 90 days (also 12w, 6m, 1y)
+  abra when --last 1y --histogram   Counts and top names per month (or day, week)
+  abra search "cooperative"      Full-text search, shows matching chunks
+  abra search "x" --context 1    Also show one chunk either side
   abra related linkedtrust       Who has a relationship to X?
   abra refs                      List all LinkedTrust reference docs
   abra names                     List all processed names (with context)
   abra names kevin               Filter names by prefix
   abra read bobbi-vernon         Read full note content for a name
   abra read 35                   Read content by ID number
+  abra read 35:4 --context 1     Read one chunk (as listed by search) and neighbours
+  abra read eric --match grant   Only the chunks of eric's notes matching "grant"
+  abra tree                      Catcode tree with binding/content counts
+  abra tree linkedtrust/2026     Subtree by label path or catcode
+  abra tree a00103 --depth 1     Only one level below
 
 Options:
   --scope SCOPE                  Query a different scope (default: golda)
+  --include-archived             Also search expired bindings (see abra expire)
 
 For complex queries, ask Claude in a session:
   "use the abra tool to find everyone in healthcare credentialing"
@@ -381,7 +714,7 @@ def main():
         sys.exit(0)
 
     # Check for unknown command before argparse to give a friendly message
-    valid_commands = {'who', 'about', 'when', 'search', 'related', 'refs', 'names', 'read'}
+    valid_commands = {'who', 'about', 'when', 'search', 'related', 'refs', 'names', 'read', 'tree'}
     first_arg = sys.argv[1]
     if first_arg not in valid_commands and not first_arg.startswith('-'):
         print(f"Unknown command: '{first_arg}'\n")
@@ -393,36 +726,65 @@ def main():
     parser.add_argument('--scope', default='golda', help='Scope to query (default: golda)')
     sub = parser.add_subparsers(dest='command')
 
+    parser.add_argument('--include-archived', action='store_true',
+                        help='Also search expired bindings moved to bindings_archive')
     scope_kw = dict(default=argparse.SUPPRESS, help='Scope to query')
+    archived_kw = dict(action='store_true', default=argparse.SUPPRESS,
+                       help='Also search expired bindings moved to bindings_archive')
 
     p_who = sub.add_parser('who', help='Find people by topic')
+    p_who.add_argument('--include-archived', **archived_kw)
     p_who.add_argument('--scope', **scope_kw)
     p_who.add_argument('term', help='Topic keyword to search')
 
     p_about = sub.add_parser('about', help='Show everything about a name')
+    p_about.add_argument('--include-archived', **archived_kw)
     p_about.add_argument('--scope', **scope_kw)
     p_about.add_argument('name', help='Name or prefix to look up')
+    p_about.add_argument('--crm', action='store_true',
+                         help='Resolve crm:odoo/contact refs to company and title (cached)')
 
     p_when = sub.add_parser('when', help='Find contacts by date')
+    p_when.add_argument('--include-archived', **archived_kw)
     p_when.add_argument('--scope', **scope_kw)
-    p_when.add_argument('start', help='Start date (YYYY-MM or YYYY-MM-DD)')
+    p_when.add_argument('start', nargs='?', help='Start date (YYYY-MM or YYYY-MM-DD)')
     p_when.add_argument('end', nargs='?', help='End date (optional)')
+    p_when.add_argument('--since', default=None, help='Open-ended: from this date on')
+    p_when.add_argument('--last', default=None, metavar='SPAN', help='Open-ended: the last 90d, 12w, 6m, 1y')
+    p_when.add_argument('--histogram', nargs='?', const='month', choices=('day', 'week', 'month'),
+                        help='Counts and top names per day, week or month (default month)')
+    p_when.add_argument('--top', type=int, default=3, help='Top names per bucket (default 3)')
 
     p_search = sub.add_parser('search', help='Search note content')
     p_search.add_argument('term', help='Text to search for')
+    p_search.add_argument('--context', type=int, default=0, metavar='N',
+                          help='Also show N chunks before and after each match')
 
     p_related = sub.add_parser('related', help='Find related contacts')
+    p_related.add_argument('--include-archived', **archived_kw)
     p_related.add_argument('--scope', **scope_kw)
     p_related.add_argument('target', help='Name or topic to find relations for')
 
     p_refs = sub.add_parser('refs', help='List LT reference docs')
+    p_refs.add_argument('--include-archived', **archived_kw)
 
     p_names = sub.add_parser('names', help='List known names')
+    p_names.add_argument('--include-archived', **archived_kw)
     p_names.add_argument('--scope', **scope_kw)
     p_names.add_argument('prefix', nargs='?', help='Filter by prefix')
 
     p_read = sub.add_parser('read', help='Read full note content')
-    p_read.add_argument('target', help='Name or content ID')
+    p_read.add_argument('--include-archived', **archived_kw)
+    p_read.add_argument('--scope', **scope_kw)
+    p_read.add_argument('target', help='Name, content ID, or CONTENT_ID:CHUNK')
+    p_read.add_argument('--match', default=None, help='Only show chunks matching this text')
+    p_read.add_argument('--context', type=int, default=0, metavar='N',
+                        help='Also show N chunks around each chunk shown')
+
+    p_tree = sub.add_parser('tree', help='Browse the catcode tree')
+    p_tree.add_argument('prefix', nargs='?', help='Catcode or label path to start from')
+    p_tree.add_argument('--depth', type=int, default=None, help='Levels to show below the start')
+    p_tree.add_argument('--fresh', action='store_true', help='Ignore the cache and recount')
 
     args = parser.parse_args()
     if not args.command:
@@ -432,7 +794,7 @@ def main():
     cmds = {
         'who': cmd_who, 'about': cmd_about, 'when': cmd_when,
         'search': cmd_search, 'related': cmd_related, 'refs': cmd_refs,
-        'names': cmd_names, 'read': cmd_read,
+        'names': cmd_names, 'read': cmd_read, 'tree': cmd_tree,
     }
     cmds[args.command](args)
 
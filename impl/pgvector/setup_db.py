@@ -2,9 +2,19 @@
 """
 Initialize abra database with bindings + content tables.
 Schema matches binding-format-v0.1.md spec.
+
+bindings is partitioned by scope, so a query for one scope only reads that
+scope's partition, and a scope can be archived by detaching it:
+
+    python setup_db.py                       # list partitions (default)
+    python setup_db.py --partition hash      # 8 hash partitions
+    python setup_db.py --migrate             # convert an existing table
 """
 import os
+import re
 import sys
+import hashlib
+import argparse
 import psycopg2
 from dotenv import load_dotenv
 
@@ -17,8 +27,247 @@ PG_PASSWORD = os.getenv("PG_PASSWORD", "")
 PG_DATABASE = os.getenv("PG_DATABASE", "abra")
 EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
 
+# name and relationship are interned: name_id points into names (scope,
+# name) and relationship_id into relationship_types. scope stays on the row
+# as the partition key. Read through the bindings_named view for strings.
+BINDINGS_COLUMNS = """
+    scope VARCHAR(255) NOT NULL,
+    name_id INTEGER NOT NULL,
+    relationship_id SMALLINT NOT NULL,
+    target_type VARCHAR(50) NOT NULL,
+    target_ref TEXT NOT NULL,
+    qualifier VARCHAR(255),
+    permanence VARCHAR(20) DEFAULT 'CURRENT',
+    source_date DATE,
+    catcode VARCHAR(64),
+    created_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP
+"""
+
+# How bindings is split by scope: list (one partition per scope, plus a
+# default for scopes not given one yet), hash (a fixed number of partitions)
+# or none (one plain table, as before partitioning)
+PARTITION = os.getenv("ABRA_BINDINGS_PARTITION", "list")
+HASH_PARTITIONS = int(os.getenv("ABRA_BINDINGS_HASH_PARTITIONS", "8"))
+
+
+def dedup_content(cur):
+    """Backfill content_hash and fold duplicate blobs into their oldest row.
+
+    Bindings pointing at a duplicate are repointed to the kept row before the
+    duplicate is deleted, so no ABOUT/RELATED link is lost.
+    """
+    cur.execute("BEGIN")
+    cur.execute("""
+        UPDATE content SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')
+        WHERE content_hash IS NULL
+    """)
+    if cur.rowcount:
+        print(f"Backfilled content_hash on {cur.rowcount} rows")
+    cur.execute("""
+        CREATE TEMP TABLE content_dups AS
+        SELECT id, MIN(id) OVER (PARTITION BY content_hash) AS keep_id
+        FROM content
+    """)
+    cur.execute("DELETE FROM content_dups WHERE id = keep_id")
+    cur.execute("""
+        UPDATE bindings b SET target_ref = d.keep_id::text
+        FROM content_dups d
+        WHERE b.target_type = 'content' AND b.target_ref = d.id::text
+    """)
+    repointed = cur.rowcount
+    cur.execute("DELETE FROM content c USING content_dups d WHERE c.id = d.id")
+    if cur.rowcount:
+        print(f"Merged {cur.rowcount} duplicate content rows ({repointed} bindings repointed)")
+    cur.execute("DROP TABLE content_dups")
+    cur.execute("COMMIT")
+
+
+def bindings_layout(cur):
+    """'list', 'hash', 'none' for the existing bindings table, or None if there is none."""
+    cur.execute("""
+        SELECT c.relkind, p.partstrat FROM pg_class c
+        LEFT JOIN pg_partitioned_table p ON p.partrelid = c.oid
+        WHERE c.oid = to_regclass('bindings')
+    """)
+    row = cur.fetchone()
+    if row is None:
+        return None
+    relkind, strategy = row
+    return {"l": "list", "h": "hash"}.get(strategy, "none") if relkind == "p" else "none"
+
+
+def scope_partition_name(scope):
+    """Table name of a scope's list partition: bindings_s_<scope>."""
+    base = re.sub(r"[^a-z0-9_]+", "_", scope.lower()).strip("_")
+    if base != scope or len(base) > 40:
+        # Keep names unique when the scope had to be mangled
+        base = f"{base[:40]}_{hashlib.md5(scope.encode()).hexdigest()[:6]}"
+    return f"bindings_s_{base}"
+
+
+def create_scope_partition(cur, scope):
+    """Give a scope its own list partition, moving its rows out of the default one.
+
+    Runs in the caller's transaction. Returns the number of rows moved, or
+    None if the scope already had a partition.
+    """
+    table = scope_partition_name(scope)
+    cur.execute("SELECT to_regclass(%s)", (table,))
+    if cur.fetchone()[0]:
+        return None
+    # Built standalone and attached, so the default partition is only
+    # scanned once (by ATTACH) instead of for every moved row
+    cur.execute(f"CREATE TABLE {table} (LIKE bindings INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    # Moving rows between partitions is not a change to replicate: the
+    # default partition's change_log trigger would log every row as deleted,
+    # and the standalone table has none to log the insert
+    cur.execute("SELECT tgname FROM pg_trigger WHERE tgrelid = 'bindings_default'::regclass AND tgname = %s",
+                ("bindings_change_log",))
+    logged = cur.fetchone()
+    if logged:
+        cur.execute("ALTER TABLE bindings_default DISABLE TRIGGER bindings_change_log")
+    cur.execute(f"""
+        WITH moved AS (DELETE FROM bindings_default WHERE scope = %s RETURNING *)
+        INSERT INTO {table} SELECT * FROM moved
+    """, (scope,))
+    moved = cur.rowcount
+    if logged:
+        cur.execute("ALTER TABLE bindings_default ENABLE TRIGGER bindings_change_log")
+    cur.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_scope CHECK (scope = %s)", (scope,))
+    cur.execute(f"ALTER TABLE bindings ATTACH PARTITION {table} FOR VALUES IN (%s)", (scope,))
+    cur.execute(f"ALTER TABLE {table} DROP CONSTRAINT {table}_scope")
+    return moved
+
+
+def create_bindings(cur, partition=PARTITION, hash_partitions=HASH_PARTITIONS):
+    """Create bindings if missing, partitioned by scope unless partition is 'none'.
 
-def setup():
+    The primary key of a partitioned table has to include the partition
+    key, hence (id, scope); ids still come from one sequence.
+    """
+    layout = bindings_layout(cur)
+    if layout is not None:
+        if layout != partition:
+            print(f"Note: bindings is {layout}-partitioned, not {partition}; "
+                  f"run setup_db.py --migrate to convert it")
+        print(f"Table: bindings ({layout})")
+        return
+    if partition == "none":
+        cur.execute(f"CREATE TABLE bindings (id SERIAL PRIMARY KEY, {BINDINGS_COLUMNS})")
+    else:
+        cur.execute(f"""
+            CREATE TABLE bindings (id SERIAL, {BINDINGS_COLUMNS}, PRIMARY KEY (id, scope))
+            PARTITION BY {partition.upper()} (scope)
+        """)
+        if partition == "list":
+            cur.execute("CREATE TABLE bindings_default PARTITION OF bindings DEFAULT")
+        else:
+            for i in range(hash_partitions):
+                cur.execute(f"""
+                    CREATE TABLE bindings_h{i} PARTITION OF bindings
+                    FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {i})
+                """)
+    print(f"Table: bindings ({partition})")
+
+
+def migrate_bindings(cur, partition=PARTITION, hash_partitions=HASH_PARTITIONS):
+    """Rebuild bindings with the given layout and copy every row across.
+
+    One transaction: the old table is renamed, the new one created, rows
+    copied, and the old one dropped. With list partitioning each existing
+    scope gets its own partition. Readers and writers block until it commits.
+    """
+    layout = bindings_layout(cur)
+    if layout is None or layout == partition:
+        print(f"bindings is already {layout or 'missing'}; nothing to migrate")
+        return
+    cur.execute("BEGIN")
+    cur.execute("LOCK TABLE bindings IN ACCESS EXCLUSIVE MODE")
+    # The view would follow the rename and keep bindings_old alive;
+    # setup() recreates it on the new table
+    cur.execute("DROP VIEW IF EXISTS bindings_named")
+    cur.execute("ALTER TABLE bindings RENAME TO bindings_old")
+    # Index names must be free for the new table, which gets its indexes
+    # from the CREATE INDEX statements in setup() once this commits
+    cur.execute("SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = 'bindings_old'::regclass")
+    for (index,) in cur.fetchall():
+        cur.execute(f"ALTER INDEX {index} RENAME TO {index}_old")
+    cur.execute("SELECT pg_get_serial_sequence('bindings_old', 'id')")
+    seq = cur.fetchone()[0]
+    cur.execute(f"ALTER SEQUENCE {seq} OWNED BY NONE")
+    create_bindings(cur, partition, hash_partitions)
+    cur.execute(f"ALTER TABLE bindings ALTER COLUMN id SET DEFAULT nextval('{seq}')")
+    cur.execute("SELECT pg_get_serial_sequence('bindings', 'id')")
+    new_seq = cur.fetchone()[0]
+    cur.execute(f"ALTER SEQUENCE {seq} OWNED BY bindings.id")
+    if new_seq and new_seq != seq:
+        cur.execute(f"DROP SEQUENCE {new_seq}")
+    if partition == "list":
+        cur.execute("SELECT DISTINCT scope FROM bindings_old")
+        for (scope,) in cur.fetchall():
+            create_scope_partition(cur, scope)
+    # Columns added since the old table was created start out NULL/default
+    cur.execute("""
+        SELECT string_agg(quote_ident(a.attname), ', ' ORDER BY a.attnum) FROM pg_attribute a
+        WHERE a.attrelid = 'bindings'::regclass AND a.attnum > 0 AND NOT a.attisdropped
+        AND EXISTS (SELECT 1 FROM pg_attribute o WHERE o.attrelid = 'bindings_old'::regclass
+                    AND o.attname = a.attname AND NOT o.attisdropped)
+    """)
+    columns = cur.fetchone()[0]
+    cur.execute(f"INSERT INTO bindings ({columns}) SELECT {columns} FROM bindings_old")
+    print(f"Copied {cur.rowcount} bindings into the {partition} layout")
+    cur.execute("DROP TABLE bindings_old")
+    cur.execute("COMMIT")
+
+
+def intern_bindings(cur, table):
+    """Replace a table's name/relationship strings with names/relationship_types ids.
+
+    For tables created before interning. One transaction per table; the
+    string columns and their indexes are dropped at the end. Does nothing
+    if the table has no name column.
+    """
+    cur.execute("""
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = to_regclass(%s) AND attname = 'name' AND NOT attisdropped
+    """, (table,))
+    if not cur.fetchone():
+        return
+    cur.execute("BEGIN")
+    cur.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+    # Rewriting every row is not a change to replicate
+    cur.execute("SELECT tgname FROM pg_trigger WHERE tgrelid = %s::regclass AND tgname = %s",
+                (table, f"{table}_change_log"))
+    logged = cur.fetchone()
+    if logged:
+        cur.execute(f"ALTER TABLE {table} DISABLE TRIGGER {table}_change_log")
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS name_id INTEGER")
+    cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS relationship_id SMALLINT")
+    cur.execute(f"""
+        INSERT INTO names (scope, name) SELECT DISTINCT scope, name FROM {table}
+        ON CONFLICT (scope, name) DO NOTHING
+    """)
+    cur.execute(f"""
+        INSERT INTO relationship_types (relationship) SELECT DISTINCT relationship FROM {table}
+        ON CONFLICT (relationship) DO NOTHING
+    """)
+    cur.execute(f"""
+        UPDATE {table} b SET name_id = n.id, relationship_id = r.id
+        FROM names n, relationship_types r
+        WHERE n.scope = b.scope AND n.name = b.name AND r.relationship = b.relationship
+    """)
+    interned = cur.rowcount
+    cur.execute(f"ALTER TABLE {table} ALTER COLUMN name_id SET NOT NULL")
+    cur.execute(f"ALTER TABLE {table} ALTER COLUMN relationship_id SET NOT NULL")
+    cur.execute(f"ALTER TABLE {table} DROP COLUMN name, DROP COLUMN relationship")
+    if logged:
+        cur.execute(f"ALTER TABLE {table} ENABLE TRIGGER {table}_change_log")
+    cur.execute("COMMIT")
+    print(f"Interned names and relationships on {interned} {table} rows")
+
+
+def setup(partition=PARTITION, hash_partitions=HASH_PARTITIONS, migrate=False):
     # Connect to postgres to create database if needed
     print(f"Connecting to PostgreSQL at {PG_HOST}...")
     conn = psycopg2.connect(
@@ -80,37 +329,293 @@ def setup():
             embedding vector({EMBEDDING_DIM}),
             note_date DATE,
             catcode VARCHAR(64),
+            content_hash CHAR(64),
             created_at TIMESTAMP DEFAULT NOW()
         )
     """)
+    # Content is addressed by the sha256 of its bytes — storing the same
+    # blob twice returns the existing row (see AbraWriter.store_content).
+    cur.execute("ALTER TABLE content ADD COLUMN IF NOT EXISTS content_hash CHAR(64)")
     print("Table: content")
 
-    # Bindings table — the core of abra
+    # Interned names: each (scope, name) is stored once and bindings carry
+    # its id, so a rename is a one-row update. Writers get ids through
+    # intern_name()/intern_relationship(), which add missing rows.
     cur.execute("""
-        CREATE TABLE IF NOT EXISTS bindings (
+        CREATE TABLE IF NOT EXISTS names (
             id SERIAL PRIMARY KEY,
             scope VARCHAR(255) NOT NULL,
             name VARCHAR(255) NOT NULL,
-            relationship VARCHAR(100) NOT NULL,
-            target_type VARCHAR(50) NOT NULL,
-            target_ref TEXT NOT NULL,
-            qualifier VARCHAR(255),
-            permanence VARCHAR(20) DEFAULT 'CURRENT',
-            source_date DATE,
-            catcode VARCHAR(64),
-            created_at TIMESTAMP DEFAULT NOW()
+            created_at TIMESTAMP DEFAULT NOW(),
+            UNIQUE (scope, name)
         )
     """)
-    print("Table: bindings")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_names_prefix ON names (scope, name varchar_pattern_ops)")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS relationship_types (
+            id SMALLSERIAL PRIMARY KEY,
+            relationship VARCHAR(100) NOT NULL UNIQUE
+        )
+    """)
+    # Look before inserting: INSERT .. ON CONFLICT takes a sequence value
+    # even when the row exists
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION intern_name(p_scope TEXT, p_name TEXT) RETURNS INTEGER AS $$
+        DECLARE
+            found INTEGER;
+        BEGIN
+            SELECT id INTO found FROM names WHERE scope = p_scope AND name = p_name;
+            IF found IS NULL THEN
+                INSERT INTO names (scope, name) VALUES (p_scope, p_name)
+                ON CONFLICT (scope, name) DO NOTHING RETURNING id INTO found;
+            END IF;
+            IF found IS NULL THEN
+                SELECT id INTO found FROM names WHERE scope = p_scope AND name = p_name;
+            END IF;
+            RETURN found;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION intern_relationship(p_relationship TEXT) RETURNS SMALLINT AS $$
+        DECLARE
+            found SMALLINT;
+        BEGIN
+            SELECT id INTO found FROM relationship_types WHERE relationship = p_relationship;
+            IF found IS NULL THEN
+                INSERT INTO relationship_types (relationship) VALUES (p_relationship)
+                ON CONFLICT (relationship) DO NOTHING RETURNING id INTO found;
+            END IF;
+            IF found IS NULL THEN
+                SELECT id INTO found FROM relationship_types WHERE relationship = p_relationship;
+            END IF;
+            RETURN found;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    print("Table: names, relationship_types")
+
+    # Keys a name can be looked up by besides its slug: IS text targets,
+    # their words and nicknames, LinkedIn slugs, all also ASCII-folded (see
+    # aliases.py). Trigram GIN for misspellings, btree for exact hits.
+    cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS name_aliases (
+            name_id INTEGER NOT NULL,
+            alias VARCHAR(255) NOT NULL,
+            kind VARCHAR(10) NOT NULL,
+            PRIMARY KEY (name_id, alias)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_aliases_alias ON name_aliases (alias)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_aliases_trgm ON name_aliases USING GIN (alias gin_trgm_ops)")
+    print("Table: name_aliases (run aliases.py --rebuild to index existing names)")
+
+    # Bindings table — the core of abra
+    create_bindings(cur, partition, hash_partitions)
+    intern_bindings(cur, "bindings")
+    if migrate:
+        migrate_bindings(cur, partition, hash_partitions)
+
+    # Optional expiry (EPHEMERAL bindings get one by default, see
+    # AbraWriter.write_binding). `abra expire` moves expired rows to
+    # bindings_archive, so the hot table only holds live bindings.
+    cur.execute("ALTER TABLE bindings ADD COLUMN IF NOT EXISTS expires_at TIMESTAMP")
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS bindings_archive (
+            id INTEGER PRIMARY KEY,
+            {BINDINGS_COLUMNS},
+            archived_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    intern_bindings(cur, "bindings_archive")
+    print("Table: bindings_archive")
+
+    # Bindings with their name and relationship strings, as before interning
+    for view, table in (("bindings_named", "bindings"), ("bindings_archive_named", "bindings_archive")):
+        cur.execute(f"""
+            CREATE OR REPLACE VIEW {view} AS
+            SELECT b.id, b.scope, n.name, r.relationship, b.target_type, b.target_ref,
+                   b.qualifier, b.permanence, b.source_date, b.catcode, b.created_at,
+                   b.expires_at, b.name_id, b.relationship_id
+            FROM {table} b
+            JOIN names n ON n.id = b.name_id
+            JOIN relationship_types r ON r.id = b.relationship_id
+        """)
+    print("Views: bindings_named, bindings_archive_named")
+
+    # Needs both tables: duplicates are folded before the unique index exists
+    dedup_content(cur)
+    cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_content_hash ON content(content_hash)")
+
+    # Content chunks — retrieval-sized pieces of each blob. Offsets are UTF-8
+    # byte positions into content.content; search/read return chunks, not
+    # whole blobs. Chunks go with their blob when it is garbage collected.
+    cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS content_chunks (
+            id SERIAL PRIMARY KEY,
+            content_id INTEGER NOT NULL REFERENCES content(id) ON DELETE CASCADE,
+            chunk_index INTEGER NOT NULL,
+            start_byte INTEGER NOT NULL,
+            end_byte INTEGER NOT NULL,
+            heading TEXT,
+            body TEXT NOT NULL,
+            tsv tsvector GENERATED ALWAYS AS
+                (to_tsvector('english', COALESCE(heading, '') || ' ' || body)) STORED,
+            embedding vector({EMBEDDING_DIM}),
+            UNIQUE (content_id, chunk_index)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_chunks_tsv ON content_chunks USING GIN (tsv)")
+    print("Table: content_chunks")
+
+    # Source manifest — what each incremental importer last saw on disk.
+    # One row per source file; binding_ids are the rows written for it, so a
+    # changed or removed file touches only its own bindings.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS source_manifest (
+            source VARCHAR(255) NOT NULL,
+            path TEXT NOT NULL,
+            mtime DOUBLE PRECISION NOT NULL,
+            size BIGINT NOT NULL,
+            content_hash CHAR(64) NOT NULL,
+            content_id INTEGER,
+            binding_ids INTEGER[] NOT NULL DEFAULT '{}',
+            updated_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (source, path)
+        )
+    """)
+    print("Table: source_manifest")
+
+    # Next free child slot per parent catcode. AbraWriter.allocate_catcodes
+    # reserves ranges from here under an advisory lock, so concurrent
+    # writers never hand out the same code.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS catcode_counters (
+            parent_catcode VARCHAR(64) PRIMARY KEY,
+            next_index INTEGER NOT NULL
+        )
+    """)
+    print("Table: catcode_counters")
+
+    # catcode_tree.get_tree fingerprints the registry itself (count and
+    # xmin sum), so writers share no version row. Drop the old counter.
+    cur.execute("DROP TRIGGER IF EXISTS catcode_registry_version ON catcode_registry")
+    cur.execute("DROP FUNCTION IF EXISTS bump_catcode_version()")
+    cur.execute("DROP TABLE IF EXISTS catcode_version")
+
+    # Change log for replicating between instances (see sync.py). Row
+    # triggers append one entry per insert/update/delete on the synced
+    # tables. xid is the writing transaction, so `abra export` can hand out
+    # exactly the entries of transactions that have finished; origin is set
+    # by `abra apply` so replicated changes are not sent back.
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq BIGSERIAL PRIMARY KEY,
+            table_name VARCHAR(64) NOT NULL,
+            op CHAR(1) NOT NULL,
+            row_data JSONB,
+            old_data JSONB,
+            xid BIGINT NOT NULL DEFAULT txid_current(),
+            origin VARCHAR(255),
+            changed_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_change_log_xid ON change_log(xid)")
+    cur.execute("""
+        CREATE OR REPLACE FUNCTION log_change() RETURNS trigger AS $$
+        DECLARE
+            new_row JSONB;
+            old_row JSONB;
+        BEGIN
+            IF TG_OP <> 'DELETE' THEN
+                new_row := to_jsonb(NEW) - 'embedding';
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                old_row := to_jsonb(OLD) - 'embedding';
+            END IF;
+            -- Embedding backfills are local work, not changes to replicate
+            IF TG_OP = 'UPDATE' AND new_row = old_row THEN
+                RETURN NULL;
+            END IF;
+            -- Content ids differ between instances; carry the hash instead.
+            -- Nested so NEW.target_type is only looked at on bindings.
+            IF TG_ARGV[0] = 'bindings' AND TG_OP <> 'DELETE' THEN
+                IF NEW.target_type = 'content' THEN
+                    new_row := new_row || jsonb_build_object('target_hash',
+                        (SELECT content_hash FROM content WHERE id = NEW.target_ref::int));
+                END IF;
+            END IF;
+            -- Name ids differ between instances too
+            IF TG_ARGV[0] = 'bindings' AND TG_OP <> 'DELETE' THEN
+                new_row := new_row || jsonb_build_object(
+                    'name', (SELECT name FROM names WHERE id = NEW.name_id),
+                    'relationship', (SELECT relationship FROM relationship_types
+                                     WHERE id = NEW.relationship_id));
+            END IF;
+            INSERT INTO change_log (table_name, op, row_data, old_data, origin)
+            VALUES (TG_ARGV[0], left(TG_OP, 1), new_row, old_row - 'content',
+                    NULLIF(current_setting('abra.origin', true), ''));
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for table in ("bindings", "content", "catcode_registry"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {table}_change_log ON {table}")
+        cur.execute(f"""
+            CREATE TRIGGER {table}_change_log
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION log_change('{table}')
+        """)
+    # Renames; names rows are added by intern_name() as bindings need them
+    cur.execute("DROP TRIGGER IF EXISTS names_change_log ON names")
+    cur.execute("""
+        CREATE TRIGGER names_change_log
+        AFTER UPDATE ON names
+        FOR EACH ROW EXECUTE FUNCTION log_change('names')
+    """)
+    # What `abra apply` has taken from each other instance, and which local
+    # binding each replicated one became
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            source VARCHAR(255) PRIMARY KEY,
+            position BIGINT NOT NULL,
+            applied_at TIMESTAMP DEFAULT NOW()
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS sync_binding_map (
+            source VARCHAR(255) NOT NULL,
+            source_id INTEGER NOT NULL,
+            local_id INTEGER NOT NULL,
+            PRIMARY KEY (source, source_id)
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_sync_binding_local ON sync_binding_map(local_id)")
+    print("Table: change_log")
 
     # Indexes
     cur.execute("CREATE INDEX IF NOT EXISTS idx_content_note_date ON content(note_date)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_content_catcode ON content(catcode)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_scope_name ON bindings(scope, name)")
-    cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_relationship ON bindings(relationship)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_name ON bindings(name_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_relationship ON bindings(relationship_id)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_target ON bindings(target_type, target_ref)")
     cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_source_date ON bindings(source_date)")
+    # when: one scope, ABOUT bindings, a source_date range
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_bindings_scope_rel_date
+        ON bindings(scope, relationship_id, source_date)
+    """)
     cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_catcode ON bindings(catcode)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_expires ON bindings(expires_at) WHERE expires_at IS NOT NULL")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_archive_name ON bindings_archive(name_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_archive_catcode ON bindings_archive(catcode varchar_pattern_ops)")
+    # UNREFERENCED (content gc) probes the archive per blob, as it does bindings
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_archive_target ON bindings_archive(target_type, target_ref)")
+    # Prefix (subtree) scans: WHERE catcode LIKE 'a00103%'. The plain indexes
+    # above only serve LIKE under the C collation.
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bindings_catcode_prefix ON bindings (catcode varchar_pattern_ops)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_content_catcode_prefix ON content (catcode varchar_pattern_ops)")
     print("Indexes created")
 
     cur.close()
@@ -119,8 +624,16 @@ def setup():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or upgrade the abra schema")
+    parser.add_argument("--partition", choices=("list", "hash", "none"), default=PARTITION,
+                        help=f"How to partition bindings by scope (default {PARTITION})")
+    parser.add_argument("--hash-partitions", type=int, default=HASH_PARTITIONS,
+                        help=f"Partitions for --partition hash (default {HASH_PARTITIONS})")
+    parser.add_argument("--migrate", action="store_true",
+                        help="Convert an existing bindings table to --partition")
+    args = parser.parse_args()
     try:
-        setup()
+        setup(args.partition, args.hash_partitions, args.migrate)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Binary snapshots of an abra store: `abra dump` / `abra restore`.
+
+A snapshot is one gzip'd tar holding manifest.json followed by one
+`COPY ... (FORMAT binary)` stream per table (catcode_registry, content,
+content_chunks, names, name_aliases, relationship_types, bindings,
+bindings_archive). The manifest records each table's columns and types
+and the sha256 of its stream; restore checks both before it commits.
+
+    abra dump all.abra                                  # whole store
+    abra dump subtree.abra --prefix a001030201          # one subtree
+    abra dump alice.abra --scope alice --no-embeddings  # smaller, re-embed later
+    abra restore subtree.abra --replace                 # seed a dev database
+
+Filters select bindings, live and archived alike; a filtered dump carries
+the content those bindings point to (plus, with --prefix, content filed
+under the subtree), the chunks of that content, the names they use, and the
+registry rows of the subtree and its ancestors. Ids are kept as they are, so binding refs to content and
+names stay valid.
+
+restore loads into empty tables (or empties them first with --replace) in
+one transaction: secondary indexes are dropped, every table is loaded with
+COPY, the checksums are compared, and only then are the indexes rebuilt and
+the id sequences moved past the loaded rows. The change_log triggers are
+off during the load, so a restore is not replicated by `abra export`.
+"""
+import json
+import time
+import hashlib
+import tarfile
+import tempfile
+
+FORMAT = "abra-snapshot/1"
+MANIFEST = "manifest.json"
+COMPRESS_LEVEL = 3     # binary COPY of vectors barely compresses; favour speed
+READ_SIZE = 1 << 20
+
+# Load order: content_chunks references content
+TABLES = ("catcode_registry", "content", "content_chunks", "names", "name_aliases",
+          "relationship_types", "bindings", "bindings_archive")
+# Emptied with --replace too: state that describes the old store. The
+# allocator reseeds catcode_counters from the restored registry.
+REPLACE_ALSO = ("sync_binding_map", "sync_state", "catcode_counters")
+LOGGED = ("catcode_registry", "content", "names", "bindings")
+SERIAL = ("content", "content_chunks", "names", "relationship_types", "bindings")
+
+
+class HashingFile:
+    """File wrapper that hashes (and counts) every byte passing through."""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.sha.update(data)
+        self.size += len(data)
+        return data
+
+
+def table_columns(cur, table, embeddings=True):
+    """[(name, type)] in column order, leaving out generated columns."""
+    cur.execute("""
+        SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = ''
+        ORDER BY attnum
+    """, (table,))
+    return [(name, typ) for name, typ in cur.fetchall() if embeddings or name != "embedding"]
+
+
+def snapshot_filters(cur, scopes=None, prefix=None):
+    """WHERE clause per table for the given scopes / catcode prefix."""
+    if not scopes and not prefix:
+        return {t: "TRUE" for t in TABLES}
+    conds = []
+    if scopes:
+        conds.append(cur.mogrify("b.scope = ANY(%s)", (list(scopes),)).decode())
+    if prefix:
+        conds.append(cur.mogrify("b.catcode LIKE %s", (prefix + "%",)).decode())
+    bindings = " AND ".join(conds)
+
+    def used(test):
+        # A live or archived binding passing the filters satisfies test
+        return " OR ".join(f"EXISTS (SELECT 1 FROM {table} b WHERE {test} AND {bindings})"
+                           for table in ("bindings", "bindings_archive"))
+    content = used("b.target_type = 'content' AND b.target_ref = c.id::text")
+    registry = "TRUE"
+    if prefix:
+        if not scopes:
+            content += cur.mogrify(" OR c.catcode LIKE %s", (prefix + "%",)).decode()
+        registry = cur.mogrify("r.catcode LIKE %s OR %s LIKE r.catcode || '%%'",
+                               (prefix + "%", prefix)).decode()
+    return {
+        "catcode_registry": registry,
+        "content": content,
+        "content_chunks": f"EXISTS (SELECT 1 FROM content c WHERE c.id = k.content_id AND ({content}))",
+        "names": used("b.name_id = n.id"),
+        "name_aliases": used("b.name_id = a.name_id"),
+        "relationship_types": "TRUE",
+        "bindings": bindings,
+        "bindings_archive": bindings,
+    }
+
+
+# The archive shares the bindings alias, so one filter serves both
+ALIASES = {"catcode_registry": "r", "content": "c", "content_chunks": "k", "names": "n",
+           "name_aliases": "a", "relationship_types": "t", "bindings": "b", "bindings_archive": "b"}
+
+
+def dump(conn, path, scopes=None, prefix=None, embeddings=True, progress=None):
+    """Write a snapshot to path. Returns the manifest.
+
+    Every table is read in one REPEATABLE READ snapshot, so the archive is
+    consistent even while writers are busy.
+    """
+    start = time.time()
+    conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+    cur = conn.cursor()
+    where = snapshot_filters(cur, scopes, prefix)
+    manifest = {"format": FORMAT, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "filters": {"scopes": scopes or None, "prefix": prefix, "embeddings": embeddings},
+                "tables": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for table in TABLES:
+            columns = table_columns(cur, table, embeddings)
+            names = ", ".join(f"{ALIASES[table]}.{name}" for name, _ in columns)
+            with open(f"{tmp}/{table}.bin", "wb") as f:
+                out = HashingFile(f)
+                cur.copy_expert(f"""COPY (SELECT {names} FROM {table} {ALIASES[table]}
+                                          WHERE {where[table]}) TO STDOUT (FORMAT binary)""", out)
+            manifest["tables"][table] = {"columns": columns, "rows": cur.rowcount,
+                                         "bytes": out.size, "sha256": out.sha.hexdigest()}
+            if progress:
+                progress(table, cur.rowcount, out.size)
+        cur.close()
+        conn.commit()
+
+        with tarfile.open(path, "w:gz", compresslevel=COMPRESS_LEVEL) as tar:
+            with open(f"{tmp}/{MANIFEST}", "w") as f:
+                json.dump(manifest, f, indent=1)
+            tar.add(f"{tmp}/{MANIFEST}", arcname=MANIFEST)
+            for table in TABLES:
+                tar.add(f"{tmp}/{table}.bin", arcname=f"{table}.bin")
+    manifest["seconds"] = time.time() - start
+    return manifest
+
+
+def secondary_indexes(cur, table):
+    """(name, definition) of indexes on table not backing a constraint."""
+    cur.execute("""
+        SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = i.oid)
+    """, (table,))
+    # Indexes on a partitioned bindings table read back as ON ONLY, which
+    # would not build the partitions' indexes
+    return [(name, sql.replace(" ON ONLY ", " ON ")) for name, sql in cur.fetchall()]
+
+
+def check_columns(cur, manifest):
+    """Every dumped column must exist here with the same type (binary COPY is typed)."""
+    for table, info in manifest["tables"].items():
+        here = dict(table_columns(cur, table))
+        for name, typ in info["columns"]:
+            if name not in here:
+                raise ValueError(f"{table}.{name} is in the snapshot but not in this database "
+                                 f"(run setup_db.py first)")
+            if here[name] != typ:
+                raise ValueError(f"{table}.{name} is {here[name]} here but {typ} in the snapshot")
+
+
+def restore(conn, path, replace=False, progress=None):
+    """Load a snapshot into this database. Returns the manifest.
+
+    Everything happens in one transaction; a checksum or column mismatch
+    leaves the database as it was.
+    """
+    start = time.time()
+    with tarfile.open(path, "r|gz") as tar:
+        members = iter(tar)
+        first = next(members, None)
+        if first is None or first.name != MANIFEST:
+            raise ValueError(f"{path} is not an abra snapshot")
+        manifest = json.load(tar.extractfile(first))
+        if manifest.get("format") != FORMAT:
+            raise ValueError(f"Unsupported snapshot format {manifest.get('format')!r}")
+
+        cur = conn.cursor()
+        check_columns(cur, manifest)
+        # Snapshots taken before the archive was dumped leave it as it is
+        tables = [t for t in TABLES if t in manifest["tables"]]
+        if replace:
+            cur.execute(f"TRUNCATE {', '.join(tables + list(REPLACE_ALSO))}")
+        else:
+            for table in tables:
+                cur.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+                if cur.fetchone()[0]:
+                    raise ValueError(f"{table} is not empty; use --replace to overwrite it")
+
+        cur.execute("SET LOCAL maintenance_work_mem = '512MB'")
+        indexes = []
+        for table in tables:
+            for name, sql in secondary_indexes(cur, table):
+                cur.execute(f"DROP INDEX {name}")
+                indexes.append((name, sql))
+        for table in LOGGED:
+            cur.execute(f"ALTER TABLE {table} DISABLE TRIGGER {table}_change_log")
+
+        for member in members:
+            table = member.name[:-len(".bin")]
+            info = manifest["tables"].get(table)
+            if info is None:
+                raise ValueError(f"Unexpected member {member.name} in {path}")
+            names = ", ".join(name for name, _ in info["columns"])
+            src = HashingFile(tar.extractfile(member))
+            cur.copy_expert(f"COPY {table} ({names}) FROM STDIN (FORMAT binary)", src, size=READ_SIZE)
+            if src.sha.hexdigest() != info["sha256"]:
+                raise ValueError(f"Checksum mismatch for {table}; snapshot is damaged")
+            info["loaded"] = True
+            if progress:
+                progress(table, info["rows"], src.size)
+        missing = [t for t, info in manifest["tables"].items() if not info.pop("loaded", False)]
+        if missing:
+            raise ValueError(f"Snapshot is truncated: no data for {', '.join(missing)}")
+
+        for name, sql in indexes:
+            if progress:
+                progress(f"index {name}", None, None)
+            cur.execute(sql)
+        for table in LOGGED:
+            cur.execute(f"ALTER TABLE {table} ENABLE TRIGGER {table}_change_log")
+        for table in SERIAL:
+            cur.execute(f"""SELECT setval(pg_get_serial_sequence('{table}', 'id'),
+                                          COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table}""")
+        cur.close()
+        conn.commit()
+    manifest["seconds"] = time.time() - start
+    return manifest
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Replicate abra changes between instances (laptop <-> shared server).
+
+Triggers on bindings, content and catcode_registry append every insert,
+update and delete to change_log, as do renames in names (see setup_db.py).
+`abra export` writes the entries since a position as JSON lines; `abra
+apply` replays such a file on another instance:
+
+    abra export --since 0 -o laptop.jsonl        # first sync: everything
+    abra apply laptop.jsonl                      # on the server
+    abra export --since 48213 -o laptop.jsonl    # next time: only the delta
+
+Positions are transaction-id watermarks rather than raw sequence numbers:
+an export only hands out entries of transactions that had finished, and its
+header says where the next export should start ("next_since"), so a
+transaction that commits late is never skipped. apply remembers the
+position per source instance in sync_state and refuses files that would
+leave a gap.
+
+Rows are matched by natural keys, since ids differ between instances:
+catcodes by code, content by content_hash, names by scope and name, and
+bindings by the instance and id they were first written with
+(sync_binding_map holds the local id). Binding refs to content travel as
+content hashes, and names and relationships as strings. Replaying a file twice
+leaves the store as it was after the first time. Changes made by apply are
+tagged with their origin and left out of exports, so two instances syncing
+both ways do not echo each other's changes.
+"""
+import os
+import json
+import socket
+
+from write_binding import delete_unreferenced, BINDING_INSERT, BINDING_VALUES, binding_params
+from aliases import add_aliases, refresh_aliases
+
+INSTANCE = os.getenv("ABRA_INSTANCE", socket.gethostname())
+FORMAT = "abra-changes/1"
+APPLY_BATCH = 500
+
+BINDING_FIELDS = ("scope", "name", "relationship", "target_type", "target_ref", "qualifier",
+                  "permanence", "source_date", "catcode", "expires_at")
+CONTENT_FIELDS = ("content_hash", "source_file", "note_date", "catcode", "content")
+CATCODE_FIELDS = ("catcode", "parent_catcode", "label")
+NAME_FIELDS = ("scope", "name")
+
+# UPDATE counterpart of BINDING_VALUES, same parameters
+BINDING_SET = ("scope = %s, name_id = intern_name(%s, %s), relationship_id = intern_relationship(%s), "
+               + ", ".join(f"{f} = %s" for f in BINDING_FIELDS[3:]))
+
+
+def _event(table, op, row, old, mapped, instance):
+    """change_log entry -> exported event with natural keys."""
+    key_row = old or row
+    if table == "bindings":
+        source, source_id = mapped if mapped[0] else (instance, key_row["id"])
+        key = {"source": source, "id": source_id}
+        if row:
+            data = {f: row.get(f) for f in BINDING_FIELDS}
+            if row.get("target_type") == "content":
+                data["target_ref"] = None
+                data["target_hash"] = row.get("target_hash")
+            row = data
+    elif table == "names":
+        key = {f: key_row[f] for f in NAME_FIELDS}
+        row = {f: row.get(f) for f in NAME_FIELDS} if row else None
+    elif table == "content":
+        key = {"content_hash": key_row["content_hash"]}
+        row = {f: row.get(f) for f in CONTENT_FIELDS} if row else None
+    else:
+        key = {"catcode": key_row["catcode"]}
+        row = {f: row.get(f) for f in CATCODE_FIELDS} if row else None
+    return {"table": table, "op": op, "key": key, "row": row}
+
+
+def export_changes(conn, out, since=0, instance=INSTANCE, include_replicated=False):
+    """Write change_log entries from transactions in [since, watermark) to out.
+
+    Returns the header dict (with next_since) and the number of events.
+    conn must be fresh: it is switched to a read-only REPEATABLE READ
+    session so the watermark and the rows come from one snapshot.
+    """
+    conn.set_session(isolation_level="REPEATABLE READ", readonly=True)
+    cur = conn.cursor()
+    # Every transaction below the snapshot's xmin has finished, so all of
+    # its entries are visible now and none can show up later
+    cur.execute("SELECT txid_snapshot_xmin(txid_current_snapshot())")
+    until = cur.fetchone()[0]
+    cur.close()
+    header = {"format": FORMAT, "instance": instance, "since": since, "next_since": until}
+    out.write(json.dumps(header) + "\n")
+
+    origin = "" if include_replicated else " AND cl.origin IS NULL"
+    rows = conn.cursor(name="abra_export")
+    rows.itersize = 2000
+    rows.execute(f"""
+        SELECT cl.seq, cl.table_name, cl.op, cl.row_data, cl.old_data, m.source, m.source_id
+        FROM change_log cl
+        LEFT JOIN sync_binding_map m ON cl.table_name = 'bindings'
+             AND m.local_id = (COALESCE(cl.old_data, cl.row_data)->>'id')::int
+        WHERE cl.xid >= %s AND cl.xid < %s{origin}
+        ORDER BY cl.seq
+    """, (since, until))
+    count = 0
+    for seq, table, op, row, old, source, source_id in rows:
+        event = _event(table, op, row, old, (source, source_id), instance)
+        event["seq"] = seq
+        out.write(json.dumps(event, default=str) + "\n")
+        count += 1
+    rows.close()
+    conn.commit()
+    out.write(json.dumps({"end": True, "events": count}) + "\n")
+    return header, count
+
+
+class Applier:
+    """Replays exported events through an AbraWriter's connection."""
+
+    def __init__(self, writer, source):
+        self.writer = writer
+        self.source = source
+        self.cur = writer.conn.cursor()
+        self.stats = {}
+        # Names whose alias keys need recomputing at the end of the batch
+        self.stale = set()
+
+    def count(self, what):
+        self.stats[what] = self.stats.get(what, 0) + 1
+
+    def apply(self, event):
+        table, op = event["table"], event["op"]
+        getattr(self, f"apply_{table}")(op, event["key"], event["row"])
+        self.count(f"{table} {op}")
+
+    def apply_catcode_registry(self, op, key, row):
+        cur = self.cur
+        if op == "D" or (row and row["catcode"] != key["catcode"]):
+            cur.execute("DELETE FROM catcode_registry WHERE catcode = %s", (key["catcode"],))
+        if op != "D":
+            cur.execute(
+                """INSERT INTO catcode_registry (catcode, parent_catcode, label) VALUES (%s, %s, %s)
+                   ON CONFLICT (catcode) DO UPDATE
+                   SET parent_catcode = EXCLUDED.parent_catcode, label = EXCLUDED.label""",
+                (row["catcode"], row["parent_catcode"], row["label"])
+            )
+
+    def apply_content(self, op, key, row):
+        cur = self.cur
+        if op == "D":
+            # Local bindings may still point at it
+            delete_unreferenced(cur, "c.content_hash = %s", (key["content_hash"],))
+            return
+        cur.execute("SELECT id FROM content WHERE content_hash = %s", (key["content_hash"],))
+        found = cur.fetchone()
+        if found is None or row["content_hash"] != key["content_hash"]:
+            # Already scrubbed at the source; "allow" keeps the hash identical
+            self.writer.store_content(row["source_file"], row["content"], row["note_date"],
+                                      row["catcode"], pii="allow")
+        cur.execute(
+            "UPDATE content SET source_file = %s, note_date = %s, catcode = %s WHERE content_hash = %s",
+            (row["source_file"], row["note_date"], row["catcode"], row["content_hash"])
+        )
+
+    def apply_names(self, op, key, row):
+        # New names arrive with the bindings that use them; only renames
+        # need replaying
+        if op == "U" and row["name"] != key["name"]:
+            self.writer.rename_name(key["scope"], key["name"], row["name"])
+
+    def _local_binding(self, key):
+        if key["source"] == INSTANCE:
+            return key["id"]
+        self.cur.execute("SELECT local_id FROM sync_binding_map WHERE source = %s AND source_id = %s",
+                         (key["source"], key["id"]))
+        found = self.cur.fetchone()
+        return found[0] if found else None
+
+    def apply_bindings(self, op, key, row):
+        cur = self.cur
+        local_id = self._local_binding(key)
+        if op == "D":
+            if local_id is not None:
+                cur.execute("DELETE FROM bindings WHERE id = %s RETURNING name_id", (local_id,))
+                self.stale.update(r[0] for r in cur.fetchall())
+                cur.execute("DELETE FROM sync_binding_map WHERE local_id = %s", (local_id,))
+            return
+        values = dict(row)
+        if "target_hash" in values:
+            cur.execute("SELECT id FROM content WHERE content_hash = %s", (values.pop("target_hash"),))
+            found = cur.fetchone()
+            if found is None:
+                self.count("bindings skipped (content missing)")
+                return
+            values["target_ref"] = str(found[0])
+        params = binding_params(*[values[f] for f in BINDING_FIELDS])
+        if local_id is not None:
+            cur.execute(f"UPDATE bindings SET {BINDING_SET} WHERE id = %s RETURNING name_id",
+                        params + (local_id,))
+            updated = cur.fetchall()
+            self.stale.update(r[0] for r in updated)
+            if updated or key["source"] == INSTANCE:
+                return
+            # Mapped row was deleted locally; write it again
+            cur.execute("DELETE FROM sync_binding_map WHERE local_id = %s", (local_id,))
+        elif key["source"] == INSTANCE:
+            return
+        cur.execute(f"{BINDING_INSERT} {BINDING_VALUES} RETURNING id, name_id", params)
+        local_id, name_id = cur.fetchone()
+        cur.execute("INSERT INTO sync_binding_map (source, source_id, local_id) VALUES (%s, %s, %s)",
+                    (key["source"], key["id"], local_id))
+        add_aliases(cur, [(name_id, values["name"], values["relationship"],
+                           values["target_type"], values["target_ref"])])
+
+    def flush(self):
+        refresh_aliases(self.cur, self.stale)
+        self.stale.clear()
+
+
+def sync_position(conn, source):
+    cur = conn.cursor()
+    cur.execute("SELECT position FROM sync_state WHERE source = %s", (source,))
+    row = cur.fetchone()
+    cur.close()
+    return row[0] if row else 0
+
+
+def apply_changes(writer, lines, batch_size=APPLY_BATCH, force=False):
+    """Apply an export (an iterable of JSON lines). Returns (header, stats).
+
+    Events are applied batch_size per transaction. The source's position
+    only moves once the end marker is reached, so a truncated or
+    interrupted file is simply applied again.
+    """
+    lines = iter(lines)
+    header = json.loads(next(lines))
+    if header.get("format") != FORMAT:
+        raise ValueError(f"Not an abra export (format {header.get('format')!r})")
+    source = header["instance"]
+    if source == INSTANCE:
+        raise ValueError(f"Export came from this instance ({INSTANCE})")
+    position = sync_position(writer.conn, source)
+    if header["next_since"] <= position and not force:
+        return header, {"already applied": 1}
+    if header["since"] > position and not force:
+        raise ValueError(f"Gap: {source} is applied up to {position}, this export starts at "
+                         f"{header['since']}. Export again with --since {position}.")
+
+    applier = Applier(writer, source)
+    done = False
+    while not done:
+        with writer.batch():
+            applier.cur.execute("SELECT set_config('abra.origin', %s, true)", (source,))
+            for _ in range(batch_size):
+                line = next(lines, None)
+                if line is None:
+                    done = True
+                    break
+                event = json.loads(line)
+                if event.get("end"):
+                    applier.cur.execute(
+                        """INSERT INTO sync_state (source, position) VALUES (%s, %s)
+                           ON CONFLICT (source) DO UPDATE
+                           SET position = EXCLUDED.position, applied_at = NOW()""",
+                        (source, header["next_since"])
+                    )
+                    applier.count("complete")
+                    done = True
+                    break
+                applier.apply(event)
+            applier.flush()
+    applier.cur.close()
+    return header, applier.stats
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Watch source directories from ~/.abra/sources.yaml and ingest changed files.
+
+Every source with a `path` is watched with inotify (Linux). Bursts of edits to
+a file are debounced into one change, changes flow through a bounded queue to a
+single ingest thread, and each batch is written in one AbraWriter transaction.
+
+The source_manifest table is the persistent cursor: each ingested file's mtime,
+size and hash are recorded in the same transaction as its content, so a restart
+only reconciles by stat and never re-ingests unchanged files. There is no
+periodic rescan; the tree is only walked at startup and after an inotify queue
+overflow.
+
+Each file is stored as a content blob bound to the source name:
+    my-notes ABOUT [content] "1-20-26-leanne.txt"
+
+Usage:
+    abra watch
+    abra watch --once                 # reconcile against the manifest, then exit
+    abra watch --debounce 2 --batch-size 100
+
+sources.yaml options per source:
+    path: ~/notes          directory to watch (required)
+    format: txt            txt, md, or any (default any: .txt and .md)
+    catcode: a0010102      catcode to file content and bindings under
+    watch: false           opt this source out
+"""
+import os
+import sys
+import time
+import queue
+import ctypes
+import ctypes.util
+import select
+import signal
+import struct
+import datetime
+import threading
+from collections import namedtuple
+
+import yaml
+
+from write_binding import AbraWriter, ManifestEntry, content_hash
+
+SOURCES_PATH = "~/.abra/sources.yaml"
+
+FORMAT_EXTENSIONS = {
+    "txt": (".txt",),
+    "md": (".md", ".markdown"),
+    "markdown": (".md", ".markdown"),
+}
+DEFAULT_EXTENSIONS = (".txt", ".md", ".markdown")
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+Source = namedtuple("Source", "name root scope catcode extensions")
+
+
+def log(msg):
+    print(f"{datetime.datetime.now():%H:%M:%S} {msg}", flush=True)
+
+
+def load_sources(path=SOURCES_PATH):
+    """Load watchable sources from sources.yaml. Returns list of Source."""
+    path = os.path.expanduser(path)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        config = yaml.safe_load(f) or {}
+    scope = config.get("scope")
+    sources = []
+    for name, src in (config.get("sources") or {}).items():
+        if not src or not src.get("path") or src.get("watch") is False:
+            continue
+        root = os.path.realpath(os.path.expanduser(src["path"]))
+        if not os.path.isdir(root):
+            log(f"skipping {name}: {root} is not a directory")
+            continue
+        extensions = FORMAT_EXTENSIONS.get(str(src.get("format", "")).lower(), DEFAULT_EXTENSIONS)
+        sources.append(Source(name, root, src.get("scope", scope), src.get("catcode"), extensions))
+    return sources
+
+
+def wanted(source, path):
+    """True if a path is a file this source ingests (skips hidden and editor temp files)."""
+    base = os.path.basename(path)
+    if base.startswith(".") or base.endswith("~"):
+        return False
+    return base.lower().endswith(source.extensions)
+
+
+def walk_files(source):
+    for dirpath, dirnames, filenames in os.walk(source.root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for fn in filenames:
+            path = os.path.join(dirpath, fn)
+            if wanted(source, path):
+                yield path
+
+
+class Inotify:
+    """Minimal ctypes binding to the Linux inotify API."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch {path}: {os.strerror(err)}")
+        return wd
+
+    def read_events(self, timeout):
+        """Wait up to timeout seconds. Returns list of (wd, mask, cookie, name)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            events.append((wd, mask, cookie, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SourceWatcher:
+    """Turns inotify events into debounced (source, path) items on a bounded queue.
+
+    put() blocks when the queue is full, which stalls event reading; the kernel
+    buffers events meanwhile and an overflow triggers a stat reconcile.
+    """
+
+    def __init__(self, sources, out_queue, debounce=1.0):
+        self.sources = sources
+        self.queue = out_queue
+        self.debounce = debounce
+        self.inotify = Inotify()
+        self.dirs = {}        # wd -> (source, dirpath)
+        self.pending = {}     # path -> (source, last event time)
+        self.rescan = set()   # sources to reconcile
+
+    def watch_tree(self, source, root):
+        """Watch a directory and everything below it. Returns files already present."""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            try:
+                wd = self.inotify.add_watch(dirpath)
+            except OSError as e:
+                log(f"cannot watch {dirpath}: {e}")
+                continue
+            self.dirs[wd] = (source, dirpath)
+            found.extend(os.path.join(dirpath, fn) for fn in filenames)
+        return [p for p in found if wanted(source, p)]
+
+    def start(self):
+        for source in self.sources:
+            self.watch_tree(source, source.root)
+            log(f"watching {source.name}: {source.root}")
+
+    def handle(self, wd, mask, name):
+        now = time.monotonic()
+        if mask & IN_Q_OVERFLOW:
+            log("inotify queue overflow, will reconcile all sources")
+            self.rescan.update(self.sources)
+            return
+        if mask & IN_IGNORED:
+            self.dirs.pop(wd, None)
+            return
+        if wd not in self.dirs:
+            return
+        source, dirpath = self.dirs[wd]
+        path = os.path.join(dirpath, name) if name else dirpath
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                # Files can land in a new directory before its watch exists
+                for p in self.watch_tree(source, path):
+                    self.pending[p] = (source, now)
+            elif mask & IN_MOVED_FROM:
+                self.rescan.add(source)
+            return
+        if mask & IN_DELETE_SELF:
+            return
+        if wanted(source, path):
+            self.pending[path] = (source, now)
+
+    def flush(self, stop):
+        """Queue paths that have been quiet for the debounce interval."""
+        now = time.monotonic()
+        due = [p for p, (_, t) in self.pending.items() if now - t >= self.debounce]
+        for path in due:
+            source, _ = self.pending.pop(path)
+            if not self.put((source, path), stop):
+                return
+
+    def put(self, item, stop):
+        while not stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self, stop):
+        while not stop.is_set():
+            for wd, mask, cookie, name in self.inotify.read_events(timeout=min(self.debounce, 0.5)):
+                self.handle(wd, mask, name)
+            while self.rescan:
+                self.put(("rescan", self.rescan.pop()), stop)
+            self.flush(stop)
+        # Anything still debouncing is picked up by the startup reconcile next run
+        self.inotify.close()
+
+
+class Ingester:
+    """Drains the change queue into batched AbraWriter transactions."""
+
+    def __init__(self, writer, sources, in_queue, batch_size=50, batch_wait=0.5):
+        self.writer = writer
+        self.sources = sources
+        self.queue = in_queue
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.cursors = {}
+        self.reload_cursors(sources)
+
+    @staticmethod
+    def manifest_source(source):
+        return f"watch:{source.name}"
+
+    def reconcile(self, source):
+        """Stat-walk a source against its cursor. Returns paths that differ."""
+        cursor = self.cursors[source.name]
+        changed = []
+        on_disk = set()
+        for path in walk_files(source):
+            on_disk.add(path)
+            entry = cursor.get(path)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if not entry or entry.mtime != st.st_mtime or entry.size != st.st_size:
+                changed.append(path)
+        changed.extend(p for p in cursor if p not in on_disk)
+        return changed
+
+    def ingest(self, source, path):
+        """Bring one file's rows in line with disk. Returns 'stored', 'removed' or None."""
+        manifest_source = self.manifest_source(source)
+        cursor = self.cursors[source.name]
+        entry = cursor.get(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if not entry:
+                return None
+            self.writer.delete_bindings(entry.binding_ids)
+            self.writer.forget_manifest(manifest_source, path)
+            if entry.content_id:
+                self.writer.gc_content(content_ids=[entry.content_id])
+            del cursor[path]
+            return "removed"
+        if entry and entry.mtime == st.st_mtime and entry.size == st.st_size:
+            return None
+
+        with open(path, encoding="utf-8", errors="replace") as f:
+            content = f.read()
+        digest = content_hash(content)
+        if entry and entry.content_hash == digest:
+            self.writer.record_manifest(manifest_source, path, st.st_mtime, st.st_size,
+                                        digest, entry.content_id, entry.binding_ids)
+            cursor[path] = entry._replace(mtime=st.st_mtime, size=st.st_size)
+            return None
+
+        if entry:
+            self.writer.delete_bindings(entry.binding_ids)
+        rel = os.path.relpath(path, source.root)
+        note_date = datetime.date.fromtimestamp(st.st_mtime).isoformat()
+        cid = self.writer.store_content(f"{source.name}/{rel}", content,
+                                        note_date=note_date, catcode=source.catcode)
+        bids = []
+        if cid is not None:
+            bid = self.writer.write_binding(source.scope, source.name, "ABOUT", "content", str(cid),
+                                            qualifier=rel[:255], source_date=note_date,
+                                            catcode=source.catcode)
+            bids = [bid] if bid else []
+        self.writer.record_manifest(manifest_source, path, st.st_mtime, st.st_size, digest, cid, bids)
+        if entry and entry.content_id and entry.content_id != cid:
+            self.writer.gc_content(content_ids=[entry.content_id])
+        cursor[path] = ManifestEntry(st.st_mtime, st.st_size, digest, cid, bids)
+        return "stored"
+
+    def write_batch(self, items):
+        """Ingest a batch in one transaction; on failure retry items one by one."""
+        try:
+            with self.writer.batch():
+                results = [self.ingest(source, path) for source, path in items]
+        except Exception as e:
+            self.reload_cursors({source for source, _ in items})
+            if len(items) == 1:
+                log(f"ERROR on {items[0][1]}: {e}")
+                return
+            log(f"batch of {len(items)} failed ({e}), retrying individually")
+            for item in items:
+                self.write_batch([item])
+            return
+        stored = results.count("stored")
+        removed = results.count("removed")
+        if stored or removed:
+            log(f"ingested {stored} files, removed {removed}")
+
+    def reload_cursors(self, sources):
+        for source in sources:
+            self.cursors[source.name] = self.writer.load_manifest(self.manifest_source(source))
+        # End the read's transaction; the daemon must not sit idle in one
+        self.writer.conn.commit()
+
+    def next_batch(self):
+        try:
+            first = self.queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self, stop):
+        while not (stop.is_set() and self.queue.empty()):
+            items = []
+            for kind, payload in self.next_batch():
+                if kind == "rescan":
+                    items.extend((payload, p) for p in self.reconcile(payload))
+                else:
+                    items.append((kind, payload))
+            # Several events for one path collapse into one ingest
+            items = list(dict.fromkeys(items))
+            for i in range(0, len(items), self.batch_size):
+                self.write_batch(items[i:i + self.batch_size])
+
+
+def run(config=SOURCES_PATH, debounce=1.0, batch_size=50, queue_size=1000, once=False):
+    sources = load_sources(config)
+    if not sources:
+        print(f"No watchable sources in {config} (each needs a path)")
+        sys.exit(1)
+
+    writer = AbraWriter()
+    changes = queue.Queue(maxsize=queue_size)
+    ingester = Ingester(writer, sources, changes, batch_size=batch_size)
+
+    stop = threading.Event()
+    watch_thread = None
+    if not once:
+        # Watches go in before the reconcile, so a file changed while the
+        # backlog is written still produces an event. They queue up (and
+        # overflow into a rescan) until the ingester starts draining.
+        watcher = SourceWatcher(sources, changes, debounce=debounce)
+        watcher.start()
+        watch_thread = threading.Thread(target=watcher.run, args=(stop,), name="abra-watch", daemon=True)
+        watch_thread.start()
+    try:
+        # Catch up on anything that changed while we were not running
+        backlog = [(source, path) for source in sources for path in ingester.reconcile(source)]
+        if backlog:
+            log(f"reconciling {len(backlog)} files changed since last run")
+            for i in range(0, len(backlog), batch_size):
+                ingester.write_batch(backlog[i:i + batch_size])
+        if once:
+            return
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: stop.set())
+        ingester.run(stop)
+    finally:
+        stop.set()
+        if watch_thread:
+            watch_thread.join(timeout=5)
+            log("stopped")
+        writer.close()
@@ -6,27 +6,43 @@ Usage from a processing session:
     from write_binding import AbraWriter
     writer = AbraWriter()
 
-    # Store a note blob
-    content_id = writer.store_content("1-20-26-leanne.txt", "note text...", note_date="2026-01-20")
+    # Store a note blob (emails/phones are redacted unless ABRA_CONTENT_PII says otherwise)
+    # and bind it in the same transaction, before gc_content can collect it
+    with writer.batch():
+        content_id = writer.store_content("1-20-26-leanne.txt", "note text...", note_date="2026-01-20")
+        writer.write_binding("golda", "leanne-ussher", "ABOUT", "content", str(content_id), qualifier="meeting notes")
+        writer.write_binding("golda", "lt", "RELATED", "content", str(content_id), qualifier="contact - currency design")
 
     # Create bindings
     writer.write_binding("golda", "leanne-ussher", "IS", "text", "Leanne Ussher", permanence="INTRINSIC")
-    writer.write_binding("golda", "leanne-ussher", "ABOUT", "content", str(content_id), qualifier="meeting notes")
-    writer.write_binding("golda", "lt", "RELATED", "content", str(content_id), qualifier="contact - currency design")
 
     # Check if a name already exists
     existing = writer.find_name("golda", "leanne")  # returns list of matching names
 
+    # Rename everywhere (names are interned, so this is one row)
+    writer.rename_name("golda", "leanne", "leanne-ussher")
+
+    # Allocate and register catcodes in bulk (safe with concurrent writers)
+    codes = writer.register_catcodes([(None, "a0010301", f"project-{i}") for i in range(500)])
+
 Also usable as CLI:
     python write_binding.py --scope golda --name leanne-ussher --rel IS --target-type text --target-ref "Leanne Ussher"
 """
 import os
-import re
 import sys
+import hashlib
 import argparse
+from datetime import datetime, timedelta
+from collections import namedtuple
+from contextlib import contextmanager
 import psycopg2
+from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
+from pii import PIIScanner, CONTENT_CATEGORIES
+from chunking import chunk_text, detect_kind
+from aliases import add_aliases, refresh_aliases
+
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 PG_HOST = os.getenv("PG_HOST", "10.0.0.100")
@@ -35,18 +51,113 @@ PG_USER = os.getenv("PG_USER", "cobox")
 PG_PASSWORD = os.getenv("PG_PASSWORD", "")
 PG_DATABASE = os.getenv("PG_DATABASE", "abra")
 
-PII_PATTERNS = [
-    re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+'),
-    re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'),
-    re.compile(r'\b\d{5}(-\d{4})?\b'),
-]
+# What store_content does with PII in a content body: redact, reject or allow
+CONTENT_PII = os.getenv("ABRA_CONTENT_PII", "redact")
+
+binding_pii = PIIScanner()
+content_pii = PIIScanner(CONTENT_CATEGORIES)
 
 
 def check_pii(text):
-    for pattern in PII_PATTERNS:
-        if pattern.search(text):
-            return True
-    return False
+    """Return True if a binding target_ref appears to contain PII."""
+    return binding_pii.contains(text)
+
+
+def scrub_content(content, policy=None):
+    """Apply the content PII policy. Returns the text to store, or None if rejected."""
+    policy = policy or CONTENT_PII
+    if policy == "allow":
+        return content
+    if policy == "reject":
+        return None if content_pii.contains(content) else content
+    if policy == "redact":
+        return content_pii.redact(content)[0]
+    raise ValueError(f"Unknown content PII policy: {policy}")
+
+
+ManifestEntry = namedtuple("ManifestEntry", "mtime size content_hash content_id binding_ids")
+
+
+# Catcode levels are 2 base-36 chars: 01, 02, ... 0z, 10, ... zz
+CATCODE_CHARS = "0123456789abcdefghijklmnopqrstuvwxyz"
+CATCODE_LEVEL = 2
+CATCODE_SLOTS = 36 * 36
+# Child codes reserved per round trip by allocate_catcodes
+CATCODE_RESERVE = int(os.getenv("ABRA_CATCODE_RESERVE", "16"))
+# Fresh codes tried when an allocated one turns out to be taken
+CATCODE_RETRIES = 3
+# Rows per transaction when deleting a subtree or collecting content
+DELETE_BATCH = int(os.getenv("ABRA_DELETE_BATCH", "5000"))
+# Default lifetime of an EPHEMERAL binding written without expires_at; 0 = never
+EPHEMERAL_TTL_DAYS = int(os.getenv("ABRA_EPHEMERAL_TTL_DAYS", "180"))
+
+# Columns moved from bindings to bindings_archive by expire_bindings
+BINDING_COLUMNS = ("id, scope, name_id, relationship_id, target_type, target_ref, qualifier, "
+                   "permanence, source_date, catcode, created_at, expires_at")
+
+# Writing a binding: name and relationship go in as strings and the
+# database interns them (intern_name/intern_relationship in setup_db.py).
+# Parameters come from binding_params().
+BINDING_INSERT = ("INSERT INTO bindings (scope, name_id, relationship_id, target_type, target_ref, "
+                  "qualifier, permanence, source_date, catcode, expires_at) VALUES")
+BINDING_VALUES = "(%s, intern_name(%s, %s), intern_relationship(%s), %s, %s, %s, %s, %s, %s, %s)"
+
+# No live or archived binding points at content row c
+UNREFERENCED = """NOT EXISTS (
+                       SELECT 1 FROM bindings b
+                       WHERE b.target_type = 'content' AND b.target_ref = c.id::text
+                   ) AND NOT EXISTS (
+                       SELECT 1 FROM bindings_archive a
+                       WHERE a.target_type = 'content' AND a.target_ref = c.id::text
+                   )"""
+
+
+def delete_unreferenced(cur, where, params=()):
+    """Delete the content rows matching where (alias c) that nothing points at.
+
+    Blobs another writer holds a lock on (store_content keeps a reused blob
+    FOR KEY SHARE until its binding commits) are skipped rather than waited
+    for. Returns the number of rows deleted.
+    """
+    cur.execute(f"""DELETE FROM content WHERE id IN (
+                        SELECT c.id FROM content c WHERE {where} AND {UNREFERENCED}
+                        FOR UPDATE SKIP LOCKED)""", params)
+    return cur.rowcount
+
+
+def catcode_child(parent_catcode, index):
+    return parent_catcode + CATCODE_CHARS[index // 36] + CATCODE_CHARS[index % 36]
+
+
+def catcode_index(catcode, parent_catcode):
+    """Slot of a direct child under parent (01 -> 1, zz -> 1295), or None."""
+    suffix = catcode[len(parent_catcode):] if catcode.startswith(parent_catcode) else ""
+    if len(suffix) != CATCODE_LEVEL or any(ch not in CATCODE_CHARS for ch in suffix):
+        return None
+    return CATCODE_CHARS.index(suffix[0]) * 36 + CATCODE_CHARS.index(suffix[1])
+
+
+def binding_expiry(permanence, expires_at=None, ttl_days=None):
+    """expires_at for a new binding: explicit, from ttl_days, or the EPHEMERAL default."""
+    if expires_at:
+        return expires_at
+    if ttl_days is None and permanence == "EPHEMERAL" and EPHEMERAL_TTL_DAYS:
+        ttl_days = EPHEMERAL_TTL_DAYS
+    if ttl_days:
+        return datetime.now() + timedelta(days=ttl_days)
+    return None
+
+
+def binding_params(scope, name, relationship, target_type, target_ref, qualifier=None,
+                   permanence="CURRENT", source_date=None, catcode=None, expires_at=None):
+    """Parameters for BINDING_VALUES (scope appears twice: row and name)."""
+    return (scope, scope, name, relationship, target_type, target_ref, qualifier,
+            permanence, source_date, catcode, expires_at)
+
+
+def content_hash(content):
+    """sha256 hex digest of a content blob's UTF-8 bytes."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
 class AbraWriter:
@@ -55,52 +166,355 @@ class AbraWriter:
             host=PG_HOST, port=PG_PORT, user=PG_USER,
             password=PG_PASSWORD, dbname=PG_DATABASE
         )
+        self._batch_depth = 0
+        self._alloc_conn = None
+        self._catcode_ranges = {}
 
-    def store_content(self, source_file, content, note_date=None, catcode=None):
-        """Store a content blob. Returns content ID."""
+    def _commit(self):
+        if not self._batch_depth:
+            self.conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """Group writes into one transaction: commits on exit, rolls back on error.
+
+            with writer.batch():
+                cid = writer.store_content(...)
+                writer.write_binding(...)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.conn.rollback()
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth:
+            self.conn.commit()
+
+    def store_content(self, source_file, content, note_date=None, catcode=None, pii=None,
+                      chunking=None):
+        """Store a content blob. Returns content ID, or None if rejected for PII.
+
+        Blobs are content-addressed: storing the same bytes again returns the
+        existing ID and leaves the row (and its TOAST/index entries) untouched.
+        A blob no binding points to yet can be collected at any time, so store
+        it and write its binding in one writer.batch(): the returned row stays
+        locked against gc_content until the batch commits.
+        pii overrides the ABRA_CONTENT_PII policy (redact, reject or allow).
+        New blobs are split into content_chunks with the given chunker
+        ("markdown" or "records"; default picked from source_file, False to skip).
+        """
+        content = scrub_content(content, pii)
+        if content is None:
+            print(f"  REJECTED (PII detected): content {source_file}")
+            return None
+        digest = content_hash(content)
         cur = self.conn.cursor()
-        cur.execute(
-            "INSERT INTO content (source_file, content, note_date, catcode) VALUES (%s, %s, %s, %s) RETURNING id",
-            (source_file, content, note_date, catcode)
-        )
-        content_id = cur.fetchone()[0]
-        self.conn.commit()
+        while True:
+            cur.execute(
+                """INSERT INTO content (source_file, content, note_date, catcode, content_hash)
+                   VALUES (%s, %s, %s, %s, %s)
+                   ON CONFLICT (content_hash) DO NOTHING
+                   RETURNING id""",
+                (source_file, content, note_date, catcode, digest)
+            )
+            row = cur.fetchone()
+            if row is not None:
+                if chunking is not False:
+                    self.chunk_content(row[0], content, chunking or detect_kind(source_file))
+                break
+            # Already stored: hold the row until the caller's binding commits.
+            # If gc deleted it just now, store it again.
+            cur.execute("SELECT id FROM content WHERE content_hash = %s FOR KEY SHARE", (digest,))
+            row = cur.fetchone()
+            if row is not None:
+                break
+        content_id = row[0]
+        self._commit()
         cur.close()
         return content_id
 
+    def chunk_content(self, content_id, content, kind="markdown"):
+        """(Re)write the chunks for a content blob. Returns number of chunks."""
+        chunks = chunk_text(content, kind)
+        cur = self.conn.cursor()
+        cur.execute("DELETE FROM content_chunks WHERE content_id = %s", (content_id,))
+        execute_values(
+            cur,
+            """INSERT INTO content_chunks (content_id, chunk_index, start_byte, end_byte, heading, body)
+               VALUES %s""",
+            [(content_id, c.index, c.start, c.end, c.heading, c.text) for c in chunks]
+        )
+        self._commit()
+        cur.close()
+        return len(chunks)
+
+    def gc_content(self, catcode_prefix=None, dry_run=False, content_ids=None,
+                   batch_size=DELETE_BATCH):
+        """Delete content blobs no binding points to. Returns number of blobs removed.
+
+        With catcode_prefix, only blobs filed under that subtree are considered;
+        with content_ids, only those blobs. Candidates are deleted batch_size
+        at a time, each batch in its own transaction, and rechecked as they go
+        so a binding written meanwhile keeps its blob; blobs a writer has just
+        stored for a binding it has not committed yet are skipped.
+        """
+        where = ""
+        params = []
+        if catcode_prefix:
+            where += " AND c.catcode LIKE %s"
+            params.append(f"{catcode_prefix}%")
+        if content_ids is not None:
+            where += " AND c.id = ANY(%s)"
+            params.append([int(i) for i in content_ids])
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT c.id FROM content c WHERE {UNREFERENCED}{where} ORDER BY c.id", params)
+        candidates = [r[0] for r in cur.fetchall()]
+        if dry_run:
+            self._commit()
+            cur.close()
+            return len(candidates)
+        count = 0
+        for start in range(0, len(candidates), batch_size):
+            count += delete_unreferenced(cur, "c.id = ANY(%s)", (candidates[start:start + batch_size],))
+            self._commit()
+        self._commit()
+        cur.close()
+        return count
+
     def write_binding(self, scope, name, relationship, target_type, target_ref,
-                      qualifier=None, permanence="CURRENT", source_date=None, catcode=None):
-        """Write a single binding. Rejects PII in target_ref."""
+                      qualifier=None, permanence="CURRENT", source_date=None, catcode=None,
+                      expires_at=None, ttl_days=None):
+        """Write a single binding. Rejects PII in target_ref.
+
+        expires_at (or ttl_days from now) marks when `abra expire` may archive
+        it; EPHEMERAL bindings default to EPHEMERAL_TTL_DAYS. The name's
+        lookup keys (see aliases.py) are indexed in the same transaction.
+        """
         if check_pii(target_ref):
             print(f"  REJECTED (PII detected): {name} {relationship} {target_ref[:40]}...")
             return None
 
         cur = self.conn.cursor()
         cur.execute(
-            """INSERT INTO bindings (scope, name, relationship, target_type, target_ref, qualifier, permanence, source_date, catcode)
-               VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id""",
-            (scope, name, relationship, target_type, target_ref,
-             qualifier, permanence, source_date, catcode)
+            f"{BINDING_INSERT} {BINDING_VALUES} RETURNING id, name_id",
+            binding_params(scope, name, relationship, target_type, target_ref,
+                           qualifier, permanence, source_date, catcode,
+                           binding_expiry(permanence, expires_at, ttl_days))
         )
-        binding_id = cur.fetchone()[0]
-        self.conn.commit()
+        binding_id, name_id = cur.fetchone()
+        add_aliases(cur, [(name_id, name, relationship, target_type, target_ref)])
+        self._commit()
         cur.close()
         return binding_id
 
-    def register_catcode(self, catcode, parent_catcode, label):
-        """Register a position in the catcode space. Returns catcode."""
+    def write_bindings(self, bindings):
+        """Write many bindings in one round trip and one transaction.
+
+        bindings is a list of dicts with write_binding's arguments (scope, name,
+        relationship, target_type, target_ref, and optionally qualifier,
+        permanence, source_date, catcode, expires_at, ttl_days). Rejects PII
+        like write_binding.
+        Returns the new IDs in input order, None for rejected rows.
+        """
+        rows = []
+        accepted = []
+        for i, b in enumerate(bindings):
+            if check_pii(b["target_ref"]):
+                print(f"  REJECTED (PII detected): {b['name']} {b['relationship']} {b['target_ref'][:40]}...")
+                continue
+            accepted.append(i)
+            permanence = b.get("permanence", "CURRENT")
+            rows.append(binding_params(b["scope"], b["name"], b["relationship"], b["target_type"],
+                                       b["target_ref"], b.get("qualifier"), permanence,
+                                       b.get("source_date"), b.get("catcode"),
+                                       binding_expiry(permanence, b.get("expires_at"), b.get("ttl_days"))))
+        ids = [None] * len(bindings)
+        if not rows:
+            return ids
+        cur = self.conn.cursor()
+        results = execute_values(
+            cur,
+            f"{BINDING_INSERT} %s RETURNING id, name_id",
+            rows, template=BINDING_VALUES, page_size=len(rows), fetch=True
+        )
+        written = []
+        for i, (binding_id, name_id) in zip(accepted, results):
+            ids[i] = binding_id
+            b = bindings[i]
+            written.append((name_id, b["name"], b["relationship"], b["target_type"], b["target_ref"]))
+        add_aliases(cur, written)
+        self._commit()
+        cur.close()
+        return ids
+
+    def delete_bindings(self, binding_ids):
+        """Delete bindings by ID. Returns number deleted."""
+        if not binding_ids:
+            return 0
+        cur = self.conn.cursor()
+        cur.execute("DELETE FROM bindings WHERE id = ANY(%s) RETURNING name_id", (list(binding_ids),))
+        name_ids = [r[0] for r in cur.fetchall()]
+        count = len(name_ids)
+        refresh_aliases(cur, name_ids)
+        self._commit()
+        cur.close()
+        return count
+
+    def expire_bindings(self, batch_size=DELETE_BATCH, dry_run=False, progress=None):
+        """Move bindings past their expires_at into bindings_archive. Returns rows moved.
+
+        Works through idx_bindings_expires batch_size rows at a time, each
+        batch moved in one short transaction, so it can run alongside
+        queries and be stopped and restarted at any point.
+        """
+        cur = self.conn.cursor()
+        if dry_run:
+            cur.execute("SELECT COUNT(*) FROM bindings WHERE expires_at <= NOW()")
+            count = cur.fetchone()[0]
+            self._commit()
+            cur.close()
+            return count
+        moved = 0
+        while True:
+            cur.execute(f"""
+                WITH expired AS (
+                    DELETE FROM bindings WHERE id IN (
+                        SELECT id FROM bindings WHERE expires_at <= NOW()
+                        ORDER BY expires_at LIMIT %s
+                    )
+                    RETURNING {BINDING_COLUMNS}
+                )
+                INSERT INTO bindings_archive ({BINDING_COLUMNS})
+                SELECT {BINDING_COLUMNS} FROM expired
+                RETURNING name_id
+            """, (batch_size,))
+            # No ON CONFLICT: an id already archived fails the batch rather
+            # than dropping the live row, so every deleted row was inserted
+            # and rowcount counts both
+            batch = cur.rowcount
+            refresh_aliases(cur, [r[0] for r in cur.fetchall()])
+            moved += batch
+            self._commit()
+            if progress:
+                progress(moved)
+            if batch < batch_size:
+                break
+        cur.close()
+        return moved
+
+    def load_manifest(self, source):
+        """Load the source manifest. Returns {path: ManifestEntry}."""
         cur = self.conn.cursor()
         cur.execute(
-            """INSERT INTO catcode_registry (catcode, parent_catcode, label)
-               VALUES (%s, %s, %s)
-               ON CONFLICT (catcode) DO UPDATE SET label = EXCLUDED.label
-               RETURNING catcode""",
-            (catcode, parent_catcode, label)
+            """SELECT path, mtime, size, content_hash, content_id, binding_ids
+               FROM source_manifest WHERE source = %s""",
+            (source,)
         )
-        result = cur.fetchone()[0]
-        self.conn.commit()
+        results = {row[0]: ManifestEntry(*row[1:]) for row in cur.fetchall()}
+        cur.close()
+        return results
+
+    def record_manifest(self, source, path, mtime, size, digest, content_id, binding_ids):
+        """Record what was imported for a source file."""
+        cur = self.conn.cursor()
+        cur.execute(
+            """INSERT INTO source_manifest (source, path, mtime, size, content_hash, content_id, binding_ids)
+               VALUES (%s, %s, %s, %s, %s, %s, %s)
+               ON CONFLICT (source, path) DO UPDATE SET
+                   mtime = EXCLUDED.mtime, size = EXCLUDED.size,
+                   content_hash = EXCLUDED.content_hash, content_id = EXCLUDED.content_id,
+                   binding_ids = EXCLUDED.binding_ids, updated_at = NOW()""",
+            (source, path, mtime, size, digest, content_id, list(binding_ids))
+        )
+        self._commit()
+        cur.close()
+
+    def forget_manifest(self, source, path=None):
+        """Drop manifest rows for a source (or one file in it)."""
+        cur = self.conn.cursor()
+        if path is None:
+            cur.execute("DELETE FROM source_manifest WHERE source = %s", (source,))
+        else:
+            cur.execute("DELETE FROM source_manifest WHERE source = %s AND path = %s", (source, path))
+        self._commit()
         cur.close()
-        return result
+
+    def register_catcode(self, catcode, parent_catcode, label):
+        """Register a position in the catcode space. Returns catcode."""
+        return self.register_catcodes([(catcode, parent_catcode, label)])[0]
+
+    def register_catcodes(self, entries):
+        """Register many catcodes in one statement. Returns the catcodes in input order.
+
+        entries are (catcode, parent_catcode, label) tuples; a catcode of None
+        is allocated under its parent (see allocate_catcodes). Parents may be
+        registered in the same call. Existing explicit catcodes get the new
+        label. Allocated codes never overwrite a row: if another writer
+        registered the code first, a fresh one is allocated instead.
+        """
+        entries = list(entries)
+        if not entries:
+            return []
+        # Explicit codes move their parent's counter past them, so the
+        # allocator never hands the same code out later
+        explicit = {}
+        for code, parent, _ in entries:
+            index = catcode_index(code, parent) if code and parent else None
+            if index is not None:
+                explicit[parent] = max(explicit.get(parent, 0), index + 1)
+        if explicit:
+            self._bump_catcode_counters(explicit)
+
+        codes = [code for code, _, _ in entries]
+        cur = self.conn.cursor()
+        rows = [(code, parent, label) for code, parent, label in entries if code is not None]
+        if rows:
+            execute_values(
+                cur,
+                """INSERT INTO catcode_registry (catcode, parent_catcode, label)
+                   VALUES %s
+                   ON CONFLICT (catcode) DO UPDATE SET label = EXCLUDED.label""",
+                rows, page_size=len(rows)
+            )
+        pending = [i for i, code in enumerate(codes) if code is None]
+        for _ in range(CATCODE_RETRIES):
+            if not pending:
+                break
+            wanted = {}
+            for i in pending:
+                parent = entries[i][1]
+                wanted[parent] = wanted.get(parent, 0) + 1
+            allocated = {parent: iter(self.allocate_catcodes(parent, n)) for parent, n in wanted.items()}
+            for i in pending:
+                codes[i] = next(allocated[entries[i][1]])
+            inserted = execute_values(
+                cur,
+                """INSERT INTO catcode_registry (catcode, parent_catcode, label)
+                   VALUES %s
+                   ON CONFLICT (catcode) DO NOTHING
+                   RETURNING catcode""",
+                [(codes[i], entries[i][1], entries[i][2]) for i in pending],
+                page_size=len(pending), fetch=True
+            )
+            inserted = {row[0] for row in inserted}
+            # Taken by a write the counters did not know about (a sync apply,
+            # or an explicit code committed meanwhile): drop the cached range
+            # so the next reservation starts past the registry
+            collided = [i for i in pending if codes[i] not in inserted]
+            for i in collided:
+                self._catcode_ranges.pop(entries[i][1], None)
+            pending = collided
+        if pending:
+            cur.close()
+            raise ValueError(f"Could not allocate a free catcode under {entries[pending[0]][1]} "
+                             f"after {CATCODE_RETRIES} attempts")
+        self._commit()
+        cur.close()
+        return codes
 
     def find_catcode(self, prefix):
         """Find catcodes by prefix. Returns list of (catcode, parent_catcode, label)."""
@@ -113,47 +527,246 @@ class AbraWriter:
         cur.close()
         return results
 
+    def _alloc_cursor(self):
+        """Cursor on the allocator's own connection (see _reserve_catcodes)."""
+        if self._alloc_conn is None:
+            self._alloc_conn = psycopg2.connect(
+                host=PG_HOST, port=PG_PORT, user=PG_USER,
+                password=PG_PASSWORD, dbname=PG_DATABASE
+            )
+        return self._alloc_conn.cursor()
+
+    def _next_catcode_index(self, cur, parent_catcode):
+        """First free slot under a parent: past both its counter and the
+        registry's last committed child. Takes the parent's advisory lock,
+        held until cur's transaction ends."""
+        cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (f"abra.catcode:{parent_catcode}",))
+        cur.execute("SELECT next_index FROM catcode_counters WHERE parent_catcode = %s",
+                    (parent_catcode,))
+        row = cur.fetchone()
+        cur.execute(
+            """SELECT catcode FROM catcode_registry
+               WHERE parent_catcode = %s AND length(catcode) = %s
+               ORDER BY catcode DESC LIMIT 1""",
+            (parent_catcode, len(parent_catcode) + CATCODE_LEVEL)
+        )
+        last = cur.fetchone()
+        index = catcode_index(last[0], parent_catcode) if last else None
+        return max(row[0] if row else 1, index + 1 if index is not None else 1)
+
+    def _reserve_catcodes(self, parent_catcode, count):
+        """Atomically take `count` child slots under a parent. Returns (start, end) indexes.
+
+        Runs on its own connection and commits at once, so a reservation holds
+        even when the caller's batch() rolls back, and two writers never get
+        the same range. Under the advisory lock the counter is also moved past
+        the registry, which catches codes written without the allocator
+        (sync apply).
+        """
+        cur = self._alloc_cursor()
+        try:
+            start = self._next_catcode_index(cur, parent_catcode)
+            end = min(start + count, CATCODE_SLOTS)
+            if end <= start:
+                raise ValueError(f"Catcode space exhausted under {parent_catcode}")
+            cur.execute(
+                """INSERT INTO catcode_counters (parent_catcode, next_index) VALUES (%s, %s)
+                   ON CONFLICT (parent_catcode) DO UPDATE
+                   SET next_index = GREATEST(catcode_counters.next_index, EXCLUDED.next_index)""",
+                (parent_catcode, end)
+            )
+            self._alloc_conn.commit()
+        except BaseException:
+            self._alloc_conn.rollback()
+            raise
+        finally:
+            cur.close()
+        return start, end
+
+    def _bump_catcode_counters(self, next_indexes):
+        """Move counters past explicitly registered codes ({parent: next_index}).
+
+        Same lock and connection as _reserve_catcodes, committed before the
+        codes themselves are inserted, so no reservation can overlap them.
+        """
+        cur = self._alloc_cursor()
+        try:
+            # Sorted, so two writers bumping the same parents cannot deadlock
+            for parent_catcode, next_index in sorted(next_indexes.items()):
+                start = self._next_catcode_index(cur, parent_catcode)
+                cur.execute(
+                    """INSERT INTO catcode_counters (parent_catcode, next_index) VALUES (%s, %s)
+                       ON CONFLICT (parent_catcode) DO UPDATE
+                       SET next_index = GREATEST(catcode_counters.next_index, EXCLUDED.next_index)""",
+                    (parent_catcode, max(start, next_index))
+                )
+            self._alloc_conn.commit()
+        except BaseException:
+            self._alloc_conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+    def allocate_catcodes(self, parent_catcode, count=1):
+        """Hand out `count` unused child catcodes under a parent.
+
+        Codes come from ranges reserved in the database (at least
+        CATCODE_RESERVE at a time) and are then served from memory, so
+        allocating thousands costs a handful of round trips. Codes reserved
+        but never registered are skipped, not reused.
+        """
+        codes = []
+        while len(codes) < count:
+            start, end = self._catcode_ranges.get(parent_catcode, (0, 0))
+            if start >= end:
+                start, end = self._reserve_catcodes(parent_catcode,
+                                                    max(count - len(codes), CATCODE_RESERVE))
+            take = min(end - start, count - len(codes))
+            codes.extend(catcode_child(parent_catcode, i) for i in range(start, start + take))
+            self._catcode_ranges[parent_catcode] = (start + take, end)
+        return codes
+
     def next_catcode(self, parent_catcode):
-        """Get next sequential catcode under a parent. 2-char alphanumeric levels (00-zz)."""
+        """Get next sequential catcode under a parent. 2-char alphanumeric levels (00-zz).
+
+        The code is reserved: concurrent writers never get the same one.
+        """
+        return self.allocate_catcodes(parent_catcode, 1)[0]
+
+    def subtree_counts(self, catcode):
+        """What delete_subtree(catcode) would remove, as {table: rows}."""
+        pattern = f"{catcode}%"
         cur = self.conn.cursor()
-        parent_len = len(parent_catcode)
-        child_len = parent_len + 2
+        counts = {}
+        for table in ("bindings", "bindings_archive", "catcode_registry"):
+            cur.execute(f"SELECT COUNT(*) FROM {table} WHERE catcode LIKE %s", (pattern,))
+            counts[table] = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM catcode_counters WHERE parent_catcode LIKE %s", (pattern,))
+        counts["catcode_counters"] = cur.fetchone()[0]
+        # Blobs filed under the subtree or pointed to from it that nothing
+        # outside the subtree still points to
         cur.execute(
-            "SELECT catcode FROM catcode_registry WHERE parent_catcode = %s ORDER BY catcode DESC LIMIT 1",
-            (parent_catcode,)
+            """SELECT COUNT(*), COALESCE(SUM(
+                      (SELECT COUNT(*) FROM content_chunks ch WHERE ch.content_id = c.id)), 0)
+               FROM content c
+               WHERE (c.catcode LIKE %s OR c.id::text IN (
+                         SELECT target_ref FROM bindings
+                         WHERE catcode LIKE %s AND target_type = 'content'))
+               AND NOT EXISTS (
+                   SELECT 1 FROM bindings b
+                   WHERE b.target_type = 'content' AND b.target_ref = c.id::text
+                   AND (b.catcode IS NULL OR b.catcode NOT LIKE %s)
+               ) AND NOT EXISTS (
+                   SELECT 1 FROM bindings_archive a
+                   WHERE a.target_type = 'content' AND a.target_ref = c.id::text
+                   AND (a.catcode IS NULL OR a.catcode NOT LIKE %s)
+               )""",
+            (pattern, pattern, pattern, pattern)
         )
-        row = cur.fetchone()
+        counts["content"], counts["content_chunks"] = cur.fetchone()
+        self._commit()
         cur.close()
-        if not row:
-            return parent_catcode + "01"
-        last = row[0][parent_len:child_len]
-        # Increment alphanumeric: 00-09, 0a-0z, 10-19, ... zz
-        chars = "0123456789abcdefghijklmnopqrstuvwxyz"
-        idx = chars.index(last[0]) * 36 + chars.index(last[1]) + 1
-        if idx >= 1296:
-            raise ValueError(f"Catcode space exhausted under {parent_catcode}")
-        return parent_catcode + chars[idx // 36] + chars[idx % 36]
+        return counts
 
-    def delete_catcode(self, catcode):
-        """Delete a catcode and cascade: removes subtree and all referencing bindings/content."""
+    def delete_bindings_under(self, catcode, batch_size=DELETE_BATCH, collect=True, progress=None):
+        """Delete the bindings under a catcode prefix in batches. Returns (bindings, blobs).
+
+        Each batch is its own short transaction, so readers and other writers
+        are never held up behind one huge delete, and an interrupted run is
+        resumed by calling again. With collect, blobs the batch left
+        unreferenced are deleted in the same transaction; pass collect=False
+        when the blobs are about to be rebound (content is shared by hash).
+        progress(done, total) is called after each batch.
+        """
         cur = self.conn.cursor()
-        # Remove bindings and content referencing this subtree
-        cur.execute("DELETE FROM bindings WHERE catcode LIKE %s", (f"{catcode}%",))
-        cur.execute("DELETE FROM content WHERE catcode LIKE %s", (f"{catcode}%",))
+        # Uses idx_bindings_catcode_prefix (varchar_pattern_ops)
+        cur.execute("SELECT id FROM bindings WHERE catcode LIKE %s ORDER BY id", (f"{catcode}%",))
+        ids = [r[0] for r in cur.fetchall()]
+        self._commit()
+        deleted = collected = 0
+        for start in range(0, len(ids), batch_size):
+            cur.execute(
+                "DELETE FROM bindings WHERE id = ANY(%s) RETURNING target_type, target_ref, name_id",
+                (ids[start:start + batch_size],)
+            )
+            rows = cur.fetchall()
+            deleted += len(rows)
+            refresh_aliases(cur, [name_id for _, _, name_id in rows])
+            refs = sorted({int(ref) for kind, ref, _ in rows if kind == "content" and ref.isdigit()})
+            if collect and refs:
+                collected += delete_unreferenced(cur, "c.id = ANY(%s)", (refs,))
+            self._commit()
+            if progress:
+                progress(deleted, len(ids))
+        cur.close()
+        return deleted, collected
+
+    def delete_subtree(self, catcode, batch_size=DELETE_BATCH, progress=None):
+        """Delete a catcode subtree in bounded batches. Returns {table: rows}.
+
+        Bindings go first, then orphaned blobs, and the registry entries last,
+        so an interrupted delete leaves the subtree registered and running it
+        again picks up where it stopped. Content is shared by hash, so blobs
+        that bindings elsewhere still point to are kept.
+        """
+        bindings, content = self.delete_bindings_under(catcode, batch_size, progress=progress)
+        cur = self.conn.cursor()
+        cur.execute("DELETE FROM bindings_archive WHERE catcode LIKE %s RETURNING name_id",
+                    (f"{catcode}%",))
+        archived = cur.rowcount
+        refresh_aliases(cur, [r[0] for r in cur.fetchall()])
+        self._commit()
+        content += self.gc_content(catcode, batch_size=batch_size)
+        cur.execute("DELETE FROM catcode_counters WHERE parent_catcode LIKE %s", (f"{catcode}%",))
+        counters = cur.rowcount
         # CASCADE on FK handles subtree in registry
-        cur.execute("DELETE FROM catcode_registry WHERE catcode = %s", (catcode,))
-        self.conn.commit()
+        cur.execute("DELETE FROM catcode_registry WHERE catcode LIKE %s", (f"{catcode}%",))
+        registry = cur.rowcount
+        self._commit()
         cur.close()
+        for parent in [p for p in self._catcode_ranges if p.startswith(catcode)]:
+            del self._catcode_ranges[parent]
+        return {"bindings": bindings, "bindings_archive": archived, "content": content,
+                "catcode_registry": registry, "catcode_counters": counters}
+
+    def delete_catcode(self, catcode):
+        """Delete a catcode and cascade: removes subtree and all referencing bindings/content.
+
+        Content is shared by hash, so blobs in the subtree that bindings elsewhere
+        still point to are kept. See delete_subtree for batching and resume.
+        """
+        return self.delete_subtree(catcode)
 
     def rename_name(self, scope, old_name, new_name):
-        """Rename a pet name. Safe — nothing uses name as a foreign key."""
+        """Rename a pet name. Returns the number of bindings renamed.
+
+        Bindings hold the name's id, so this updates one row in names. If
+        new_name already exists in the scope, old_name's bindings (live and
+        archived) are moved onto it and the old row is removed.
+        """
         cur = self.conn.cursor()
-        cur.execute(
-            "UPDATE bindings SET name = %s WHERE scope = %s AND name = %s",
-            (new_name, scope, old_name)
-        )
-        count = cur.rowcount
-        self.conn.commit()
+        cur.execute("SELECT id FROM names WHERE scope = %s AND name = %s", (scope, old_name))
+        row = cur.fetchone()
+        if row is None:
+            self._commit()
+            cur.close()
+            return 0
+        old_id = row[0]
+        cur.execute("SELECT COUNT(*) FROM bindings WHERE scope = %s AND name_id = %s", (scope, old_id))
+        count = cur.fetchone()[0]
+        cur.execute("SELECT id FROM names WHERE scope = %s AND name = %s", (scope, new_name))
+        row = cur.fetchone()
+        if row is None:
+            cur.execute("UPDATE names SET name = %s WHERE id = %s", (new_name, old_id))
+            refresh_aliases(cur, [old_id])
+        else:
+            for table in ("bindings", "bindings_archive"):
+                cur.execute(f"UPDATE {table} SET name_id = %s WHERE scope = %s AND name_id = %s",
+                            (row[0], scope, old_id))
+            cur.execute("DELETE FROM names WHERE id = %s", (old_id,))
+            cur.execute("DELETE FROM name_aliases WHERE name_id = %s", (old_id,))
+            refresh_aliases(cur, [row[0]])
+        self._commit()
         cur.close()
         return count
 
@@ -161,7 +774,11 @@ class AbraWriter:
         """Find existing names matching a prefix. Returns list of (name, relationship, target_ref) tuples."""
         cur = self.conn.cursor()
         cur.execute(
-            "SELECT DISTINCT name, relationship, target_ref FROM bindings WHERE scope = %s AND name LIKE %s ORDER BY name",
+            """SELECT DISTINCT n.name, r.relationship, b.target_ref
+               FROM names n
+               JOIN bindings b ON b.name_id = n.id AND b.scope = n.scope
+               JOIN relationship_types r ON r.id = b.relationship_id
+               WHERE n.scope = %s AND n.name LIKE %s ORDER BY n.name""",
             (scope, f"{name_prefix}%")
         )
         results = cur.fetchall()
@@ -169,6 +786,8 @@ class AbraWriter:
         return results
 
     def close(self):
+        if self._alloc_conn is not None:
+            self._alloc_conn.close()
         self.conn.close()
 
 
@@ -182,11 +801,13 @@ def main():
     parser.add_argument('--qualifier', default=None)
     parser.add_argument('--permanence', default='CURRENT')
     parser.add_argument('--catcode', default=None)
+    parser.add_argument('--ttl-days', type=int, default=None, help='Expire after this many days')
     args = parser.parse_args()
 
     writer = AbraWriter()
     bid = writer.write_binding(args.scope, args.name, args.rel, args.target_type,
-                               args.target_ref, args.qualifier, args.permanence, catcode=args.catcode)
+                               args.target_ref, args.qualifier, args.permanence, catcode=args.catcode,
+                               ttl_days=args.ttl_days)
     if bid:
         print(f"Created binding {bid}: {args.name} {args.rel} [{args.target_type}] {args.target_ref}")
     writer.close()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Durable journal of an import run, so an interrupted run can be resumed.
+
+One JSON line per event in ~/.abra/runs/<run_id>.jsonl. The first line is a
+header with the run's inputs; after that each line records one contact's
+state:
+
+    exists            already in the CRM, nothing to do
+    crm_created       created in the CRM (odoo_id), bindings not written yet
+    bindings_written  done
+    failed            error message; retried on resume
+
+Events are buffered and appended in batches; flush() fsyncs, so after it
+returns the batch survives a crash. The last event for a key wins. Safe to
+record from several threads.
+
+    from run_journal import RunJournal
+    journal = RunJournal.create({"files": [...]})
+    journal.record(key, "crm_created", odoo_id=123)
+    journal.flush()
+    ...
+    journal = RunJournal.open(run_id)      # --resume
+    journal.done(key), journal.odoo_id(key)
+"""
+import os
+import json
+import time
+import secrets
+import threading
+
+RUNS_DIR = os.path.expanduser("~/.abra/runs")
+DONE_STATES = ("exists", "bindings_written")
+
+
+def contact_key(c):
+    """Stable identity of a contact across runs of the same input."""
+    if c.email:
+        return f"email:{c.email.strip().lower()}"
+    if c.linkedin_url:
+        return f"url:{c.linkedin_url.strip().lower()}"
+    return f"name:{(c.name or '').strip().lower()}"
+
+
+class RunJournal:
+    def __init__(self, run_id, header, states=None, runs_dir=RUNS_DIR):
+        self.run_id = run_id
+        self.header = header
+        self.states = states or {}
+        self.path = os.path.join(runs_dir, f"{run_id}.jsonl")
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, header, runs_dir=RUNS_DIR):
+        """Start a new run. header is any JSON-able dict (input files, options)."""
+        run_id = time.strftime("%Y%m%d-%H%M%S") + "-" + secrets.token_hex(2)
+        os.makedirs(runs_dir, exist_ok=True)
+        journal = cls(run_id, dict(header, run_id=run_id, started=time.time()), runs_dir=runs_dir)
+        with open(journal.path, "x") as f:
+            f.write(json.dumps(journal.header) + "\n")
+        return journal
+
+    @classmethod
+    def open(cls, run_id, runs_dir=RUNS_DIR):
+        """Load an existing run. Raises FileNotFoundError if there is none."""
+        path = os.path.join(runs_dir, f"{run_id}.jsonl")
+        header = None
+        states = {}
+        with open(path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Torn last line from a crash mid-write
+                    continue
+                if header is None:
+                    header = event
+                    continue
+                states[event["key"]] = event
+        return cls(run_id, header or {}, states, runs_dir=runs_dir)
+
+    def record(self, key, state, **fields):
+        event = dict(fields, key=key, state=state)
+        with self._lock:
+            # A crm_created id must survive a later failed event for the same key
+            prev = self.states.get(key)
+            if state == "failed" and prev and prev.get("odoo_id") and "odoo_id" not in event:
+                event["odoo_id"] = prev["odoo_id"]
+            self.states[key] = event
+            self._pending.append(event)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if not pending:
+                return
+            with open(self.path, "a") as f:
+                f.write("".join(json.dumps(e) + "\n" for e in pending))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def state(self, key):
+        event = self.states.get(key)
+        return event["state"] if event else None
+
+    def done(self, key):
+        return self.state(key) in DONE_STATES
+
+    def odoo_id(self, key):
+        """CRM id recorded for key, if it was created in an earlier attempt."""
+        event = self.states.get(key)
+        return event.get("odoo_id") if event else None
+
+    def counts(self):
+        counts = {}
+        for event in self.states.values():
+            counts[event["state"]] = counts.get(event["state"], 0) + 1
+        return counts